@@ -0,0 +1,179 @@
+"""
+Event Aggregation Benchmark
+===========================
+Boots the firmware headless with two simulated seesaw keypads (32 bank
+buttons) and toggles random bank buttons at a fixed event rate, comparing
+immediate sends (AGGREGATE_MS=0) with coalescing windows. For each
+configuration it reports:
+
+- datagrams and bytes sent per event
+- event rate delivered to the PC socket
+- latency: edge pushed into the keypad FIFO -> its message leaves sendto()
+
+A sparse rate is included to show isolated events still go out on their own.
+
+Usage:
+    python bench/aggregation.py [--seconds S] [--output results.json]
+    python bench/aggregation.py --set AGGREGATE_MS=0,10 --set RATE=500
+"""
+
+import argparse
+import asyncio
+import contextlib
+import json
+import os
+import random
+import socket
+import time
+
+from common import (
+    add_sweep_arguments, configurations, format_ms, parse_overrides, run_configuration, summarize,
+    write_results,
+)
+
+BASELINE = {'AGGREGATE_MS': 0, 'RATE': 200}
+
+SWEEP = {
+    'AGGREGATE_MS': (0, 5, 20),
+    'RATE': (5, 200, 1000),
+}
+
+TICK_MS = 2
+BANK_SCAN_MS = 1
+
+# ============================================================================
+# WORKER (one firmware boot per configuration)
+# ============================================================================
+
+def _events(data):
+    """OSC addresses of every message in a datagram, bundles included"""
+    from osc import walk_bundle
+
+    addresses = []
+
+    def on_message(buffer, start, end, timetag):
+        addresses.append(bytes(buffer[start:buffer.index(b'\x00', start)]))
+
+    walk_bundle(data, len(data), on_message)
+    return addresses
+
+async def _scenario(keypads, key_map, rate, seconds):
+    """Toggle random bank buttons at `rate` edges per second"""
+    rng = random.Random(1)
+    pressed = {}
+    pushed = []   # (ns, address)
+    per_tick = rate * TICK_MS / 1000
+    owed = 0.0
+    end = time.monotonic() + seconds
+    while time.monotonic() < end:
+        owed += per_tick
+        while owed >= 1:
+            owed -= 1
+            button = rng.randrange(len(keypads) * len(key_map))
+            kp = keypads[button // len(key_map)]
+            key = key_map[button % len(key_map)]
+            state = not pressed.get(button)
+            pressed[button] = state
+            pushed.append((time.perf_counter_ns(), f"/button/{button}/{'press' if state else 'release'}".encode()))
+            if state:
+                kp.press(key)
+            else:
+                kp.release(key)
+        await asyncio.sleep(TICK_MS / 1000)
+    await asyncio.sleep(0.1)
+    return pushed
+
+def run_worker(settings, seconds):
+    import sim
+    sim.install()
+    from sim import socketpool
+    from sim.adafruit_seesaw import keypad
+    from sim.runner import DEFAULT_ENV, HeadlessController
+
+    from buttons import NEOTRELLIS_KEYS
+
+    env = {
+        'AGGREGATE_MS': settings['AGGREGATE_MS'],
+        'BUTTON_BANKS': '2E,2F',
+        'BANK_SCAN_MS': BANK_SCAN_MS,
+        'HEARTBEAT_MS': 0,
+        'CLOCK_SYNC_MS': 0,
+    }
+    sink = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+    sink.bind(('127.0.0.1', int(DEFAULT_ENV['PORT'])))
+    socketpool.sent_log = []
+
+    with contextlib.redirect_stdout(open(os.devnull, 'w')):
+        controller = HeadlessController(env).start()
+        try:
+            socketpool.sent_log.clear()  # Drop the handshake
+            pushed = controller.call(_scenario(keypad.instances, NEOTRELLIS_KEYS, settings['RATE'], seconds))
+        finally:
+            controller.stop()
+
+    # Match each pushed edge to the first unused send of the same address
+    sends = {}
+    datagrams = 0
+    sent_bytes = 0
+    for t, data in socketpool.sent_log:
+        events = _events(data)
+        if not any(a.endswith((b'/press', b'/release')) for a in events):
+            continue
+        datagrams += 1
+        sent_bytes += len(data)
+        for address in events:
+            sends.setdefault(address, []).append(t)
+    latencies = []
+    for t, address in pushed:
+        queue = sends.get(address)
+        if queue and queue[0] >= t:
+            latencies.append((queue.pop(0) - t) / 1e6)
+
+    events = len(pushed)
+    return {
+        'config': settings,
+        'events': events,
+        'delivered': len(latencies),
+        'datagrams': datagrams,
+        'events_per_datagram': len(latencies) / datagrams if datagrams else 0.0,
+        'bytes_per_event': sent_bytes / len(latencies) if latencies else 0.0,
+        'events_per_s': len(latencies) / seconds,
+        'latency': summarize(latencies),
+    }
+
+# ============================================================================
+# DRIVER
+# ============================================================================
+
+def main():
+    parser = argparse.ArgumentParser(description="Outbound event coalescing benchmark")
+    parser.add_argument('--seconds', type=float, default=2.0, help="scripted activity per configuration")
+    add_sweep_arguments(parser)
+    parser.add_argument('--output', help="write JSON results to this path")
+    args = parser.parse_args()
+
+    if args.worker:
+        print(json.dumps(run_worker(json.loads(args.worker), args.seconds)))
+        return
+
+    print(
+        f"{'rate/s':>7}{'window':>8}{'events':>8}{'datagrams':>11}{'ev/dgram':>10}{'B/event':>9}"
+        f"{'p50 ms':>9}{'p95 ms':>9}{'max ms':>9}"
+    )
+    results = []
+    for settings in configurations(BASELINE, SWEEP, parse_overrides(args.set)):
+        result = run_configuration(__file__, settings, '--seconds', str(args.seconds))
+        results.append(result)
+        stats = result['latency']
+        print(
+            f"{settings['RATE']:>7}{settings['AGGREGATE_MS']:>8}{result['delivered']:>8}"
+            f"{result['datagrams']:>11}{result['events_per_datagram']:>10.2f}{result['bytes_per_event']:>9.1f}"
+            f"{format_ms(stats['p50_ms']):>9}{format_ms(stats['p95_ms']):>9}{format_ms(stats['max_ms']):>9}"
+        )
+
+    if args.output:
+        write_results(args.output, 'aggregation', results, seconds=args.seconds, bank_scan_ms=BANK_SCAN_MS)
+        print(f"Results written to {args.output}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,118 @@
+"""
+Boot Time Benchmark
+===================
+Boots the firmware headless repeatedly and collects the /button/boot timing
+report it sends, phase by phase. The simulated radio takes CONNECT_MS to
+associate, SCAN_MS to find the AP and DHCP_MS for a DHCP lease. Configurations:
+
+- STATIC:      0 = DHCP, 1 = STATIC_IP set (no DHCP lease)
+- PREJOINED:   1 = the core already joined the network before code.py ran
+               (CIRCUITPY_WIFI_SSID), so the controller reuses the connection
+- FAILURES:    connect attempts that fail before one succeeds, to show the
+               retry backoff (formerly a fixed 2 s sleep per retry)
+
+Usage:
+    python bench/boot.py [--boots N] [--output results.json]
+    python bench/boot.py --set STATIC=1 --set FAILURES=0,2
+"""
+
+import argparse
+import contextlib
+import json
+import os
+import struct
+import time
+
+from common import (
+    add_sweep_arguments, configurations, parse_overrides, run_configuration, summarize,
+    write_results,
+)
+
+BASELINE = {'STATIC': 0, 'PREJOINED': 0, 'FAILURES': 0}
+
+SWEEP = {
+    'STATIC': (0, 1),
+    'PREJOINED': (0, 1),
+    'FAILURES': (0, 1),
+}
+
+CONNECT_MS = 300
+SCAN_MS = 800
+DHCP_MS = 600
+
+PHASES = ('config', 'hardware', 'wifi', 'sockets', 'total')
+
+# ============================================================================
+# WORKER (one firmware boot)
+# ============================================================================
+
+def run_worker(settings):
+    import sim
+    sim.install()
+    from sim import wifi
+    from sim.runner import DEFAULT_ENV, HeadlessController, PCListener
+
+    env = {'HEARTBEAT_MS': 0, 'CLOCK_SYNC_MS': 0}
+    if settings['STATIC']:
+        env['STATIC_IP'] = '127.0.0.2'
+    if settings['PREJOINED']:
+        wifi.radio.connect(DEFAULT_ENV['WIFI_SSID'], DEFAULT_ENV['WIFI_PASSWORD'])
+    wifi.radio.configure(
+        connect_latency_s=CONNECT_MS / 1000, scan_latency_s=SCAN_MS / 1000,
+        dhcp_latency_s=DHCP_MS / 1000, failures=settings['FAILURES'],
+    )
+    pc = PCListener(int(DEFAULT_ENV['PORT']), int(DEFAULT_ENV['LISTEN_PORT']))
+
+    with contextlib.redirect_stdout(open(os.devnull, 'w')):
+        controller = HeadlessController(env).start(timeout=30)
+        try:
+            deadline = time.monotonic() + 2
+            while time.monotonic() < deadline and not any(
+                data.startswith(b'/button/boot\x00') for _, data in pc.received
+            ):
+                time.sleep(0.01)
+        finally:
+            controller.stop()
+            pc.close()
+
+    for _, data in pc.received:
+        if data.startswith(b'/button/boot\x00'):
+            # Address (16 bytes), ",iiiiiiii" tags (12 bytes) and device id
+            return dict(zip(PHASES, struct.unpack_from('>5i', data, 32)))
+    raise RuntimeError("no /button/boot report received")
+
+# ============================================================================
+# DRIVER
+# ============================================================================
+
+def main():
+    parser = argparse.ArgumentParser(description="Boot phase timing benchmark")
+    parser.add_argument('--boots', type=int, default=3, help="boots per configuration")
+    add_sweep_arguments(parser)
+    parser.add_argument('--output', help="write JSON results to this path")
+    args = parser.parse_args()
+
+    if args.worker:
+        print(json.dumps(run_worker(json.loads(args.worker))))
+        return
+
+    keys = list(BASELINE)
+    header = ''.join(f"{k:>11}" for k in keys)
+    print(header + ''.join(f"{phase + ' ms':>12}" for phase in PHASES))
+    results = []
+    for settings in configurations(BASELINE, SWEEP, parse_overrides(args.set)):
+        boots = [run_configuration(__file__, settings) for _ in range(args.boots)]
+        phases = {phase: summarize([b[phase] for b in boots]) for phase in PHASES}
+        results.append({'config': settings, 'phases': phases})
+        row = ''.join(f"{settings[k]:>11}" for k in keys)
+        print(row + ''.join(f"{phases[phase]['p50_ms']:>12}" for phase in PHASES))
+
+    if args.output:
+        write_results(
+            args.output, 'boot', results, boots=args.boots,
+            connect_ms=CONNECT_MS, scan_ms=SCAN_MS, dhcp_ms=DHCP_MS,
+        )
+        print(f"Results written to {args.output}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,139 @@
+"""
+Button Bank Scan Benchmark
+==========================
+Compares scanning 16, 32 and 64 buttons on simulated seesaw keypads:
+
+- fifo:     SeesawButtonBank reading each keypad event FIFO
+- fifo+int: the same, skipping idle scans via the shared INT line
+- per-gpio: one seesaw digital_read() transaction per button
+
+Bus time is modeled by the SimI2C bus at 400 kHz including the seesaw
+driver's read turnaround delay; CPU time is host time spent in scan code.
+
+Usage:
+    python bench/button_bank.py [--scans N] [--output results.json]
+"""
+
+import argparse
+import random
+import time
+
+from common import write_results
+
+import sim
+sim.install()
+
+from buttons import SeesawButtonBank
+from sim.adafruit_seesaw.keypad import Keypad
+from sim.i2c import SimI2C
+
+SIZES = (16, 32, 64)
+KEYS_PER_KEYPAD = 16
+EDGES_PER_SECOND = 20   # Button activity across the whole bank
+SCAN_MS = 5
+
+class IntLine:
+    """Shared open-drain INT line: low while any keypad FIFO is non-empty"""
+
+    def __init__(self, keypads):
+        self.keypads = keypads
+
+    @property
+    def value(self):
+        return not any(kp._fifo for kp in self.keypads)
+
+def make_bank(buttons, use_int):
+    i2c = SimI2C()
+    keypads = [Keypad(i2c, 0x2E + i) for i in range(buttons // KEYS_PER_KEYPAD)]
+    bank = SeesawButtonBank(keypads, int_pin=IntLine(keypads) if use_int else None)
+    return i2c, keypads, bank
+
+def script_edges(rng, keypads, key_map, pressed):
+    """Randomly toggle buttons so the bank sees EDGES_PER_SECOND on average"""
+    if rng.random() < EDGES_PER_SECOND * SCAN_MS / 1000:
+        button = rng.randrange(len(keypads) * len(key_map))
+        kp = keypads[button // len(key_map)]
+        key = key_map[button % len(key_map)]
+        if pressed.get(button):
+            kp.release(key)
+        else:
+            kp.press(key)
+        pressed[button] = not pressed.get(button)
+
+def run_fifo(buttons, scans, use_int, seed=1):
+    i2c, keypads, bank = make_bank(buttons, use_int)
+    i2c.reset_counters()
+    rng = random.Random(seed)
+    pressed = {}
+    seen = [0]
+
+    def on_edge(button, is_pressed, now):
+        seen[0] += 1
+
+    cpu_ns = 0
+    for _ in range(scans):
+        script_edges(rng, keypads, bank.key_map, pressed)
+        start = time.perf_counter_ns()
+        bank.scan(0, on_edge)
+        cpu_ns += time.perf_counter_ns() - start
+    return i2c, cpu_ns, seen[0]
+
+def run_per_gpio(buttons, scans, seed=1):
+    i2c, keypads, bank = make_bank(buttons, False)
+    i2c.reset_counters()
+    rng = random.Random(seed)
+    pressed = {}
+    levels = [True] * buttons
+    seen = 0
+    cpu_ns = 0
+    for _ in range(scans):
+        script_edges(rng, keypads, bank.key_map, pressed)
+        start = time.perf_counter_ns()
+        for button in range(buttons):
+            kp = keypads[button // KEYS_PER_KEYPAD]
+            level = kp.digital_read(bank.key_map[button % KEYS_PER_KEYPAD])
+            if level != levels[button]:
+                levels[button] = level
+                seen += 1
+        cpu_ns += time.perf_counter_ns() - start
+    return i2c, cpu_ns, seen
+
+def main():
+    parser = argparse.ArgumentParser(description="Seesaw button bank scan benchmark")
+    parser.add_argument('--scans', type=int, default=2000)
+    parser.add_argument('--output', help="write JSON results to this path")
+    args = parser.parse_args()
+
+    print(
+        f"{'buttons':>8}  {'mode':<10}{'txn/scan':>10}{'bus us/scan':>13}"
+        f"{'bus us/button':>15}{'cpu us/button':>15}{'edges':>7}"
+    )
+    results = []
+    for buttons in SIZES:
+        for mode in ('fifo', 'fifo+int', 'per-gpio'):
+            if mode == 'per-gpio':
+                i2c, cpu_ns, edges = run_per_gpio(buttons, args.scans)
+            else:
+                i2c, cpu_ns, edges = run_fifo(buttons, args.scans, mode == 'fifo+int')
+            result = {
+                'buttons': buttons,
+                'mode': mode,
+                'transactions_per_scan': i2c.transactions / args.scans,
+                'bus_us_per_scan': i2c.modeled_us / args.scans,
+                'bus_us_per_button': i2c.modeled_us / args.scans / buttons,
+                'cpu_us_per_button': cpu_ns / 1000 / args.scans / buttons,
+                'edges': edges,
+            }
+            results.append(result)
+            print(
+                f"{buttons:>8}  {mode:<10}{result['transactions_per_scan']:>10.2f}"
+                f"{result['bus_us_per_scan']:>13.1f}{result['bus_us_per_button']:>15.2f}"
+                f"{result['cpu_us_per_button']:>15.3f}{edges:>7}"
+            )
+
+    if args.output:
+        write_results(args.output, 'button_bank', results, scans=args.scans, scan_ms=SCAN_MS)
+        print(f"Results written to {args.output}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,117 @@
+"""
+Shared helpers for the host benchmarks: repo path setup, configuration
+sweeps run in worker processes, latency summaries, event matching and
+machine-readable result files.
+
+Benchmarks that sweep configurations run each one in its own worker
+process (run_configuration()), so every run starts from clean simulator
+and collector state.
+"""
+
+import argparse
+import itertools
+import json
+import os
+import platform
+import subprocess
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if ROOT not in sys.path:
+    sys.path.insert(0, ROOT)
+
+def add_sweep_arguments(parser):
+    """--set to choose the values swept, and the hidden --worker flag"""
+    parser.add_argument('--set', action='append', metavar='KEY=V1,V2', help="sweep these values instead")
+    parser.add_argument('--worker', help=argparse.SUPPRESS)
+
+def parse_overrides(items):
+    """Values by key from --set KEY=V1,V2 items; integers where they parse"""
+    overrides = {}
+    for item in items or ():
+        key, _, values = item.partition('=')
+        overrides[key] = [int(v) if v.lstrip('-').isdigit() else v for v in values.split(',')]
+    return overrides
+
+def configurations(baseline, sweep, overrides):
+    """
+    Every combination of the `sweep` values on top of `baseline`; a key
+    given with --set sweeps those values instead
+    """
+    axes = {key: overrides.get(key, values) for key, values in sweep.items()}
+    keys = list(axes)
+    for values in itertools.product(*(axes[k] for k in keys)):
+        yield dict(baseline, **dict(zip(keys, values)))
+
+def run_configuration(script, settings, *args):
+    """
+    Run `script` with --worker `settings` (and `args`) in a fresh process,
+    returning the JSON result it printed last
+    """
+    output = subprocess.run(
+        [sys.executable, os.path.abspath(script), '--worker', json.dumps(settings), *args],
+        cwd=ROOT, capture_output=True, text=True, check=True,
+    ).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+def percentile(sorted_samples, pct):
+    """Nearest-rank percentile of an already sorted list"""
+    if not sorted_samples:
+        return None
+    rank = max(0, min(len(sorted_samples) - 1, int(round(pct / 100 * len(sorted_samples))) - 1))
+    return sorted_samples[rank]
+
+def summarize(samples_ms):
+    """Count, p50/p95/p99 and max of latency samples in milliseconds"""
+    ordered = sorted(samples_ms)
+    return {
+        'n': len(ordered),
+        'p50_ms': percentile(ordered, 50),
+        'p95_ms': percentile(ordered, 95),
+        'p99_ms': percentile(ordered, 99),
+        'max_ms': ordered[-1] if ordered else None,
+    }
+
+def format_ms(value):
+    return f"{value:.3f}" if value is not None else "-"
+
+def first_arrivals(edges, arrivals):
+    """
+    Latency in ms from each button edge to the first copy of its event at
+    the PC. edges are (ns, address) in order; arrivals are (ns, address, seq).
+    Numbered events are matched by sequence number (edge i is event i + 1);
+    unnumbered ones by the first arrival of the same address before that
+    address's next edge.
+    """
+    latencies = []
+    if arrivals and arrivals[0][2] is not None:
+        first = {}
+        for t, _, seq in arrivals:
+            first.setdefault(seq, t)
+        for i, (t, _) in enumerate(edges):
+            if i + 1 in first:
+                latencies.append((first[i + 1] - t) / 1e6)
+        return latencies
+    for i, (t, address) in enumerate(edges):
+        following = [e for e, a in edges[i + 1:] if a == address]
+        limit = following[0] if following else float('inf')
+        for at, arrived, _ in arrivals:
+            if arrived == address and t <= at < limit:
+                latencies.append((at - t) / 1e6)
+                break
+    return latencies
+
+def write_results(path, benchmark, results, **metadata):
+    """Write benchmark results as JSON for regression tracking"""
+    document = {
+        'benchmark': benchmark,
+        'created': time.strftime('%Y-%m-%dT%H:%M:%SZ', time.gmtime()),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'metadata': metadata,
+        'results': results,
+    }
+    with open(path, 'w') as f:
+        json.dump(document, f, indent=2)
+        f.write('\n')
@@ -0,0 +1,69 @@
+"""
+Debounce Replay Benchmark
+=========================
+Replays contact bounce traces through the non-blocking Debouncer and through
+the original poll-and-sleep loop, reporting detected-event accuracy and how
+long the main loop stalls in button handling.
+
+Usage:
+    python bench/debounce_replay.py [trace.csv ...] [--output results.json]
+"""
+
+import argparse
+
+from common import write_results
+
+import sim
+sim.install()
+
+from sim.bounce import load_trace, replay, replay_legacy, standard_traces
+
+SETTLE_TIMES_MS = (5, 10, 20, 40)
+
+def report(label, result):
+    """Print one row and return it as a result record"""
+    print(
+        f"{result.trace.name:<14}{label:<14}"
+        f"{result.accuracy * 100:>8.1f}%"
+        f"{result.missed:>8}{result.spurious:>10}"
+        f"{result.timestamp_error_ms:>11.2f}"
+        f"{result.max_stall_ms:>14.3f}{result.total_stall_ms:>12.1f}"
+    )
+    return {
+        'trace': result.trace.name,
+        'mode': label,
+        'accuracy': result.accuracy,
+        'missed': result.missed,
+        'spurious': result.spurious,
+        'timestamp_error_ms': result.timestamp_error_ms,
+        'max_stall_ms': result.max_stall_ms,
+        'total_stall_ms': result.total_stall_ms,
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description="Replay contact bounce traces through the debouncers")
+    parser.add_argument('traces', nargs='*', metavar='trace.csv', help="traces to replay instead of the standard set")
+    parser.add_argument('--output', help="write JSON results to this path")
+    args = parser.parse_args()
+
+    if args.traces:
+        traces = [load_trace(path) for path in args.traces]
+    else:
+        traces = standard_traces()
+
+    print(
+        f"{'trace':<14}{'mode':<14}{'accuracy':>9}{'missed':>8}{'spurious':>10}"
+        f"{'ts err ms':>11}{'max stall ms':>14}{'stall ms':>12}"
+    )
+    results = []
+    for trace in traces:
+        results.append(report('legacy', replay_legacy(trace)))
+        for settle_ms in SETTLE_TIMES_MS:
+            results.append(report(f"settle {settle_ms}ms", replay(trace, settle_ms=settle_ms)))
+
+    if args.output:
+        write_results(args.output, 'debounce_replay', results, settle_times_ms=SETTLE_TIMES_MS)
+        print(f"Results written to {args.output}")
+
+if __name__ == "__main__":
+    main()
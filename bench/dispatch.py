@@ -0,0 +1,83 @@
+"""
+OSC Dispatch Benchmark
+======================
+Measures the cost of routing one decoded message as the number of
+registered addresses grows, for:
+
+- if-chain:   the original sequence of `address == ...` comparisons
+- exact:      OscDispatcher dict lookup
+- pattern:    OscDispatcher falling through to a registered wildcard
+
+Usage:
+    python bench/dispatch.py [--output results.json]
+"""
+
+import argparse
+import time
+
+from common import write_results
+
+from osc import OscDispatcher, OscMessage, build_osc_message
+
+SIZES = (1, 10, 50, 100, 250, 500)
+ITERATIONS = 20000
+
+def handler(message, context):
+    return context
+
+def if_chain(addresses):
+    """Emulate an if/elif chain: compare against each address in turn"""
+    def dispatch(message):
+        address = message.address
+        for candidate in addresses:
+            if address == candidate:
+                return 1
+        return 0
+    return dispatch
+
+def message_for(address):
+    data = bytearray(build_osc_message(address, 47))
+    message = OscMessage()
+    message.decode(data, len(data))
+    return message
+
+def time_ns_per_call(dispatch, message):
+    start = time.perf_counter_ns()
+    for _ in range(ITERATIONS):
+        dispatch(message)
+    return (time.perf_counter_ns() - start) / ITERATIONS
+
+def main():
+    parser = argparse.ArgumentParser(description="OSC address dispatch benchmark")
+    parser.add_argument('--output', help="write JSON results to this path")
+    args = parser.parse_args()
+
+    print(f"{'addresses':>10}{'if-chain ns':>14}{'exact ns':>12}{'pattern ns':>13}")
+    results = []
+    for size in SIZES:
+        addresses = [f"/device/{i}/command" for i in range(size)]
+        dispatcher = OscDispatcher()
+        for address in addresses:
+            dispatcher.add(address, handler, address)
+        dispatcher.add('/haptic/*', handler)
+
+        # Worst case for the chain: the last registered address
+        last = message_for(addresses[-1])
+        result = {
+            'addresses': size,
+            'if_chain_ns': time_ns_per_call(if_chain(addresses), last),
+            'exact_ns': time_ns_per_call(dispatcher.dispatch, last),
+            'pattern_ns': time_ns_per_call(dispatcher.dispatch, message_for('/haptic/play')),
+        }
+        results.append(result)
+        print(
+            f"{size:>10}{result['if_chain_ns']:>14.0f}{result['exact_ns']:>12.0f}"
+            f"{result['pattern_ns']:>13.0f}"
+        )
+
+    if args.output:
+        write_results(args.output, 'dispatch', results, iterations=ITERATIONS)
+        print(f"Results written to {args.output}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,117 @@
+"""
+Event Log Benchmark
+===================
+Compares the per-event cost on the button path of the print() calls the
+controller used to make against logging through the EventLog:
+
+- print:         two f-string print() calls per press, as before
+- log (gated):   two log() calls below LOG_LEVEL (the default for events)
+- log (record):  two log() calls recorded in the ring
+- flush:         formatting and writing one record later, in an idle slot
+- ticks_ms x2:   the two timestamps log (record) takes
+
+On the host, ticks_ms() results and counters above 256 are new int objects,
+which is all that log (record) allocates; on the device they are small ints
+and recording does not allocate.
+
+print() writes to a slow sink here (SINK_US per line, like a USB serial
+port the host drains slowly), which is where it blocked the event loop.
+
+Runs on the host (allocations measured with tracemalloc) or on the device
+when copied next to log.py and osc_encode.py.
+
+Usage:
+    python bench/event_log.py [--iterations N] [--output results.json]
+"""
+
+import sys
+import time
+
+try:
+    import os
+    sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+except (ImportError, AttributeError):
+    pass  # On device log.py sits next to this file
+
+try:
+    import adafruit_ticks  # noqa: F401
+except ImportError:
+    import sim
+    sim.install()
+
+from adafruit_ticks import ticks_ms
+from log import DEBUG, INFO, EventLog
+from osc_encode import measure_allocations, measure_time_us, parse_arguments
+
+SINK_US = 50
+
+MESSAGES = (
+    (DEBUG, "Button pressed"),
+    (DEBUG, "✓ OSC UDP packet sent for press! ({0})"),
+)
+
+class SlowSink:
+    """stdout stand-in that takes SINK_US per line"""
+
+    def write(self, text):
+        if text != '\n':
+            deadline = time.monotonic_ns() + SINK_US * 1000
+            while time.monotonic_ns() < deadline:
+                pass
+        return len(text)
+
+    def flush(self):
+        pass
+
+def main():
+    iterations, output = parse_arguments("Button path cost of print() vs the event log")
+
+    sink = SlowSink()
+    gated = EventLog(MESSAGES, level=INFO, slots=64)
+    recorded = EventLog(MESSAGES, level=DEBUG, slots=iterations * 4 + 8)
+    recorded.writer = lambda level, ticks, text: sink.write(text)
+    timestamp = 123456
+
+    def print_event():
+        print("Button pressed", file=sink)
+        print(f"✓ OSC UDP packet sent for press! ({timestamp})", file=sink)
+
+    def log_gated():
+        gated.log(0)
+        gated.log(1, timestamp)
+
+    def log_record():
+        recorded.log(0)
+        recorded.log(1, timestamp)
+
+    def flush_one():
+        recorded.flush()
+
+    def two_ticks():
+        ticks_ms()
+        ticks_ms()
+
+    print(f"{'path':<16}{'bytes/event':>13}{'us/event':>10}")
+    results = []
+    for name, fn in (
+        ('print', print_event),
+        ('log (gated)', log_gated),
+        ('log (record)', log_record),
+        ('ticks_ms x2', two_ticks),
+    ):
+        allocated = measure_allocations(fn, iterations)
+        elapsed = measure_time_us(fn, iterations)
+        results.append({'path': name, 'bytes_per_event': allocated, 'us_per_event': elapsed})
+        print(f"{name:<16}{allocated:>13.1f}{elapsed:>10.2f}")
+    elapsed = measure_time_us(flush_one, iterations)
+    results.append({'path': 'flush (idle)', 'bytes_per_event': None, 'us_per_event': elapsed})
+    print(f"{'flush (idle)':<16}{'-':>13}{elapsed:>10.2f}")
+    print(f"records dropped: {recorded.dropped}")
+
+    if output:
+        from common import write_results
+        write_results(output, 'event_log', results, iterations=iterations, dropped=recorded.dropped)
+        print(f"Results written to {output}")
+
+if __name__ == "__main__":
+    main()
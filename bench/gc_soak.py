@@ -0,0 +1,198 @@
+"""
+GC Soak Test
+============
+Drives the firmware's button path for a million simulated events on the
+manual simulator clock and records every garbage collection the runtime
+runs, to confirm that with GC_MODE=1 none lands inside the press-to-send
+critical section (handle_button_events from the first edge to the last
+send, marked by memory.critical).
+
+Each tap is a press held HOLD_MS and a release followed by a gap of GAP_MS
+(both drawn at random), stepped in GC_CHECK_MS increments with a memory
+task pass at each. Every pass also leaves BACKGROUND cyclic objects for the
+collector, standing in for what the receive, heartbeat and log tasks
+allocate, and every event send leaves CRITICAL more, standing in for what
+the send path allocates; on the device every allocation counts towards the
+next automatic collection, on the host only objects that survive reference
+counting do. The GC_MODE=0 control must see collections inside
+press-to-send, or the soak could not have caught any.
+
+For each configuration it reports:
+
+- collections:   collections the runtime ran
+- in critical:   of those, how many started inside press-to-send
+- while held:    how many started with the button held
+- gc max us:     longest collection run by the memory manager
+
+Usage:
+    python bench/gc_soak.py [--events N] [--output results.json]
+    python bench/gc_soak.py --set GC_MODE=0,1
+"""
+
+import argparse
+import gc
+import json
+import random
+import socket
+import sys
+import time
+
+from common import add_sweep_arguments, configurations, parse_overrides, run_configuration, write_results
+
+BASELINE = {'GC_MODE': 1, 'GC_CHECK_MS': 20, 'GC_IDLE_MS': 50, 'GC_INTERVAL_MS': 1000}
+
+SWEEP = {
+    'GC_MODE': (0, 1),
+}
+
+HOLD_MS = (20, 150)
+GAP_MS = (20, 400)
+BACKGROUND = 20
+CRITICAL = 10
+SEED = 23
+
+# ============================================================================
+# WORKER (one soak per configuration)
+# ============================================================================
+
+class Collections:
+    """gc.callbacks hook counting where collections start"""
+
+    def __init__(self, memory, debouncer):
+        self.memory = memory
+        self.debouncer = debouncer
+        self.total = 0
+        self.critical = 0
+        self.held = 0
+
+    def __call__(self, phase, info):
+        if phase != 'start':
+            return
+        self.total += 1
+        if self.memory.critical:
+            self.critical += 1
+        if self.debouncer.pressed:
+            self.held += 1
+
+def _background(count):
+    for _ in range(count):
+        garbage = []
+        garbage.append(garbage)
+
+class AllocatingSender:
+    """UdpSender that leaves CRITICAL cyclic objects behind on every send"""
+
+    def __init__(self, sender):
+        self.sender = sender
+
+    def send(self, data):
+        _background(CRITICAL)
+        self.sender.send(data)
+
+    def close(self):
+        self.sender.close()
+
+def run_worker(settings, events):
+    import sim
+    firmware = sim.load_firmware()
+    from sim import board, clock, socketpool, wifi
+    from buttons import EdgeButton
+    from scheduler import ClockSync
+    from transport import EventAggregator, UdpSender
+
+    clock.set_manual(0)
+    wifi.radio.connect('sim-ap', 'sim-password')
+    sink = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+    sink.bind(('127.0.0.1', 0))
+    pool = socketpool.SocketPool(wifi.radio)
+    sender = AllocatingSender(UdpSender(pool, '127.0.0.1', sink.getsockname()[1]))
+    outbound = EventAggregator(sender, ClockSync())
+    templates = firmware.build_message_templates({'DEVICE_ID': '1', 'RELIABLE': 0, 'REDUNDANCY': 0})
+    button = EdgeButton(board.A0, settle_ms=20)
+    drv = firmware.setup_haptic({'HAPTIC_PRESS': (1,), 'HAPTIC_TRIGGER_PIN': ''})
+    memory = firmware.memory
+    memory.configure(
+        settings['GC_MODE'], idle_ms=settings['GC_IDLE_MS'], interval_ms=settings['GC_INTERVAL_MS'],
+    )
+
+    step_ms = settings['GC_CHECK_MS']
+    rng = random.Random(SEED)
+    hook = Collections(memory, button.debouncer)
+    gc.callbacks.append(hook)
+    started = time.perf_counter()
+
+    def run_for(ms, held):
+        elapsed = 0
+        while elapsed < ms:
+            clock.advance(step_ms)
+            elapsed += step_ms
+            firmware.handle_button_events(button, outbound, templates, drv)
+            _background(BACKGROUND)
+            memory.step(clock.ticks_ms(), held)
+
+    for tap in range(events // 2):
+        board.A0.press()
+        firmware.handle_button_events(button, outbound, templates, drv)
+        run_for(rng.randint(*HOLD_MS), True)
+        board.A0.release()
+        firmware.handle_button_events(button, outbound, templates, drv)
+        run_for(rng.randint(*GAP_MS), False)
+        if tap % 1024 == 0:
+            drv.drv.plays.clear()
+
+    gc.callbacks.remove(hook)
+    elapsed_s = time.perf_counter() - started
+    sender.close()
+    sink.close()
+    return {
+        'config': settings,
+        'events': events // 2 * 2,
+        'simulated_s': clock.ticks_ms() / 1000,
+        'collections': hook.total,
+        'in_critical': hook.critical,
+        'while_held': hook.held,
+        'managed_collections': memory.collections,
+        'emergency': memory.emergency,
+        'gc_max_us': memory.gc_max_us,
+        'run_s': elapsed_s,
+    }
+
+# ============================================================================
+# DRIVER
+# ============================================================================
+
+def main():
+    parser = argparse.ArgumentParser(description="Garbage collections inside press-to-send over a long soak")
+    parser.add_argument('--events', type=int, default=1000000, help="button events (press or release) per configuration")
+    add_sweep_arguments(parser)
+    parser.add_argument('--output', help="write JSON results to this path")
+    args = parser.parse_args()
+
+    if args.worker:
+        print(json.dumps(run_worker(json.loads(args.worker), args.events)))
+        return
+
+    print(f"{'GC_MODE':>8}{'events':>10}{'sim h':>8}{'collections':>13}{'in critical':>13}{'while held':>12}{'gc max us':>11}")
+    results = []
+    failures = []
+    for settings in configurations(BASELINE, SWEEP, parse_overrides(args.set)):
+        result = run_configuration(__file__, settings, '--events', str(args.events))
+        results.append(result)
+        print(
+            f"{settings['GC_MODE']:>8}{result['events']:>10}{result['simulated_s'] / 3600:>8.1f}"
+            f"{result['collections']:>13}{result['in_critical']:>13}{result['while_held']:>12}"
+            f"{result['gc_max_us']:>11}"
+        )
+        if settings['GC_MODE'] == 1 and result['in_critical'] > 0:
+            failures.append("collections landed inside press-to-send with GC_MODE=1")
+        if settings['GC_MODE'] == 0 and result['in_critical'] == 0:
+            failures.append("the GC_MODE=0 control saw no collection inside press-to-send")
+
+    if args.output:
+        write_results(args.output, 'gc_soak', results, events=args.events, hold_ms=HOLD_MS, gap_ms=GAP_MS)
+        print(f"Results written to {args.output}")
+    if failures:
+        sys.exit('\n'.join(f"✗ {failure}" for failure in failures))
+
+if __name__ == "__main__":
+    main()
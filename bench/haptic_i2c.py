@@ -0,0 +1,137 @@
+"""
+Haptic I2C Benchmark
+====================
+Counts the I2C transactions a button press costs the DRV2605 on the
+simulated bus, for a single effect and for a multi-effect pattern:
+
+- direct:   what the controller used to do, a new Effect written to each
+            sequence slot then GO, on every press (slot 1 holds the end
+            marker from driver init; longer patterns write their own)
+- cached:   HapticDriver.play(), which rewrites only slots that differ
+- remote:   cached, with a different /haptic/play effect played between
+            presses, so every press reprograms the slots that effect changed
+            (the remote effect's own writes are not counted)
+- pin:      cached, with GO a pulse on the IN/TRIG pin (HAPTIC_TRIGGER_PIN)
+
+Bus time is modeled by the SimI2C bus at 400 kHz; allocations are host
+bytes per press measured with tracemalloc (for remote, per press and
+remote effect together), including the simulated driver's play record.
+
+Usage:
+    python bench/haptic_i2c.py [--presses N] [--output results.json]
+"""
+
+import argparse
+import time
+
+from common import write_results
+from osc_encode import measure_allocations
+
+import sim
+sim.install()
+
+import adafruit_drv2605
+import board
+from digitalio import DigitalInOut, Direction
+from haptic import HapticDriver, parse_pattern, single
+from sim.i2c import SimI2C
+
+PATTERNS = {
+    'single': "1",
+    'pattern': "47,p50,47,p50,14",
+}
+REMOTE_EFFECT = 10
+
+class Discard(list):
+    """plays list that keeps nothing, so long runs do not grow the heap"""
+
+    def append(self, item):
+        pass
+
+def make_driver(use_pin=False):
+    i2c = SimI2C()
+    device = adafruit_drv2605.DRV2605(i2c)
+    device.use_ERM()
+    device.plays = Discard()
+    trigger = None
+    if use_pin:
+        trigger = DigitalInOut(board.D6)
+        trigger.direction = Direction.OUTPUT
+        trigger.value = False
+        device.mode = adafruit_drv2605.MODE_EXTTRIGEDGE
+    return i2c, device, HapticDriver(device, trigger)
+
+def press_direct(device, pattern):
+    def press():
+        for slot, entry in enumerate(pattern):
+            if entry & 0x80:
+                device.sequence[slot] = adafruit_drv2605.Pause((entry & 0x7F) / 100)
+            else:
+                device.sequence[slot] = adafruit_drv2605.Effect(entry)
+        if 1 < len(pattern) < 8:
+            device.sequence[len(pattern)] = adafruit_drv2605.Effect(0)
+        device.play()
+    return press
+
+def measure(mode, pattern, presses):
+    i2c, device, driver = make_driver(mode == 'pin')
+    between = None  # Runs before each press, off the books
+    if mode == 'direct':
+        press = press_direct(device, pattern)
+    else:
+        driver.program(pattern)  # As setup_haptic() does at boot
+        press = lambda: driver.play(pattern)
+        if mode == 'remote':
+            remote = single(REMOTE_EFFECT)
+            between = lambda: driver.play(remote)
+
+    transactions = 0
+    bus_us = 0.0
+    cpu_ns = 0
+    for _ in range(presses):
+        if between is not None:
+            between()
+        i2c.reset_counters()
+        start = time.perf_counter_ns()
+        press()
+        cpu_ns += time.perf_counter_ns() - start
+        transactions += i2c.transactions
+        bus_us += i2c.modeled_us
+
+    def both():
+        between()
+        press()
+    allocated = measure_allocations(press if between is None else both, min(presses, 1000))
+    board.D6.remove_listener(device._on_trigger)
+    return {
+        'transactions_per_press': transactions / presses,
+        'bus_us_per_press': bus_us / presses,
+        'cpu_us_per_press': cpu_ns / 1000 / presses,
+        'bytes_per_press': allocated,
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description="DRV2605 I2C transactions per press")
+    parser.add_argument('--presses', type=int, default=10000)
+    parser.add_argument('--output', help="write JSON results to this path")
+    args = parser.parse_args()
+
+    print(f"{'pattern':<10}{'mode':<9}{'txn/press':>11}{'bus us':>9}{'cpu us':>9}{'bytes':>8}")
+    results = []
+    for name, text in PATTERNS.items():
+        pattern = parse_pattern(text)
+        for mode in ('direct', 'cached', 'remote', 'pin'):
+            result = dict(pattern=name, entries=text, mode=mode, **measure(mode, pattern, args.presses))
+            results.append(result)
+            print(
+                f"{name:<10}{mode:<9}{result['transactions_per_press']:>11.2f}"
+                f"{result['bus_us_per_press']:>9.1f}{result['cpu_us_per_press']:>9.2f}"
+                f"{result['bytes_per_press']:>8.1f}"
+            )
+
+    if args.output:
+        write_results(args.output, 'haptic_i2c', results, presses=args.presses)
+        print(f"Results written to {args.output}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,181 @@
+"""
+End-to-End Latency Benchmark
+============================
+Boots the firmware headless in the simulator and measures, over loopback:
+
+- press:   simulated pin pulled low -> /button/press leaves sendto()
+- release: simulated pin released   -> /button/release leaves sendto()
+- buzz:    simulated pin pulled low -> the press haptic starts playing
+- haptic:  /haptic/play sent by the PC -> drv.play() fires
+
+The haptic driver's I2C bus holds the caller for each transaction's modeled
+wire time, so press and buzz show what the ordering of send and actuation
+(HAPTIC_ORDER) and the trigger path (HAPTIC_TRIGGER_PIN) cost each other.
+
+The default sweep varies one setting at a time around the firmware
+defaults: IDLE_SLEEP_MS, RECV_TIMEOUT_MS, DEBOUNCE_MS, HAPTIC_ORDER and
+HAPTIC_TRIGGER_PIN.
+
+Usage:
+    python bench/latency.py [--events N] [--output results.json]
+    python bench/latency.py --set IDLE_SLEEP_MS=0,10 --set DEBOUNCE_MS=20
+"""
+
+import argparse
+import asyncio
+import contextlib
+import itertools
+import json
+import os
+import socket
+import time
+
+from common import (
+    add_sweep_arguments, format_ms, parse_overrides, run_configuration, summarize, write_results,
+)
+
+BASELINE = {
+    'IDLE_SLEEP_MS': 0, 'RECV_TIMEOUT_MS': 0, 'DEBOUNCE_MS': 20,
+    'HAPTIC_ORDER': 'deferred', 'HAPTIC_TRIGGER_PIN': '',
+}
+
+SWEEP = {
+    'IDLE_SLEEP_MS': (0, 1, 10, 50),
+    'RECV_TIMEOUT_MS': (0, 10),
+    'DEBOUNCE_MS': (5, 20, 40),
+    'HAPTIC_ORDER': ('actuate', 'send', 'deferred'),
+    'HAPTIC_TRIGGER_PIN': ('', 'D6'),
+}
+
+HOLD_MS = 40
+GAP_MS = 60
+
+# ============================================================================
+# WORKER (one firmware boot per configuration)
+# ============================================================================
+
+def _osc_address(data):
+    return data[:data.index(b'\x00')]
+
+def _match_indices(starts, ends):
+    """Index of the first unused end time at or after each start time"""
+    indices = []
+    j = 0
+    for start in starts:
+        while j < len(ends) and ends[j] < start:
+            j += 1
+        if j == len(ends):
+            break
+        indices.append(j)
+        j += 1
+    return indices
+
+def _match(starts, ends):
+    """Latencies in ms between each start and its matching end (both ns)"""
+    return [(ends[j] - start) / 1e6 for start, j in zip(starts, _match_indices(starts, ends))]
+
+async def _scenario(pin, events, haptic_msg, device_port):
+    pc = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+    haptic_sent = []
+    for _ in range(events):
+        await pin.tap(HOLD_MS)
+        await asyncio.sleep(GAP_MS / 1000)
+        haptic_sent.append(time.perf_counter_ns())
+        pc.sendto(haptic_msg, ('127.0.0.1', device_port))
+        await asyncio.sleep(GAP_MS / 1000)
+    pc.close()
+    return haptic_sent
+
+def run_worker(settings, events):
+    from sim import adafruit_drv2605, board, socketpool
+    from sim.runner import DEFAULT_ENV, HeadlessController
+
+    from osc import build_osc_message
+
+    env = dict(settings, HEARTBEAT_MS=0)
+    sink = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+    sink.bind(('127.0.0.1', int(DEFAULT_ENV['PORT'])))
+    socketpool.sent_log = []
+    board.A0.history = []
+    board.STEMMA_I2C().realtime = True
+
+    with contextlib.redirect_stdout(open(os.devnull, 'w')):
+        controller = HeadlessController(env).start()
+        try:
+            haptic_sent = controller.call(_scenario(
+                board.A0, events, build_osc_message('/haptic/play'), int(DEFAULT_ENV['LISTEN_PORT'])
+            ))
+            controller.call(asyncio.sleep(0.1))
+            drv = adafruit_drv2605.instances[-1]
+        finally:
+            controller.stop()
+
+    presses = [t for t, value in board.A0.history if not value]
+    releases = [t for t, value in board.A0.history if value]
+    sent_press = [t for t, data in socketpool.sent_log if _osc_address(data) == b'/button/press']
+    sent_release = [t for t, data in socketpool.sent_log if _osc_address(data) == b'/button/release']
+    plays = [t_ns for _, t_ns, _ in drv.plays]
+    # Plays triggered locally by presses, and the rest
+    press_indices = _match_indices(presses, plays)
+    press_plays = set(press_indices)
+    remote_plays = [t for i, t in enumerate(plays) if i not in press_plays]
+
+    return {
+        'config': settings,
+        'press': summarize(_match(presses, sent_press)),
+        'release': summarize(_match(releases, sent_release)),
+        'buzz': summarize([(plays[j] - start) / 1e6 for start, j in zip(presses, press_indices)]),
+        'haptic': summarize(_match(haptic_sent, remote_plays)),
+    }
+
+# ============================================================================
+# DRIVER
+# ============================================================================
+
+def configurations(overrides):
+    """Baseline plus one-at-a-time variations, or the cross product of --set"""
+    if overrides:
+        keys = list(overrides)
+        for values in itertools.product(*(overrides[k] for k in keys)):
+            yield dict(BASELINE, **dict(zip(keys, values)))
+        return
+    yield dict(BASELINE)
+    for key, values in SWEEP.items():
+        for value in values:
+            if value != BASELINE[key]:
+                yield dict(BASELINE, **{key: value})
+
+def main():
+    parser = argparse.ArgumentParser(description="Press/release/haptic latency benchmark")
+    parser.add_argument('--events', type=int, default=50, help="presses per configuration")
+    add_sweep_arguments(parser)
+    parser.add_argument('--output', help="write JSON results to this path")
+    args = parser.parse_args()
+
+    if args.worker:
+        print(json.dumps(run_worker(json.loads(args.worker), args.events)))
+        return
+
+    keys = list(BASELINE)
+    widths = [max(17, len(k) + 2) for k in keys]
+    header = ''.join(f"{k:>{w}}" for k, w in zip(keys, widths))
+    print(f"{header}  {'path':<8}{'p50 ms':>9}{'p95 ms':>9}{'p99 ms':>9}{'max ms':>9}")
+    results = []
+    for settings in configurations(parse_overrides(args.set)):
+        result = run_configuration(__file__, settings, '--events', str(args.events))
+        results.append(result)
+        row = ''.join(f"{settings[k] if settings[k] != '' else '-':>{w}}" for k, w in zip(keys, widths))
+        for path in ('press', 'release', 'buzz', 'haptic'):
+            stats = result[path]
+            print(
+                f"{row}  {path:<8}{format_ms(stats['p50_ms']):>9}{format_ms(stats['p95_ms']):>9}"
+                f"{format_ms(stats['p99_ms']):>9}{format_ms(stats['max_ms']):>9}"
+            )
+            row = ' ' * len(row)
+
+    if args.output:
+        write_results(args.output, 'latency', results, events=args.events, hold_ms=HOLD_MS, gap_ms=GAP_MS)
+        print(f"Results written to {args.output}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,164 @@
+"""
+Loop Profiler Benchmark
+=======================
+Boots the firmware headless with the loop profiler on (PROFILE=1), taps the
+button and sends haptic commands for DURATION_S, then prints the per-stage
+histograms the device would report over /profile/get. It also measures the
+profiler's own cost:
+
+- per pass:  cost of the instrumentation every event loop pass runs (the
+             tick countdown, and tick() every few passes), timed in isolation
+- passes:    event loop passes in the run (sampled periods x PROFILE_SAMPLE)
+- overhead:  instrumentation time / run time, counting every pass and every
+             timed stage
+
+Usage:
+    python bench/loop_profile.py [--output results.json]
+    python bench/loop_profile.py --set PROFILE_SAMPLE=1,32
+"""
+
+import argparse
+import asyncio
+import contextlib
+import json
+import os
+import time
+
+from common import add_sweep_arguments, configurations, parse_overrides, run_configuration, write_results
+
+BASELINE = {'PROFILE_SAMPLE': 32}
+
+SWEEP = {
+    'PROFILE_SAMPLE': (1, 8, 32),
+}
+
+DURATION_S = 3
+TAP_PERIOD_MS = 50
+HAPTIC_PERIOD_MS = 200
+
+# ============================================================================
+# WORKER (one firmware boot per configuration)
+# ============================================================================
+
+async def _scenario(pin, pc):
+    end = time.monotonic() + DURATION_S
+    next_haptic = 0
+    while time.monotonic() < end:
+        await pin.tap(TAP_PERIOD_MS // 2)
+        await asyncio.sleep(TAP_PERIOD_MS / 2000)
+        if time.monotonic() >= next_haptic:
+            pc.send(b'/haptic/play\x00\x00\x00\x00,i\x00\x00\x00\x00\x00\x01')
+            next_haptic = time.monotonic() + HAPTIC_PERIOD_MS / 1000
+
+def _pass_cost_ns(sample, iterations=200000):
+    """Instrumentation cost of one event loop pass, measured in isolation"""
+    from profiler import Profiler
+
+    profile = Profiler()
+    profile.enable(True, sample=sample)
+    countdown = 1
+    start = time.perf_counter_ns()
+    for _ in range(iterations):
+        countdown -= 1
+        if not countdown:
+            countdown = profile.tick()
+    elapsed = time.perf_counter_ns() - start
+    start = time.perf_counter_ns()
+    for _ in range(iterations):
+        pass
+    return (elapsed - (time.perf_counter_ns() - start)) / iterations
+
+def _stage_cost_ns(iterations=100000):
+    """Cost of timing one stage (now() + add())"""
+    from profiler import SEND, Profiler
+
+    profile = Profiler()
+    profile.enable(True)
+    stage = SEND
+    start = time.perf_counter_ns()
+    for _ in range(iterations):
+        profile.add(stage, profile.now())
+    return (time.perf_counter_ns() - start) / iterations
+
+def run_worker(settings):
+    import sim
+    sim.install()
+    from sim import board
+    from sim.runner import DEFAULT_ENV, HeadlessController, PCListener
+
+    env = dict(settings, PROFILE=1)
+    pc = PCListener(int(DEFAULT_ENV['PORT']), int(DEFAULT_ENV['LISTEN_PORT']))
+
+    with contextlib.redirect_stdout(open(os.devnull, 'w')):
+        controller = HeadlessController(env).start()
+        try:
+            controller.firmware.profile.reset()
+            started = time.perf_counter_ns()
+            controller.call(_scenario(board.A0, pc))
+            run_ns = time.perf_counter_ns() - started
+        finally:
+            controller.stop()
+            pc.close()
+
+    profile = controller.firmware.profile
+    from profiler import LOOP, STAGES
+
+    pass_ns = _pass_cost_ns(profile.sample)
+    stage_ns = _stage_cost_ns()
+    passes = profile.histograms[LOOP].count * profile.sample
+    timed = sum(h.count for i, h in enumerate(profile.histograms) if i != LOOP)
+    overhead_ns = passes * pass_ns + timed * stage_ns
+    return {
+        'config': settings,
+        'stages': {
+            name: {
+                'count': h.count, 'mean_us': h.mean_us, 'p50_us': h.percentile_us(50),
+                'p99_us': h.percentile_us(99), 'max_us': h.max_us,
+            }
+            for name, h in zip(STAGES, profile.histograms)
+        },
+        'overruns': profile.overruns,
+        'passes': passes,
+        'pass_cost_ns': pass_ns,
+        'overhead_pct': 100 * overhead_ns / run_ns,
+    }
+
+# ============================================================================
+# DRIVER
+# ============================================================================
+
+def main():
+    parser = argparse.ArgumentParser(description="Loop profiler histograms and overhead")
+    add_sweep_arguments(parser)
+    parser.add_argument('--output', help="write JSON results to this path")
+    args = parser.parse_args()
+
+    if args.worker:
+        print(json.dumps(run_worker(json.loads(args.worker))))
+        return
+
+    results = []
+    for settings in configurations(BASELINE, SWEEP, parse_overrides(args.set)):
+        result = run_configuration(__file__, settings)
+        results.append(result)
+        print(f"PROFILE_SAMPLE={settings['PROFILE_SAMPLE']}")
+        print(f"  {'stage':<9}{'count':>8}{'mean us':>9}{'p50 us':>9}{'p99 us':>9}{'max us':>9}")
+        for name, stats in result['stages'].items():
+            print(
+                f"  {name:<9}{stats['count']:>8}{stats['mean_us']:>9}{stats['p50_us']:>9}"
+                f"{stats['p99_us']:>9}{stats['max_us']:>9}"
+            )
+        print(
+            f"  overruns {result['overruns']}, {result['passes']} passes, "
+            f"{result['pass_cost_ns']:.0f} ns/pass, overhead {result['overhead_pct']:.2f}% of run time"
+        )
+
+    if args.output:
+        write_results(
+            args.output, 'loop_profile', results, duration_s=DURATION_S,
+            tap_period_ms=TAP_PERIOD_MS, haptic_period_ms=HAPTIC_PERIOD_MS,
+        )
+        print(f"Results written to {args.output}")
+
+if __name__ == "__main__":
+    main()
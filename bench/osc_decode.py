@@ -0,0 +1,78 @@
+"""
+OSC Decoder Benchmark
+=====================
+Measures per-message heap allocations and decode time of OscMessage.decode()
+for messages with integer, float, string and blob arguments, decoded in
+place in a receive buffer.
+
+Every message is first checked to round-trip: decoding what
+build_osc_message() encoded gives back the arguments it was built from.
+
+Usage:
+    python bench/osc_decode.py [--iterations N] [--output results.json]
+"""
+
+import argparse
+
+from common import write_results
+from osc_encode import measure_allocations, measure_time_us
+
+from osc import OscMessage, build_osc_message
+
+MESSAGES = {
+    'int': ('/haptic/play', 47),
+    'float': ('/clock/offset', 0.5),
+    'string': ('/button/release', 'test', 123456),
+    'mixed': ('/mixed', 'abc', 5, b'\x01\x02\x03', 0.5),
+    'blob first': ('/mixed', b'xy', 'z', 7, 1.5),
+}
+
+def encode(address, *args):
+    """Receive buffer holding the message, with room to spare after it"""
+    data = build_osc_message(address, *args)
+    return bytearray(data + b'\x00' * 8), len(data)
+
+def check_round_trip(message, address, *args):
+    """Decoding the encoded message gives back its address and arguments"""
+    buffer, length = encode(address, *args)
+    assert message.decode(buffer, length), (address, args)
+    assert message.address == address, message.address
+    decoded = tuple(
+        bytes(arg) if isinstance(arg, memoryview) else arg
+        for arg in message.args[:message.count]
+    )
+    expected = tuple(arg.encode() if isinstance(arg, str) else arg for arg in args)
+    assert decoded == expected, (decoded, expected)
+
+def main():
+    parser = argparse.ArgumentParser(description="OSC in-place decoder benchmark")
+    parser.add_argument('--iterations', type=int, default=1000)
+    parser.add_argument('--output', help="write JSON results to this path")
+    args = parser.parse_args()
+
+    message = OscMessage()
+    for contents in MESSAGES.values():
+        check_round_trip(message, *contents)
+
+    print(f"{'message':<12}{'bytes/msg':>12}{'us/msg':>10}")
+    results = []
+    for name, contents in MESSAGES.items():
+        buffer, length = encode(*contents)
+
+        def decode():
+            return message.decode(buffer, length)
+
+        result = {
+            'message': name,
+            'bytes_per_message': measure_allocations(decode, args.iterations),
+            'us_per_message': measure_time_us(decode, args.iterations),
+        }
+        results.append(result)
+        print(f"{name:<12}{result['bytes_per_message']:>12.1f}{result['us_per_message']:>10.2f}")
+
+    if args.output:
+        write_results(args.output, 'osc_decode', results, iterations=args.iterations)
+        print(f"Results written to {args.output}")
+
+if __name__ == "__main__":
+    main()
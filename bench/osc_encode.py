@@ -0,0 +1,127 @@
+"""
+OSC Encoder Benchmark
+=====================
+Compares per-message heap allocations and encode time of the dynamic
+build_osc_message() encoder against the precompiled OscTemplate path.
+
+Runs on the host (allocations measured with tracemalloc) or on the device
+when copied next to osc.py (allocations measured with gc.mem_alloc).
+
+Usage:
+    python bench/osc_encode.py [--iterations N] [--output results.json]
+"""
+
+import sys
+import time
+
+try:
+    import os
+    sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+except (ImportError, AttributeError):
+    pass  # On device osc.py sits next to this file
+
+from osc import OscTemplate, build_osc_message
+
+try:
+    import tracemalloc
+except ImportError:
+    tracemalloc = None
+import gc
+
+def noop():
+    return None
+
+def measure_allocations(fn, iterations):
+    """Return bytes allocated per call of fn(), net of the call overhead"""
+    if fn is not noop:
+        return max(0.0, _allocations(fn, iterations) - _allocations(noop, iterations))
+    return _allocations(fn, iterations)
+
+def _allocations(fn, iterations):
+    fn()  # Warm up any lazily created state
+    if tracemalloc is not None:
+        gc.collect()
+        tracemalloc.start()
+        tracemalloc.reset_peak()
+        base, _ = tracemalloc.get_traced_memory()
+        total = 0
+        for _ in range(iterations):
+            tracemalloc.reset_peak()
+            fn()
+            _, peak = tracemalloc.get_traced_memory()
+            total += peak - base
+        tracemalloc.stop()
+        return total / iterations
+    gc.collect()
+    gc.disable()
+    before = gc.mem_alloc()
+    for _ in range(iterations):
+        fn()
+    after = gc.mem_alloc()
+    gc.enable()
+    return (after - before) / iterations
+
+def parse_arguments(description, iterations=1000):
+    """
+    (iterations, output path or None) from --iterations and --output; the
+    defaults on the device, which has no argparse
+    """
+    try:
+        import argparse
+    except ImportError:
+        return iterations, None
+    parser = argparse.ArgumentParser(description=description)
+    parser.add_argument('--iterations', type=int, default=iterations)
+    parser.add_argument('--output', help="write JSON results to this path")
+    args = parser.parse_args()
+    return args.iterations, args.output
+
+def measure_time_us(fn, iterations):
+    """Return mean microseconds per call of fn()"""
+    start = time.monotonic_ns()
+    for _ in range(iterations):
+        fn()
+    return (time.monotonic_ns() - start) / iterations / 1000
+
+def main():
+    iterations, output = parse_arguments("OSC dynamic encoder vs precompiled templates")
+
+    press = OscTemplate('/button/press', 33, 0)
+    release = OscTemplate('/button/release', "test")
+
+    def dynamic_press():
+        return build_osc_message('/button/press', 33, 123456)
+
+    def dynamic_release():
+        return build_osc_message('/button/release', "test")
+
+    def template_press():
+        press.set_int(1, 123456)
+        return press.buffer
+
+    def template_release():
+        return release.buffer
+
+    assert bytes(template_press()) == dynamic_press()
+    assert bytes(template_release()) == dynamic_release()
+
+    print(f"{'encoder':<20}{'bytes/msg':>12}{'us/msg':>10}")
+    results = []
+    for name, fn in (
+        ('dynamic press', dynamic_press),
+        ('template press', template_press),
+        ('dynamic release', dynamic_release),
+        ('template release', template_release),
+    ):
+        allocated = measure_allocations(fn, iterations)
+        elapsed = measure_time_us(fn, iterations)
+        results.append({'encoder': name, 'bytes_per_message': allocated, 'us_per_message': elapsed})
+        print(f"{name:<20}{allocated:>12.1f}{elapsed:>10.2f}")
+
+    if output:
+        from common import write_results
+        write_results(output, 'osc_encode', results, iterations=iterations)
+        print(f"Results written to {output}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,162 @@
+"""
+WiFi Reconnect Benchmark
+========================
+Boots the firmware headless, taps the button every TAP_PERIOD_MS and kills
+the simulated WiFi link for OUTAGE_MS, repeatedly. The simulated radio takes
+CONNECT_MS to associate plus SCAN_MS when it has to scan for the AP, which
+a rejoin with the cached BSSID and channel skips. For each configuration it
+reports:
+
+- reconnect: link loss detected -> sockets re-created (/button/reconnected)
+- recovery:  link restored -> next press delivered to the PC
+- rehandshake: link restored -> handshake acked again
+- presses delivered before, during and after each outage
+
+Usage:
+    python bench/reconnect.py [--outages N] [--output results.json]
+    python bench/reconnect.py --set WIFI_FAST_RECONNECT=1 --set WIFI_CHECK_MS=100,500
+"""
+
+import argparse
+import asyncio
+import contextlib
+import json
+import os
+import struct
+import time
+
+from common import (
+    add_sweep_arguments, configurations, format_ms, parse_overrides, run_configuration, summarize,
+    write_results,
+)
+
+BASELINE = {'WIFI_FAST_RECONNECT': 1, 'WIFI_CHECK_MS': 500}
+
+SWEEP = {
+    'WIFI_FAST_RECONNECT': (0, 1),
+    'WIFI_CHECK_MS': (100, 500),
+}
+
+OUTAGE_MS = 1000
+CONNECT_MS = 200
+SCAN_MS = 1500
+TAP_PERIOD_MS = 100
+SETTLE_MS = 4000
+
+# ============================================================================
+# WORKER (one firmware boot per configuration)
+# ============================================================================
+
+async def _tapper(pin, stop):
+    while not stop.is_set():
+        await pin.tap(TAP_PERIOD_MS // 2)
+        await asyncio.sleep(TAP_PERIOD_MS / 2000)
+
+async def _scenario(radio, pin, outages):
+    """Tap throughout; drop the link for OUTAGE_MS every SETTLE_MS"""
+    stop = asyncio.Event()
+    tapper = asyncio.create_task(_tapper(pin, stop))
+    restored = []
+    for _ in range(outages):
+        await asyncio.sleep(SETTLE_MS / 2000)
+        radio.drop_link()
+        await asyncio.sleep(OUTAGE_MS / 1000)
+        radio.restore_link()
+        restored.append(time.perf_counter_ns())
+        await asyncio.sleep(SETTLE_MS / 2000)
+    stop.set()
+    await tapper
+    return restored
+
+def _after(times, t):
+    """First time in sorted times at or after t, or None"""
+    for candidate in times:
+        if candidate >= t:
+            return candidate
+    return None
+
+def run_worker(settings, outages):
+    import sim
+    sim.install()
+    from sim import board, wifi
+    from sim.runner import DEFAULT_ENV, HeadlessController, PCListener
+
+    env = dict(settings, HEARTBEAT_MS=0, CLOCK_SYNC_MS=0)
+    pc = PCListener(int(DEFAULT_ENV['PORT']), int(DEFAULT_ENV['LISTEN_PORT']))
+    board.A0.history = []
+    wifi.radio.configure(connect_latency_s=CONNECT_MS / 1000, scan_latency_s=SCAN_MS / 1000)
+
+    with contextlib.redirect_stdout(open(os.devnull, 'w')):
+        controller = HeadlessController(env).start(timeout=30)
+        try:
+            restored = controller.call(_scenario(wifi.radio, board.A0, outages))
+        finally:
+            controller.stop()
+            pc.close()
+
+    presses = [t for t, data in pc.received if data.startswith(b'/button/press\x00')]
+    handshakes = [t for t, data in pc.received if data.startswith(b'/button/handshake\x00')]
+    reconnects = [
+        struct.unpack_from('>i', data, 32)[0]
+        for _, data in pc.received if data.startswith(b'/button/reconnected\x00')
+    ]
+    recovery = []
+    rehandshake = []
+    for t in restored:
+        press = _after(presses, t)
+        if press is not None:
+            recovery.append((press - t) / 1e6)
+        handshake = _after(handshakes, t)
+        if handshake is not None:
+            rehandshake.append((handshake - t) / 1e6)
+    taps = sum(1 for _, value in board.A0.history if not value)
+    return {
+        'config': settings,
+        'outages': len(restored),
+        'reconnects': len(reconnects),
+        'reconnect': summarize(reconnects),
+        'recovery': summarize(recovery),
+        'rehandshake': summarize(rehandshake),
+        'taps': taps,
+        'delivered': len(presses),
+    }
+
+# ============================================================================
+# DRIVER
+# ============================================================================
+
+def main():
+    parser = argparse.ArgumentParser(description="WiFi link loss and reconnect benchmark")
+    parser.add_argument('--outages', type=int, default=3, help="link outages per configuration")
+    add_sweep_arguments(parser)
+    parser.add_argument('--output', help="write JSON results to this path")
+    args = parser.parse_args()
+
+    if args.worker:
+        print(json.dumps(run_worker(json.loads(args.worker), args.outages)))
+        return
+
+    keys = list(BASELINE)
+    header = ''.join(f"{k:>21}" for k in keys)
+    print(f"{header}  {'metric':<12}{'p50 ms':>9}{'max ms':>9}   delivered")
+    results = []
+    for settings in configurations(BASELINE, SWEEP, parse_overrides(args.set)):
+        result = run_configuration(__file__, settings, '--outages', str(args.outages))
+        results.append(result)
+        row = ''.join(f"{settings[k]:>21}" for k in keys)
+        delivered = f"{result['delivered']}/{result['taps']} presses, {result['reconnects']}/{result['outages']} rejoins"
+        for metric in ('reconnect', 'recovery', 'rehandshake'):
+            stats = result[metric]
+            print(f"{row}  {metric:<12}{format_ms(stats['p50_ms']):>9}{format_ms(stats['max_ms']):>9}   {delivered}")
+            row = ' ' * len(row)
+            delivered = ''
+
+    if args.output:
+        write_results(
+            args.output, 'reconnect', results, outages=args.outages, outage_ms=OUTAGE_MS,
+            connect_ms=CONNECT_MS, scan_ms=SCAN_MS, tap_period_ms=TAP_PERIOD_MS,
+        )
+        print(f"Results written to {args.output}")
+
+if __name__ == "__main__":
+    main()
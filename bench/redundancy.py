@@ -0,0 +1,163 @@
+"""
+Event Redundancy Benchmark
+==========================
+Boots the firmware headless and taps the button at a rhythm-game pace over a
+simulated link that drops LOSS percent of datagrams in each direction. Each
+event datagram carries up to K copies of the events before it
+(REDUNDANCY=K). With ADAPTIVE=1 the PC reports the loss it sees and the
+device lowers K to what that loss requires. For each configuration it
+reports:
+
+- delivered: share of press/release events the PC recovered
+- B/event:   bytes sent per event (bandwidth cost of the copies)
+- final K:   copies carried by the last event datagram
+- latency:   simulated pin edge -> first copy received by the PC
+
+Usage:
+    python bench/redundancy.py [--taps N] [--output results.json]
+    python bench/redundancy.py --set REDUNDANCY=2 --set LOSS=5,10
+"""
+
+import argparse
+import asyncio
+import contextlib
+import itertools
+import json
+import os
+import struct
+
+from common import (
+    add_sweep_arguments, first_arrivals, format_ms, parse_overrides, run_configuration, summarize,
+    write_results,
+)
+
+MODES = (
+    {'REDUNDANCY': 0, 'ADAPTIVE': 0},
+    {'REDUNDANCY': 1, 'ADAPTIVE': 0},
+    {'REDUNDANCY': 2, 'ADAPTIVE': 0},
+    {'REDUNDANCY': 3, 'ADAPTIVE': 0},
+    {'REDUNDANCY': 3, 'ADAPTIVE': 1},
+)
+
+LOSSES = (1, 5, 10, 20)
+
+HOLD_MS = 30
+GAP_MS = 30
+
+# ============================================================================
+# WORKER (one firmware boot per configuration)
+# ============================================================================
+
+EVENT_ADDRESSES = (b'/button/press', b'/button/release')
+
+def _messages(data):
+    """(address, trailing int) of every message in a datagram"""
+    from osc import walk_bundle
+
+    messages = []
+
+    def on_message(buffer, start, end, timetag):
+        address = bytes(buffer[start:buffer.index(b'\x00', start)])
+        messages.append((address, struct.unpack_from('>i', buffer, end - 4)[0]))
+
+    walk_bundle(data, len(data), on_message)
+    return messages
+
+async def _scenario(pin, taps):
+    for _ in range(taps):
+        await pin.tap(HOLD_MS)
+        await asyncio.sleep(GAP_MS / 1000)
+    await asyncio.sleep(0.1)
+
+def run_worker(settings, taps):
+    import sim
+    sim.install()
+    from sim import board, socketpool
+    from sim.runner import DEFAULT_ENV, HeadlessController, PCListener
+
+    numbered = settings['REDUNDANCY'] > 0
+    env = {'REDUNDANCY': settings['REDUNDANCY'], 'HEARTBEAT_MS': 0, 'CLOCK_SYNC_MS': 0}
+    pc = PCListener(
+        int(DEFAULT_ENV['PORT']), int(DEFAULT_ENV['LISTEN_PORT']), report_loss=bool(settings['ADAPTIVE']),
+    )
+    board.A0.history = []
+    socketpool.sent_log = []
+
+    with contextlib.redirect_stdout(open(os.devnull, 'w')):
+        controller = HeadlessController(env).start()
+        try:
+            socketpool.set_loss(settings['LOSS'] / 100)
+            controller.call(_scenario(board.A0, taps))
+        finally:
+            controller.stop()
+            pc.close()
+
+    edges = [(t, b'/button/release' if value else b'/button/press') for t, value in board.A0.history]
+    arrivals = []
+    for t, data in pc.received:
+        for address, seq in _messages(data):
+            if address in EVENT_ADDRESSES:
+                arrivals.append((t, address, seq if numbered else None))
+    sent = [
+        (data, _messages(data)) for _, data in socketpool.sent_log
+        if data.startswith(EVENT_ADDRESSES) or data.startswith(b'#bundle')
+    ]
+    latencies = first_arrivals(edges, arrivals)
+    return {
+        'config': settings,
+        'events': len(edges),
+        'delivered': len(latencies),
+        'bytes_per_event': sum(len(data) for data, _ in sent) / len(edges) if edges else 0.0,
+        'final_copies': len(sent[-1][1]) - 1 if sent else 0,
+        'loss_reports': pc.loss_reports,
+        'latency': summarize(latencies),
+    }
+
+# ============================================================================
+# DRIVER
+# ============================================================================
+
+def configurations(overrides):
+    """Every redundancy mode at every loss rate, or the cross product of --set"""
+    modes = MODES
+    if 'REDUNDANCY' in overrides or 'ADAPTIVE' in overrides:
+        modes = [
+            {'REDUNDANCY': k, 'ADAPTIVE': a}
+            for k in overrides.get('REDUNDANCY', (3,)) for a in overrides.get('ADAPTIVE', (0,))
+        ]
+    for mode, loss in itertools.product(modes, overrides.get('LOSS', LOSSES)):
+        yield dict(mode, LOSS=loss)
+
+def main():
+    parser = argparse.ArgumentParser(description="Redundant event delivery under simulated loss")
+    parser.add_argument('--taps', type=int, default=150, help="button taps per configuration")
+    add_sweep_arguments(parser)
+    parser.add_argument('--output', help="write JSON results to this path")
+    args = parser.parse_args()
+
+    if args.worker:
+        print(json.dumps(run_worker(json.loads(args.worker), args.taps)))
+        return
+
+    print(
+        f"{'K':>3}{'adaptive':>10}{'loss %':>8}{'delivered':>11}{'B/event':>9}{'final K':>9}"
+        f"{'p50 ms':>9}{'p95 ms':>9}{'max ms':>9}"
+    )
+    results = []
+    for settings in configurations(parse_overrides(args.set)):
+        result = run_configuration(__file__, settings, '--taps', str(args.taps))
+        results.append(result)
+        stats = result['latency']
+        delivered = result['delivered'] / result['events'] if result['events'] else 0.0
+        print(
+            f"{settings['REDUNDANCY']:>3}{settings['ADAPTIVE']:>10}{settings['LOSS']:>8}{delivered:>11.1%}"
+            f"{result['bytes_per_event']:>9.1f}{result['final_copies']:>9}"
+            f"{format_ms(stats['p50_ms']):>9}{format_ms(stats['p95_ms']):>9}{format_ms(stats['max_ms']):>9}"
+        )
+
+    if args.output:
+        write_results(args.output, 'redundancy', results, taps=args.taps, hold_ms=HOLD_MS, gap_ms=GAP_MS)
+        print(f"Results written to {args.output}")
+
+if __name__ == "__main__":
+    main()
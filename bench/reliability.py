@@ -0,0 +1,146 @@
+"""
+Reliable Delivery Benchmark
+===========================
+Boots the firmware headless, taps the button over a simulated lossy link
+and checks what the PC received, with and without RELIABLE=1. The link drops
+LOSS percent of datagrams in each direction, so acks are lost too. For each
+configuration it reports:
+
+- delivered: share of press/release events that reached the PC at least once
+- dup:       extra copies the PC received (retransmits whose ack was lost)
+- retx:      event datagrams sent per event
+- latency:   simulated pin edge -> first copy received by the PC
+
+It exits non-zero if RELIABLE=1 delivers less than every event at up to
+MAX_RELIABLE_LOSS percent loss.
+
+Usage:
+    python bench/reliability.py [--taps N] [--output results.json]
+    python bench/reliability.py --set RELIABLE=1 --set LOSS=0,30
+"""
+
+import argparse
+import asyncio
+import contextlib
+import json
+import os
+import struct
+import sys
+
+from common import (
+    add_sweep_arguments, configurations, first_arrivals, format_ms, parse_overrides,
+    run_configuration, summarize, write_results,
+)
+
+BASELINE = {'RELIABLE': 0, 'LOSS': 0}
+
+SWEEP = {
+    'RELIABLE': (0, 1),
+    'LOSS': (0, 1, 5, 20),
+}
+
+MAX_RELIABLE_LOSS = 20  # Loss up to which RELIABLE=1 must deliver everything
+
+HOLD_MS = 40
+GAP_MS = 60
+
+# ============================================================================
+# WORKER (one firmware boot per configuration)
+# ============================================================================
+
+EVENT_ADDRESSES = (b'/button/press', b'/button/release')
+
+def _arrivals(received, reliable):
+    """(ns, address, seq) of every press/release message the PC received"""
+    arrivals = []
+    for t, data in received:
+        address = data[:data.index(b'\x00')]
+        if address in EVENT_ADDRESSES:
+            seq = struct.unpack_from('>i', data, len(data) - 4)[0] if reliable else None
+            arrivals.append((t, address, seq))
+    return arrivals
+
+async def _scenario(pin, taps):
+    for _ in range(taps):
+        await pin.tap(HOLD_MS)
+        await asyncio.sleep(GAP_MS / 1000)
+    await asyncio.sleep(1.0)  # Let the last retransmits finish
+
+def run_worker(settings, taps):
+    import sim
+    sim.install()
+    from sim import board, socketpool
+    from sim.runner import DEFAULT_ENV, HeadlessController, PCListener
+
+    reliable = bool(settings['RELIABLE'])
+    env = {'RELIABLE': settings['RELIABLE'], 'HEARTBEAT_MS': 0, 'CLOCK_SYNC_MS': 0}
+    pc = PCListener(int(DEFAULT_ENV['PORT']), int(DEFAULT_ENV['LISTEN_PORT']), ack_events=reliable)
+    board.A0.history = []
+    socketpool.sent_log = []
+
+    with contextlib.redirect_stdout(open(os.devnull, 'w')):
+        controller = HeadlessController(env).start()
+        try:
+            socketpool.set_loss(settings['LOSS'] / 100)
+            controller.call(_scenario(board.A0, taps))
+        finally:
+            controller.stop()
+            pc.close()
+
+    edges = [(t, b'/button/release' if value else b'/button/press') for t, value in board.A0.history]
+    sent = [data for _, data in socketpool.sent_log if data[:data.index(b'\x00')] in EVENT_ADDRESSES]
+    arrivals = _arrivals(pc.received, reliable)
+    latencies = first_arrivals(edges, arrivals)
+    return {
+        'config': settings,
+        'events': len(edges),
+        'delivered': len(latencies),
+        'duplicates': len(arrivals) - len(latencies),
+        'sends_per_event': len(sent) / len(edges) if edges else 0.0,
+        'latency': summarize(latencies),
+    }
+
+# ============================================================================
+# DRIVER
+# ============================================================================
+
+def main():
+    parser = argparse.ArgumentParser(description="Reliable delivery under simulated loss")
+    parser.add_argument('--taps', type=int, default=50, help="button taps per configuration")
+    add_sweep_arguments(parser)
+    parser.add_argument('--output', help="write JSON results to this path")
+    args = parser.parse_args()
+
+    if args.worker:
+        print(json.dumps(run_worker(json.loads(args.worker), args.taps)))
+        return
+
+    print(
+        f"{'reliable':>9}{'loss %':>8}{'delivered':>11}{'dup':>6}{'retx':>7}"
+        f"{'p50 ms':>9}{'p95 ms':>9}{'max ms':>9}"
+    )
+    results = []
+    failures = []
+    for settings in configurations(BASELINE, SWEEP, parse_overrides(args.set)):
+        result = run_configuration(__file__, settings, '--taps', str(args.taps))
+        results.append(result)
+        stats = result['latency']
+        delivered = result['delivered'] / result['events'] if result['events'] else 0.0
+        print(
+            f"{settings['RELIABLE']:>9}{settings['LOSS']:>8}{delivered:>11.1%}{result['duplicates']:>6}"
+            f"{result['sends_per_event']:>7.2f}"
+            f"{format_ms(stats['p50_ms']):>9}{format_ms(stats['p95_ms']):>9}{format_ms(stats['max_ms']):>9}"
+        )
+        if settings['RELIABLE'] and settings['LOSS'] <= MAX_RELIABLE_LOSS and result['delivered'] < result['events']:
+            failures.append(
+                f"RELIABLE=1 delivered {result['delivered']}/{result['events']} events at {settings['LOSS']}% loss"
+            )
+
+    if args.output:
+        write_results(args.output, 'reliability', results, taps=args.taps, hold_ms=HOLD_MS, gap_ms=GAP_MS)
+        print(f"Results written to {args.output}")
+    if failures:
+        sys.exit('\n'.join(f"✗ {failure}" for failure in failures))
+
+if __name__ == "__main__":
+    main()
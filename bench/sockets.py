@@ -0,0 +1,151 @@
+"""
+UDP Socket Mode Benchmark
+=========================
+Boots the firmware headless with a separate send socket (DUPLEX_SOCKET=0) or
+a single duplex socket bound to LISTEN_PORT (DUPLEX_SOCKET=1), with and
+without REPLY_TO_SOURCE. For each configuration it reports:
+
+- sockets:   UDP sockets the device opened (host UDP sockets the boot added)
+- heap:      socket heap from the /button/boot report (-1 off device)
+- handshakes: /button/handshake sent in the first second; 1 means the
+             PC's ack came back through the receive path
+- replies:   where a press went after the PC sent a command from another
+             port: 'PORT' (PC_IP:PORT) or 'source' (the command's source)
+
+Usage:
+    python bench/sockets.py [--output results.json]
+    python bench/sockets.py --set DUPLEX_SOCKET=1 --set REPLY_TO_SOURCE=0,1
+"""
+
+import argparse
+import contextlib
+import json
+import os
+import socket
+import struct
+import time
+
+from common import add_sweep_arguments, configurations, parse_overrides, run_configuration, write_results
+
+BASELINE = {'DUPLEX_SOCKET': 0, 'REPLY_TO_SOURCE': 0}
+
+SWEEP = {
+    'DUPLEX_SOCKET': (0, 1),
+    'REPLY_TO_SOURCE': (0, 1),
+}
+
+# ============================================================================
+# WORKER (one firmware boot per configuration)
+# ============================================================================
+
+def _host_sockets():
+    """Open UDP socket file descriptors of this process (Linux only)"""
+    try:
+        with open('/proc/net/udp') as f:
+            udp = {line.split()[9] for line in f.readlines()[1:]}
+        fds = os.listdir('/proc/self/fd')
+    except OSError:
+        return -1
+    count = 0
+    for fd in fds:
+        try:
+            link = os.readlink(f'/proc/self/fd/{fd}')
+        except OSError:
+            continue
+        count += link.startswith('socket:[') and link[8:-1] in udp
+    return count
+
+def _wait_for(predicate, timeout=2.0):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline and not predicate():
+        time.sleep(0.01)
+    return predicate()
+
+def _recv_press(sock):
+    try:
+        while True:
+            data = sock.recv(2048)
+            if data.startswith(b'/button/press\x00'):
+                return True
+    except OSError:
+        return False
+
+def run_worker(settings):
+    import sim
+    sim.install()
+    from sim import board
+    from sim.runner import DEFAULT_ENV, HeadlessController, PCListener
+
+    env = dict(settings, HEARTBEAT_MS=0, CLOCK_SYNC_MS=0)
+    device_port = int(DEFAULT_ENV['LISTEN_PORT'])
+    pc = PCListener(int(DEFAULT_ENV['PORT']), device_port)
+    # A second PC socket on an ephemeral port, to see where replies go
+    other = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+    other.bind(('127.0.0.1', 0))
+    other.settimeout(0.5)
+    baseline = _host_sockets()
+
+    with contextlib.redirect_stdout(open(os.devnull, 'w')):
+        controller = HeadlessController(env).start()
+        try:
+            sockets = _host_sockets() - baseline
+            time.sleep(1.0)
+            handshakes = pc.addresses().count('/button/handshake')
+            # Sent before the command below, so it went to PC_IP:PORT
+            controller.call(board.A0.tap(20))
+            _wait_for(lambda: any(data.startswith(b'/button/press\x00') for _, data in pc.received))
+            other.sendto(b'/haptic/play\x00\x00\x00\x00,i\x00\x00' + struct.pack('>i', 1), ('127.0.0.1', device_port))
+            time.sleep(0.1)
+            presses = sum(1 for _, data in pc.received if data.startswith(b'/button/press\x00'))
+            controller.call(board.A0.tap(20))
+            to_source = _recv_press(other)
+            _wait_for(lambda: sum(1 for _, data in pc.received if data.startswith(b'/button/press\x00')) > presses, 0.5)
+        finally:
+            controller.stop()
+            pc.close()
+
+    boot = next(data for _, data in pc.received if data.startswith(b'/button/boot\x00'))
+    # Address (16 bytes) and ",iiiiiiii" tags (12 bytes), then device id,
+    # five phase durations, sockets and socket heap
+    report = struct.unpack_from('>8i', boot, 28)
+    other.close()
+    return {
+        'config': settings,
+        'sockets': sockets,
+        'reported_sockets': report[6],
+        'socket_heap': report[7],
+        'handshakes': handshakes,
+        'replies': 'source' if to_source else 'PORT',
+    }
+
+# ============================================================================
+# DRIVER
+# ============================================================================
+
+def main():
+    parser = argparse.ArgumentParser(description="Single duplex socket vs separate send socket")
+    add_sweep_arguments(parser)
+    parser.add_argument('--output', help="write JSON results to this path")
+    args = parser.parse_args()
+
+    if args.worker:
+        print(json.dumps(run_worker(json.loads(args.worker))))
+        return
+
+    print(f"{'duplex':>7}{'reply src':>10}{'sockets':>9}{'reported':>10}{'heap B':>8}{'handshakes':>12}{'replies':>9}")
+    results = []
+    for settings in configurations(BASELINE, SWEEP, parse_overrides(args.set)):
+        result = run_configuration(__file__, settings)
+        results.append(result)
+        print(
+            f"{settings['DUPLEX_SOCKET']:>7}{settings['REPLY_TO_SOURCE']:>10}{result['sockets']:>9}"
+            f"{result['reported_sockets']:>10}{result['socket_heap']:>8}"
+            f"{result['handshakes']:>12}{result['replies']:>9}"
+        )
+
+    if args.output:
+        write_results(args.output, 'sockets', results)
+        print(f"Results written to {args.output}")
+
+if __name__ == "__main__":
+    main()
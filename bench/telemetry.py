@@ -0,0 +1,132 @@
+"""
+Telemetry Polling Benchmark
+===========================
+Boots the firmware headless, taps the button and has the PC poll
+/device/stats at POLL_HZ while it does. Each /button/stats reply is a
+preallocated template, so polling should leave button latency unchanged.
+For each configuration it reports:
+
+- replies:  /button/stats replies received per poll sent
+- latency:  simulated pin edge -> press/release received by the PC
+
+Usage:
+    python bench/telemetry.py [--taps N] [--output results.json]
+    python bench/telemetry.py --set POLL_HZ=0,10,100
+"""
+
+import argparse
+import asyncio
+import contextlib
+import json
+import os
+
+from common import (
+    add_sweep_arguments, configurations, first_arrivals, format_ms, parse_overrides,
+    run_configuration, summarize, write_results,
+)
+
+BASELINE = {'POLL_HZ': 0}
+
+SWEEP = {
+    'POLL_HZ': (0, 10, 100),
+}
+
+HOLD_MS = 30
+GAP_MS = 45
+
+STATS_QUERY = b'/device/stats\x00\x00\x00,\x00\x00\x00'
+
+# ============================================================================
+# WORKER (one firmware boot per configuration)
+# ============================================================================
+
+EVENT_ADDRESSES = (b'/button/press', b'/button/release')
+
+async def _taps(pin, taps):
+    for _ in range(taps):
+        await pin.tap(HOLD_MS)
+        await asyncio.sleep(GAP_MS / 1000)
+
+async def _poll(pc, hz, stop):
+    polls = 0
+    while hz and not stop.is_set():
+        pc.send(STATS_QUERY)
+        polls += 1
+        await asyncio.sleep(1 / hz)
+    return polls
+
+async def _scenario(pin, pc, taps, hz):
+    stop = asyncio.Event()
+    poller = asyncio.create_task(_poll(pc, hz, stop))
+    await _taps(pin, taps)
+    await asyncio.sleep(0.1)
+    stop.set()
+    return await poller
+
+def run_worker(settings, taps):
+    import sim
+    sim.install()
+    from sim import board
+    from sim.runner import DEFAULT_ENV, HeadlessController, PCListener
+
+    env = {'HEARTBEAT_MS': 0, 'CLOCK_SYNC_MS': 0}
+    pc = PCListener(int(DEFAULT_ENV['PORT']), int(DEFAULT_ENV['LISTEN_PORT']))
+    board.A0.history = []
+
+    with contextlib.redirect_stdout(open(os.devnull, 'w')):
+        controller = HeadlessController(env).start()
+        try:
+            polls = controller.call(_scenario(board.A0, pc, taps, settings['POLL_HZ']))
+        finally:
+            controller.stop()
+            pc.close()
+
+    edges = [(t, b'/button/release' if value else b'/button/press') for t, value in board.A0.history]
+    arrivals = []
+    replies = 0
+    for t, data in pc.received:
+        address = data[:data.index(b'\x00')]
+        if address in EVENT_ADDRESSES:
+            arrivals.append((t, address, None))
+        elif address == b'/button/stats':
+            replies += 1
+    return {
+        'config': settings,
+        'polls': polls,
+        'replies': replies,
+        'latency': summarize(first_arrivals(edges, arrivals)),
+    }
+
+# ============================================================================
+# DRIVER
+# ============================================================================
+
+def main():
+    parser = argparse.ArgumentParser(description="Button latency while polling /device/stats")
+    parser.add_argument('--taps', type=int, default=100, help="button taps per configuration")
+    add_sweep_arguments(parser)
+    parser.add_argument('--output', help="write JSON results to this path")
+    args = parser.parse_args()
+
+    if args.worker:
+        print(json.dumps(run_worker(json.loads(args.worker), args.taps)))
+        return
+
+    print(f"{'poll Hz':>8}{'replies':>12}{'n':>6}{'p50 ms':>9}{'p95 ms':>9}{'p99 ms':>9}{'max ms':>9}")
+    results = []
+    for settings in configurations(BASELINE, SWEEP, parse_overrides(args.set)):
+        result = run_configuration(__file__, settings, '--taps', str(args.taps))
+        results.append(result)
+        stats = result['latency']
+        print(
+            f"{settings['POLL_HZ']:>8}{result['replies']:>6}/{result['polls']:<5}{stats['n']:>6}"
+            f"{format_ms(stats['p50_ms']):>9}{format_ms(stats['p95_ms']):>9}"
+            f"{format_ms(stats['p99_ms']):>9}{format_ms(stats['max_ms']):>9}"
+        )
+
+    if args.output:
+        write_results(args.output, 'telemetry', results, taps=args.taps, hold_ms=HOLD_MS, gap_ms=GAP_MS)
+        print(f"Results written to {args.output}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,98 @@
+"""
+UDP Send Path Benchmark
+=======================
+Compares the per-datagram cost of the ways the firmware has sent to the PC:
+
+- socket per send:  the old ping_test(): new SocketPool and socket each time
+- sendto(config):   sendto() with (config['PC_IP'], config['PORT']) built per call
+- sendto(address):  sendto() with the destination tuple built once
+- UdpSender.send:   send() on the socket connected to the PC once
+
+Runs on the host against loopback (socketpool simulated over host sockets)
+or on the device when copied next to transport.py and osc_encode.py, with
+WiFi connected and PC_IP/PORT set in settings.toml.
+
+Usage:
+    python bench/udp_send.py [--iterations N] [--output results.json]
+"""
+
+import sys
+
+try:
+    import os
+    sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+except (ImportError, AttributeError):
+    pass  # On device transport.py sits next to this file
+
+from osc_encode import measure_allocations, measure_time_us, parse_arguments
+
+def make_pool():
+    """(pool factory, config, receiving socket or None)"""
+    try:
+        import socketpool
+        import wifi
+        config = {'PC_IP': os.getenv("PC_IP"), 'PORT': int(os.getenv("PORT", 5000))}
+        return (lambda: socketpool.SocketPool(wifi.radio)), config, None
+    except ImportError:
+        import socket
+        import sim
+        sim.install()
+        from sim.socketpool import SocketPool
+        sink = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        sink.bind(('127.0.0.1', 0))
+        config = {'PC_IP': '127.0.0.1', 'PORT': sink.getsockname()[1]}
+        return (lambda: SocketPool(None)), config, sink
+
+def main():
+    iterations, output = parse_arguments("Per-datagram cost of the UDP send paths")
+
+    new_pool, config, sink = make_pool()
+    from transport import UdpSender
+
+    pool = new_pool()
+    sock = pool.socket(pool.AF_INET, pool.SOCK_DGRAM)
+    address = (config['PC_IP'], config['PORT'])
+    sender = UdpSender(pool, config['PC_IP'], config['PORT'])
+    payload = bytearray(b'/button/press\x00\x00\x00,ii\x00' + bytes(8))
+
+    def socket_per_send():
+        p = new_pool()
+        s = p.socket(p.AF_INET, p.SOCK_DGRAM)
+        s.sendto(payload, (config['PC_IP'], config['PORT']))
+        s.close()
+
+    def sendto_config():
+        sock.sendto(payload, (config['PC_IP'], config['PORT']))
+
+    def sendto_address():
+        sock.sendto(payload, address)
+
+    def sender_send():
+        sender.send(payload)
+
+    print(f"UdpSender connected: {sender.connected}")
+    print(f"{'send path':<20}{'bytes/send':>12}{'us/send':>10}")
+    results = []
+    for name, fn in (
+        ('socket per send', socket_per_send),
+        ('sendto(config)', sendto_config),
+        ('sendto(address)', sendto_address),
+        ('UdpSender.send', sender_send),
+    ):
+        allocated = measure_allocations(fn, iterations)
+        elapsed = measure_time_us(fn, iterations)
+        results.append({'path': name, 'bytes_per_send': allocated, 'us_per_send': elapsed})
+        print(f"{name:<20}{allocated:>12.1f}{elapsed:>10.2f}")
+
+    sock.close()
+    sender.close()
+    if sink is not None:
+        sink.close()
+
+    if output:
+        from common import write_results
+        write_results(output, 'udp_send', results, iterations=iterations, connected=sender.connected)
+        print(f"Results written to {output}")
+
+if __name__ == "__main__":
+    main()
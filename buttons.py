@@ -0,0 +1,184 @@
+"""
+Button Input
+============
+Edge-captured, debounced button input for the controller.
+
+Buttons are scanned in the background by the keypad module, which queues
+every press and release together with the time it was captured. Taps shorter
+than a main loop pass are queued instead of missed, and the capture
+timestamp travels with the event all the way into the OSC payload.
+
+Raw edges then pass through a time-based Debouncer that never sleeps, so the
+main loop keeps servicing the network while a contact settles.
+
+Larger rigs add SeesawButtonBank: banks of 16 buttons per seesaw keypad,
+read in bulk from the keypad event FIFOs over I2C.
+"""
+
+import keypad
+from adafruit_ticks import ticks_add, ticks_diff, ticks_less
+
+# Debounced edge codes returned by Debouncer and EdgeButton
+EDGE_NONE = 0
+EDGE_PRESS = 1
+EDGE_RELEASE = 2
+
+class Debouncer:
+    """
+    Non-blocking debounce state machine for a stream of timestamped edges.
+
+    The first edge after a quiet period is reported immediately, so debounce
+    adds no latency to a clean press. Edges arriving within settle_ms of a
+    reported edge are treated as contact bounce. Once the raw level has been
+    quiet for settle_ms, a level that differs from the reported one is
+    reported as a new edge, so taps shorter than the settle time are kept.
+    """
+
+    def __init__(self, settle_ms=20):
+        self.settle_ms = settle_ms
+        self.pressed = False      # Debounced (reported) state
+        self.timestamp = 0        # Capture time of the last reported edge
+        self.raw = False          # Last raw level seen
+        self.raw_timestamp = 0    # Time of the last raw edge
+        self.departure = 0        # Time the raw level first left the reported state
+        self.settling = False
+        self.deadline = 0
+
+    def feed(self, pressed, timestamp):
+        """Process a raw edge; returns the EDGE_* code it produces"""
+        if pressed != self.raw and self.raw == self.pressed:
+            self.departure = timestamp
+        self.raw = pressed
+        self.raw_timestamp = timestamp
+        if self.settling or pressed == self.pressed:
+            return EDGE_NONE
+        return self._report(pressed, timestamp)
+
+    def update(self, now):
+        """Advance the settle timer to `now`; returns the EDGE_* code it produces"""
+        if not self.settling or ticks_less(now, self.deadline):
+            return EDGE_NONE
+        if ticks_diff(now, self.raw_timestamp) < self.settle_ms:
+            # Still bouncing: wait until the raw level has been quiet
+            self.deadline = ticks_add(self.raw_timestamp, self.settle_ms)
+            return EDGE_NONE
+        self.settling = False
+        if self.raw == self.pressed:
+            return EDGE_NONE
+        return self._report(self.raw, self.departure)
+
+    def _report(self, pressed, timestamp):
+        self.pressed = pressed
+        self.timestamp = timestamp
+        self.settling = True
+        self.deadline = ticks_add(timestamp, self.settle_ms)
+        return EDGE_PRESS if pressed else EDGE_RELEASE
+
+class EdgeButton:
+    """Single active-low button backed by a keypad.Keys event queue"""
+
+    def __init__(self, pin, scan_interval=0.005, settle_ms=20, max_events=64):
+        self.keys = keypad.Keys(
+            (pin,),
+            value_when_pressed=False,
+            pull=True,
+            interval=scan_interval,
+            max_events=max_events,
+        )
+        self.debouncer = Debouncer(settle_ms)
+        # Reused for every event so draining the queue does not allocate
+        self.event = keypad.Event()
+        self._pending = False
+
+    @property
+    def timestamp(self):
+        """Capture time (ticks ms) of the edge last returned by poll()"""
+        return self.debouncer.timestamp
+
+    def poll(self, now):
+        """
+        Return the next debounced edge as an EDGE_* code, or EDGE_NONE once
+        every captured edge up to `now` has been processed.
+        """
+        debouncer = self.debouncer
+        event = self.event
+        while True:
+            if not self._pending:
+                if not self.keys.events.get_into(event):
+                    return debouncer.update(now)
+                self._pending = True
+            # Resolve any settle window that ended before this raw edge
+            edge = debouncer.update(event.timestamp)
+            if edge:
+                return edge
+            self._pending = False
+            edge = debouncer.feed(event.pressed, event.timestamp)
+            if edge:
+                return edge
+
+    def take_overflow(self):
+        """
+        Return True once if edges were dropped because the queue was full.
+        Call after draining: clearing the flag also discards queued events.
+        """
+        events = self.keys.events
+        if events.overflowed:
+            events.clear()
+            return True
+        return False
+
+# Seesaw key numbers of a 4x4 NeoTrellis keypad, in button order
+NEOTRELLIS_KEYS = tuple((i // 4) * 8 + (i % 4) for i in range(16))
+
+class SeesawButtonBank:
+    """
+    Buttons read in bulk from seesaw keypad event FIFOs.
+
+    The seesaw scans and debounces its own keys and queues edges in a FIFO,
+    so a scan costs one I2C read of the FIFO depth per keypad plus one read
+    of all its queued edges, however many buttons it has. When the keypads'
+    INT lines are wired (open drain, active low) to int_pin, keypads are
+    only read while an edge is pending.
+
+    Button n is key key_map[n % len(key_map)] on keypad n // len(key_map).
+    Edges are timestamped with the time of the scan that read them.
+    """
+
+    def __init__(self, keypads, key_map=NEOTRELLIS_KEYS, int_pin=None):
+        self.keypads = keypads
+        self.key_map = key_map
+        self.button_of_key = {key: i for i, key in enumerate(key_map)}
+        self.count = len(keypads) * len(key_map)
+        self.int_pin = int_pin
+        for kp in keypads:
+            for key in key_map:
+                kp.set_event(key, kp.EDGE_RISING, True)
+                kp.set_event(key, kp.EDGE_FALLING, True)
+            if int_pin is not None:
+                kp.interrupt_enabled = True
+
+    def scan(self, now, on_edge):
+        """
+        Read every keypad FIFO and call on_edge(button, pressed, now) for
+        each queued edge. Returns the number of edges seen.
+        """
+        if self.int_pin is not None and self.int_pin.value:
+            return 0  # INT high: no keypad has an edge queued
+        edges = 0
+        per_keypad = len(self.key_map)
+        for index, kp in enumerate(self.keypads):
+            pending = kp.count
+            if not pending:
+                continue
+            for event in kp.read_keypad(pending):
+                button = self.button_of_key.get(event.number)
+                if button is None:
+                    continue
+                if event.edge == kp.EDGE_RISING:
+                    on_edge(index * per_keypad + button, True, now)
+                elif event.edge == kp.EDGE_FALLING:
+                    on_edge(index * per_keypad + button, False, now)
+                else:
+                    continue
+                edges += 1
+        return edges
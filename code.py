@@ -2,30 +2,330 @@
 CircuitPython WiFi Button Controller
 ===================================
 Sends OSC messages over WiFi when a button is pressed/released.
-Also sends a handshake message on startup to announce device presence.
+Also announces the device with a handshake until the PC acknowledges it.
+
+The controller runs as cooperative asyncio tasks (button capture, OSC
+receive, haptic playback and heartbeat) that only yield when they have
+nothing to do, so latency is bounded by work rather than sleep constants.
 
 Hardware Requirements:
 - ESP32-S2/S3 board with WiFi capability
 - Button connected to pin A0 (with internal pull-up)
+- Optional: seesaw keypads (e.g. NeoTrellis) on STEMMA I2C for button banks,
+  INT lines wired together to BANK_INT_PIN
 - Built-in LED for status indication
+- Libraries: asyncio, adafruit_ticks, adafruit_drv2605
 
 Configuration:
 - Set WiFi credentials, device ID, and target PC IP in settings.toml
 - Ensure target PC is listening on the specified UDP port
+- For the fastest boot, also set CIRCUITPY_WIFI_SSID/CIRCUITPY_WIFI_PASSWORD
+  so the core joins the network while code.py is starting (the controller
+  reuses that connection), and STATIC_IP (with STATIC_GATEWAY and
+  STATIC_NETMASK) to skip DHCP
 
 OSC Messages Sent:
-- /button/handshake/<device_id> (on startup)
-- /button/press (on button press)
-- /button/release (on button release)
+- /button/handshake <device_id> <version> <features> <addresses> (until
+  acked, with jittered exponential backoff; then every
+  HANDSHAKE_REANNOUNCE_MS). features and addresses are comma separated:
+  the encoder features and modes enabled, and the OSC addresses accepted
+- /button/press <33> <capture_ticks_ms> (on button press)
+- /button/release <"test"> <capture_ticks_ms> (on button release)
+- /button/heartbeat <device_id> <uptime_ms> (every HEARTBEAT_MS; uptime
+  since boot, wrapping to negative after 24.8 days like every int32)
+- /button/<n>/press <capture_ticks_ms> (seesaw bank button n pressed)
+- /button/<n>/release <capture_ticks_ms> (seesaw bank button n released)
+- /clock/ping <device_id> <seq> (every CLOCK_SYNC_MS)
+- /button/rx_stats <device_id> <received> <last_drained> <max_drained>
+  <ring_high_water> <ring_full> <kernel_drops> (with every heartbeat)
+- /button/reconnected <device_id> <reconnect_ms> <attempts> <reconnects>
+  (after the WiFi supervisor restored a lost link)
+- /button/boot <device_id> <config_ms> <hardware_ms> <wifi_ms> <sockets_ms>
+  <total_ms> <sockets> <socket_heap_bytes> (once, after boot: duration of
+  each boot phase, UDP sockets open and heap they took, -1 if unknown)
+- /button/stats <device_id> <uptime_ms> <heap_free> <heap_used> <gc_count>
+  <gc_total_us> <events_sent> <send_errors> <received> <ring_full>
+  <kernel_drops> <loop_p50_us> <loop_p99_us> <loop_max_us> <rssi>
+  (answering /device/stats; -1 where the platform cannot tell, rssi -1
+  when not associated, loop percentiles need PROFILE=1; uptime_ms and the
+  running counters wrap like the heartbeat's)
+- /button/profile <device_id> <stage> <count> <mean_us> <p50_us> <p99_us>
+  <max_us> <overruns> <bucket 0..15 counts> (one per stage, answering
+  /profile/get; PROFILE=1 only)
+- /button/memory <device_id> <heap_free> <heap_used> <high_water>
+  <largest_free> <fragmentation_permille> <alloc_rate> <peak_alloc_rate>
+  <collections> <gc_total_us> <gc_max_us> <emergency_collections>
+  (answering /device/memory; bytes and bytes/s, -1 where unknown)
+
+OSC Messages Received:
+- /haptic/play [effect_id] (play DRV2605 waveform 1-123, default 1)
+- /button/handshake/ack [device_id] (PC registered the device)
+- /clock/pong <seq> <timetag> (PC clock reading answering /clock/ping)
+- /button/ack <seq> (PC received the event numbered seq; RELIABLE=1 only)
+- /button/loss <permille> (event loss seen by the PC; REDUNDANCY > 0 only)
+- /device/stats (send device telemetry as /button/stats)
+- /device/memory (send the heap report as /button/memory once the memory
+  task has probed for the largest free block, one collection per idle
+  GC_CHECK_MS pass; with GC_CHECK_MS=0 at once, without the probe)
+- /profile/get, /profile/reset (send or clear the loop profile; PROFILE=1 only)
+
+With RELIABLE=1 every press/release message (main button and banks) gets a
+trailing <seq> argument. Events the PC has not acked are retransmitted,
+from a window of RELIABLE_WINDOW events, up to RELIABLE_RETRIES times.
+
+With REDUNDANCY=K (K > 0, takes precedence over RELIABLE) events are
+numbered the same way, and each is sent in a #bundle together with copies
+of the up to K events before it, so the PC recovers lost events without a
+round trip. K shrinks to what the loss reported in /button/loss requires.
+
+With AGGREGATE_MS > 0, button events that follow another event within
+AGGREGATE_MS are coalesced into one #bundle datagram (up to AGGREGATE_MTU
+bytes), each event in a sub-bundle timetagged with its capture time. The
+first event after a quiet period is always sent on its own, immediately.
+
+A WiFi supervisor checks the link every WIFI_CHECK_MS. When it drops, the
+supervisor rejoins, first using the cached BSSID and channel of the last AP
+(WIFI_FAST_RECONNECT=1) and otherwise with a full scan. It then re-creates
+the sockets and re-announces the device. A connect attempt blocks the
+event loop for up to WIFI_CONNECT_TIMEOUT_MS (default 2000); the other
+tasks run between attempts, and the keypad keeps capturing edges, with
+their timestamps, while one is in progress.
+
+With DUPLEX_SOCKET=1 the device opens a single UDP socket bound to
+LISTEN_PORT and sends from it too, instead of a separate send socket: one
+socket less of lwIP memory, one port for the PC and firewalls to know, and
+NAT state stays symmetric. With REPLY_TO_SOURCE=1 outgoing messages go to
+the source address of the last valid OSC packet received (PC_IP:PORT until
+then), so the PC can answer from any port, or from behind NAT.
+
+Messages may arrive inside (nested) #bundles. Once the PC clock offset is
+known, bundled messages run at their timetag rather than on arrival.
+
+With PROFILE=1 the loop profiler (profiler.py) keeps histograms of the
+loop period and of the receive, button handling, haptic trigger and send
+stages, and counts loop periods over PROFILE_OVERRUN_MS as overruns. The
+loop period is sampled on one in every PROFILE_SAMPLE passes (default 32,
+which keeps the profiler under 1% of loop time; 1 samples every pass), so
+overruns are counted among the sampled periods.
+
+The DRV2605 is driven through a register cache (haptic.py) that skips
+sequence slot writes the chip already holds. On press it plays HAPTIC_PRESS:
+up to 8 comma separated effect ids (1-123) and pauses (p<ms>, 10 ms steps),
+default "1". The pattern sits in the sequence slots from boot, so a press
+costs one GO write on the I2C bus unless /haptic/play reprogrammed them.
+HAPTIC_ORDER sets where that write sits relative to the press message:
+"actuate" plays first and sends after it, "send" sends first and plays in
+the same pass, and "deferred" (the default) sends and leaves the play to
+the haptic task, so nothing waits on I2C before the next edge. With
+HAPTIC_TRIGGER_PIN set (a board pin name wired to the DRV2605 IN/TRIG),
+the chip runs in external edge trigger mode and GO is a pulse on that pin
+instead of an I2C write.
+
+Once the tasks run, garbage collection is scheduled by the memory manager
+(memory.py). With GC_MODE=1 (the default) automatic collection is off and
+the memory task, every GC_CHECK_MS, collects only in idle windows: button
+released, no event being sent and no edge for GC_IDLE_MS, once GC_THRESHOLD
+bytes were allocated since the last collection (every GC_INTERVAL_MS where
+that cannot be measured). Below GC_RESERVE free bytes it collects at its
+next pass regardless. GC_MODE=0 leaves collection to the runtime. Either
+way the task tracks the allocation rate and heap high-water mark.
+
+Once the tasks run, messages go through the event log (log.py) instead of
+print(): records below LOG_LEVEL (debug, info, warning, error or off;
+default info) are dropped at the call, the rest wait in a ring of LOG_SLOTS
+binary records and are formatted and written LOG_FLUSH_MS after a burst, in
+idle slots of the event loop. With LOG_OSC=1 they are sent to the PC as
+/button/log <device_id> <level> <ticks_ms> <text> instead of the serial
+console.
 """
 
 import time
+import asyncio
+import random
 import board
 import wifi
 import socketpool
-from digitalio import DigitalInOut, Direction, Pull
 import os
+from digitalio import DigitalInOut, Direction, Pull
 import adafruit_drv2605
+from adafruit_ticks import ticks_ms
+from buttons import EDGE_PRESS, EdgeButton, SeesawButtonBank
+from haptic import HapticDriver, parse_pattern, single
+from log import DEBUG, ERROR, INFO, LEVELS, WARNING, EventLog
+from memory import MemoryManager, heap_free, heap_used
+from osc import TIMETAG_IMMEDIATE, OscDispatcher, OscMessage, OscTemplate, build_osc_message, walk_bundle
+from profiler import BUCKETS, BUTTON, HAPTIC, LOOP, RECEIVE, SEND, STAGES, Profiler
+from scheduler import ClockSync, OscScheduler, local_ms
+from transport import EventAggregator, ReceiveRing, RedundantSender, ReliableSender, UdpSender
+
+FIRMWARE_VERSION = "1.1.0"
+
+# Press pipeline orderings (HAPTIC_ORDER)
+ACTUATE_FIRST = 0  # Play the haptic, then send the event
+SEND_FIRST = 1     # Send the event, then play the haptic in the same pass
+DEFERRED = 2       # Send the event; the haptic task plays it in a later pass
+
+HAPTIC_ORDERS = {'actuate': ACTUATE_FIRST, 'send': SEND_FIRST, 'deferred': DEFERRED}
+
+# ============================================================================
+# LOG MESSAGES
+# ============================================================================
+
+# Index of each message in LOG_MESSAGES. Formats see the two int arguments
+# as {0} and {1} and the object argument as {2}
+LOG_PRESS = 0
+LOG_PRESS_SENT = 1
+LOG_PRESS_FAILED = 2
+LOG_RELEASE = 3
+LOG_RELEASE_SENT = 4
+LOG_RELEASE_FAILED = 5
+LOG_BUTTON_OVERFLOW = 6
+LOG_NO_HAPTIC = 7
+LOG_HAPTIC_PLAY = 8
+LOG_HAPTIC_INVALID = 9
+LOG_BANK_SEND_FAILED = 10
+LOG_BANK_SCAN_FAILED = 11
+LOG_OSC_RECEIVED = 12
+LOG_OSC_UNKNOWN = 13
+LOG_OSC_MALFORMED = 14
+LOG_BUNDLE_MALFORMED = 15
+LOG_RECEIVE_FAILED = 16
+LOG_HANDLE_FAILED = 17
+LOG_REPLY_TO = 18
+LOG_CLOCK_SYNCED = 19
+LOG_CLOCK_PING_FAILED = 20
+LOG_HEARTBEAT_FAILED = 21
+LOG_HANDSHAKE_SENT = 22
+LOG_HANDSHAKE_FAILED = 23
+LOG_HANDSHAKE_ACKED = 24
+LOG_WIFI_LOST = 25
+LOG_REJOIN_CACHED_FAILED = 26
+LOG_REJOIN_SCAN_FAILED = 27
+LOG_WIFI_RECONNECTED = 28
+LOG_RECONNECT_REPORT_FAILED = 29
+LOG_PROFILE_FAILED = 30
+LOG_STATS_FAILED = 31
+LOG_MEMORY_FAILED = 32
+LOG_HAPTIC_FAILED = 33
+LOG_SOCKETS_REOPEN_FAILED = 34
+LOG_BUNDLE_SEND_FAILED = 35
+LOG_RETRANSMIT_FAILED = 36
+
+LOG_MESSAGES = (
+    (DEBUG, "Button pressed"),
+    (DEBUG, "✓ OSC UDP packet sent for press!"),
+    (ERROR, "✗ Error sending OSC UDP packet on button press: {2}"),
+    (DEBUG, "Button released"),
+    (DEBUG, "✓ OSC UDP packet sent for release!"),
+    (ERROR, "✗ Error sending OSC UDP packet on button release: {2}"),
+    (WARNING, "⚠ Button event queue overflowed - events were dropped"),
+    (DEBUG, "⚠ Haptic motor not available - skipping haptic feedback"),
+    (DEBUG, "Triggering haptic motor (effect {0})..."),
+    (WARNING, "⚠ Invalid haptic effect: {0}"),
+    (ERROR, "✗ Error sending bank button {0}: {2}"),
+    (ERROR, "✗ Button bank scan failed: {2}"),
+    (DEBUG, "Received OSC: {2}"),
+    (WARNING, "Unknown OSC address: {2}"),
+    (WARNING, "⚠ Malformed OSC message ignored"),
+    (WARNING, "⚠ Malformed OSC bundle ignored"),
+    (ERROR, "Error receiving OSC: {2}"),
+    (ERROR, "Error handling OSC: {2}"),
+    (INFO, "Replying to {2[0]}:{2[1]}"),
+    (INFO, "Clock synced - offset {2} ms, RTT {0} ms"),
+    (ERROR, "✗ Clock ping failed: {2}"),
+    (ERROR, "✗ Heartbeat failed: {2}"),
+    (INFO, "✓ Handshake sent - OSC Address: {2}"),
+    (ERROR, "✗ Handshake failed: {2}"),
+    (INFO, "✓ Handshake acknowledged by PC (attempt {0})"),
+    (WARNING, "⚠ WiFi link lost - reconnecting"),
+    (WARNING, "⚠ WiFi rejoin failed (cached AP): {2}"),
+    (WARNING, "⚠ WiFi rejoin failed (scan): {2}"),
+    (INFO, "✓ WiFi reconnected in {0} ms ({1} attempts)"),
+    (ERROR, "✗ Reconnect report failed: {2}"),
+    (ERROR, "✗ Profile report failed: {2}"),
+    (ERROR, "✗ Stats report failed: {2}"),
+    (ERROR, "✗ Memory report failed: {2}"),
+    (ERROR, "✗ Haptic playback failed (effect {0}): {2}"),
+    (ERROR, "✗ Socket re-creation failed after rejoin: {2}"),
+    (ERROR, "✗ Error sending event bundle: {2}"),
+    (ERROR, "✗ Error retransmitting event: {2}"),
+)
+
+# Configured from LOG_LEVEL/LOG_SLOTS by main()
+log = EventLog(LOG_MESSAGES)
+
+# Enabled from PROFILE by main()
+profile = Profiler()
+
+# Configured from GC_* by main() once the tasks start
+memory = MemoryManager()
+
+def wrap_int32(value):
+    """value wrapped into the signed 32-bit range of an OSC int"""
+    return (value + 0x80000000) % 0x100000000 - 0x80000000
+
+class Telemetry:
+    """Counters and gauges reported by /device/stats"""
+
+    def __init__(self):
+        self.start_ms = local_ms()
+        self.events_sent = 0
+        self.send_errors = 0
+
+    @property
+    def uptime_ms(self):
+        """Milliseconds since boot as an OSC int32, wrapping after 24.8 days"""
+        return wrap_int32(local_ms() - self.start_ms)
+
+telemetry = Telemetry()
+
+def log_failure(code):
+    """on_error callback logging the exception as message `code`"""
+    def failed(e):
+        log.log(code, 0, 0, e)
+    return failed
+
+def osc_log_writer(link, device_id):
+    """Log writer sending each line to the PC as /button/log"""
+    def write(level, ticks, text):
+        if link.up:
+            link.sender.send(build_osc_message('/button/log', device_id, level, ticks, text))
+    return write
+
+def jittered_backoff_ms(attempt, base_ms, max_ms):
+    """
+    Delay before retry number `attempt` (from 1): drawn between half and all
+    of min(max_ms, base_ms * 2**(attempt - 1)), so devices that fail
+    together do not retry in lockstep.
+    """
+    delay = min(max_ms, base_ms << min(attempt - 1, 16))
+    return delay // 2 + random.randint(0, delay // 2)
+
+class BootTimer:
+    """Duration of each boot phase, for the boot timing report"""
+
+    PHASES = ('config', 'hardware', 'wifi', 'sockets')
+
+    def __init__(self):
+        self.start = local_ms()
+        self.last = self.start
+        self.durations = {}
+
+    def mark(self, phase):
+        """End `phase` now"""
+        now = local_ms()
+        self.durations[phase] = now - self.last
+        self.last = now
+
+    @property
+    def total_ms(self):
+        return self.last - self.start
+
+    def report(self):
+        print("Boot timing:")
+        for phase in self.PHASES:
+            print(f"  {phase:<10}{self.durations.get(phase, 0):>6} ms")
+        print(f"  {'total':<10}{self.total_ms:>6} ms")
 
 # ============================================================================
 # CONFIGURATION MANAGEMENT
@@ -39,7 +339,53 @@ def load_configuration():
         'PC_IP': os.getenv("PC_IP"),
         'PORT': int(os.getenv("PORT", 5000)),
         'LISTEN_PORT': int(os.getenv("LISTEN_PORT", 5001)),
-        'DEVICE_ID': os.getenv("DEVICE_ID", "unknown_device")
+        'DEVICE_ID': os.getenv("DEVICE_ID", "unknown_device"),
+        'BUTTON_SCAN_MS': int(os.getenv("BUTTON_SCAN_MS", 5)),
+        'DEBOUNCE_MS': int(os.getenv("DEBOUNCE_MS", 20)),
+        'HEARTBEAT_MS': int(os.getenv("HEARTBEAT_MS", 1000)),
+        'IDLE_SLEEP_MS': int(os.getenv("IDLE_SLEEP_MS", 0)),
+        'RECV_TIMEOUT_MS': int(os.getenv("RECV_TIMEOUT_MS", 0)),
+        'CLOCK_SYNC_MS': int(os.getenv("CLOCK_SYNC_MS", 10000)),
+        'RECV_BUDGET': int(os.getenv("RECV_BUDGET", 8)),
+        'RECV_RING': int(os.getenv("RECV_RING", 8)),
+        'BUTTON_BANKS': os.getenv("BUTTON_BANKS", ""),
+        'BANK_INT_PIN': os.getenv("BANK_INT_PIN", ""),
+        'BANK_SCAN_MS': int(os.getenv("BANK_SCAN_MS", 5)),
+        'AGGREGATE_MS': int(os.getenv("AGGREGATE_MS", 0)),
+        'AGGREGATE_MTU': int(os.getenv("AGGREGATE_MTU", 1400)),
+        'RELIABLE': int(os.getenv("RELIABLE", 0)),
+        'RELIABLE_WINDOW': int(os.getenv("RELIABLE_WINDOW", 16)),
+        'RELIABLE_RETRIES': int(os.getenv("RELIABLE_RETRIES", 6)),
+        'REDUNDANCY': int(os.getenv("REDUNDANCY", 0)),
+        'HANDSHAKE_RETRY_MS': int(os.getenv("HANDSHAKE_RETRY_MS", 250)),
+        'HANDSHAKE_MAX_MS': int(os.getenv("HANDSHAKE_MAX_MS", 8000)),
+        'HANDSHAKE_REANNOUNCE_MS': int(os.getenv("HANDSHAKE_REANNOUNCE_MS", 60000)),
+        'WIFI_CHECK_MS': int(os.getenv("WIFI_CHECK_MS", 500)),
+        'WIFI_FAST_RECONNECT': int(os.getenv("WIFI_FAST_RECONNECT", 1)),
+        'WIFI_RETRY_MS': int(os.getenv("WIFI_RETRY_MS", 250)),
+        'WIFI_CONNECT_TIMEOUT_MS': int(os.getenv("WIFI_CONNECT_TIMEOUT_MS", 2000)),
+        'STATIC_IP': os.getenv("STATIC_IP", ""),
+        'STATIC_NETMASK': os.getenv("STATIC_NETMASK", "255.255.255.0"),
+        'STATIC_GATEWAY': os.getenv("STATIC_GATEWAY", ""),
+        'STATIC_DNS': os.getenv("STATIC_DNS", ""),
+        'DUPLEX_SOCKET': int(os.getenv("DUPLEX_SOCKET", 0)),
+        'REPLY_TO_SOURCE': int(os.getenv("REPLY_TO_SOURCE", 0)),
+        'LOG_LEVEL': os.getenv("LOG_LEVEL", "info"),
+        'LOG_SLOTS': int(os.getenv("LOG_SLOTS", 64)),
+        'LOG_FLUSH_MS': int(os.getenv("LOG_FLUSH_MS", 50)),
+        'LOG_OSC': int(os.getenv("LOG_OSC", 0)),
+        'PROFILE': int(os.getenv("PROFILE", 0)),
+        'PROFILE_OVERRUN_MS': int(os.getenv("PROFILE_OVERRUN_MS", 5)),
+        'PROFILE_SAMPLE': int(os.getenv("PROFILE_SAMPLE", 32)),
+        'GC_MODE': int(os.getenv("GC_MODE", 1)),
+        'GC_CHECK_MS': int(os.getenv("GC_CHECK_MS", 20)),
+        'GC_IDLE_MS': int(os.getenv("GC_IDLE_MS", 50)),
+        'GC_THRESHOLD': int(os.getenv("GC_THRESHOLD", 8192)),
+        'GC_INTERVAL_MS': int(os.getenv("GC_INTERVAL_MS", 1000)),
+        'GC_RESERVE': int(os.getenv("GC_RESERVE", 16384)),
+        'HAPTIC_PRESS': parse_pattern(os.getenv("HAPTIC_PRESS", "1")),
+        'HAPTIC_ORDER': os.getenv("HAPTIC_ORDER", "deferred"),
+        'HAPTIC_TRIGGER_PIN': os.getenv("HAPTIC_TRIGGER_PIN", "")
     }
     
     # Validate required environment variables
@@ -47,6 +393,10 @@ def load_configuration():
     for var in required_vars:
         if not config[var]:
             raise ValueError(f"{var} environment variable is required")
+    if config['LOG_LEVEL'] not in LEVELS:
+        raise ValueError(f"LOG_LEVEL must be one of {', '.join(LEVELS)}")
+    if config['HAPTIC_ORDER'] not in HAPTIC_ORDERS:
+        raise ValueError(f"HAPTIC_ORDER must be one of {', '.join(HAPTIC_ORDERS)}")
     
     print(f"Configuration loaded - Target: {config['PC_IP']}:{config['PORT']}")
     return config
@@ -55,28 +405,87 @@ def load_configuration():
 # HARDWARE INITIALIZATION
 # ============================================================================
 
-def setup_button():
-    """Initialize button hardware"""
-    btn = DigitalInOut(board.A0)
-    btn.direction = Direction.INPUT
-    btn.pull = Pull.UP
-    return btn
+def setup_button(config):
+    """Initialize button hardware with background edge capture and debounce"""
+    return EdgeButton(
+        board.A0,
+        scan_interval=config['BUTTON_SCAN_MS'] / 1000,
+        settle_ms=config['DEBOUNCE_MS'],
+    )
+
+def setup_button_bank(config):
+    """Initialize the seesaw keypads listed in BUTTON_BANKS (hex I2C addresses)"""
+    if not config['BUTTON_BANKS']:
+        return None
+    try:
+        from adafruit_seesaw.keypad import Keypad
+        i2c = board.STEMMA_I2C()
+        keypads = [Keypad(i2c, int(addr, 16)) for addr in config['BUTTON_BANKS'].split(',')]
+        int_pin = None
+        if config['BANK_INT_PIN']:
+            int_pin = DigitalInOut(getattr(board, config['BANK_INT_PIN']))
+            int_pin.direction = Direction.INPUT
+            int_pin.pull = Pull.UP
+        bank = SeesawButtonBank(keypads, int_pin=int_pin)
+        print(f"✓ {bank.count} bank buttons on {len(keypads)} seesaw keypads")
+        return bank
+    except Exception as e:
+        print(f"⚠ Button banks not available: {e}")
+        return None
 
-def setup_haptic():
-    """Initialize haptic motor hardware"""
+def setup_haptic(config):
+    """
+    Initialize haptic motor hardware, with the press pattern programmed.
+    With HAPTIC_TRIGGER_PIN set, playback starts from that pin (wired to
+    IN/TRIG) instead of an I2C GO write.
+    """
     try:
         i2c = board.STEMMA_I2C()
-        drv = adafruit_drv2605.DRV2605(i2c)
-        drv.use_ERM()
-        drv.sequence[0] = adafruit_drv2605.Effect(1)
+        device = adafruit_drv2605.DRV2605(i2c)
+        device.use_ERM()
+        trigger = None
+        if config['HAPTIC_TRIGGER_PIN']:
+            trigger = DigitalInOut(getattr(board, config['HAPTIC_TRIGGER_PIN']))
+            trigger.direction = Direction.OUTPUT
+            trigger.value = False
+            device.mode = adafruit_drv2605.MODE_EXTTRIGEDGE
+        drv = HapticDriver(device, trigger)
+        drv.program(config['HAPTIC_PRESS'])
         print("✓ Haptic motor initialized successfully")
         return drv
     except Exception as e:
         print(f"⚠ Haptic motor not available: {e}")
         return None
 
+def configure_static_ip(config):
+    """Use STATIC_IP instead of DHCP; the gateway defaults to x.y.z.1"""
+    if not config['STATIC_IP']:
+        return False
+    import ipaddress
+    try:
+        gateway = config['STATIC_GATEWAY'] or config['STATIC_IP'].rsplit('.', 1)[0] + '.1'
+        dns = config['STATIC_DNS'] or gateway
+        wifi.radio.stop_dhcp()
+        wifi.radio.set_ipv4_address(
+            ipv4=ipaddress.ip_address(config['STATIC_IP']),
+            netmask=ipaddress.ip_address(config['STATIC_NETMASK']),
+            gateway=ipaddress.ip_address(gateway),
+            ipv4_dns=ipaddress.ip_address(dns),
+        )
+        print(f"✓ Static IP {config['STATIC_IP']} (gateway {gateway})")
+        return True
+    except Exception as e:
+        print(f"⚠ Static IP not applied, using DHCP: {e}")
+        wifi.radio.start_dhcp()
+        return False
+
 def connect_wifi(config):
-    """Connect to WiFi with retry logic"""
+    """Connect to WiFi with retry logic, reusing a connection the core already made"""
+    ap = wifi.radio.ap_info
+    if wifi.radio.connected and ap is not None and ap.ssid == config['WIFI_SSID']:
+        print(f"Already connected! ESP32 IP: {wifi.radio.ipv4_address}")
+        return wifi.radio.ipv4_address
+    configure_static_ip(config)
     max_retries = 3
     for attempt in range(max_retries):
         try:
@@ -88,21 +497,26 @@ def connect_wifi(config):
         except Exception as e:
             print(f"WiFi connection failed: {e}")
             if attempt < max_retries - 1:
-                time.sleep(2)
+                time.sleep(jittered_backoff_ms(attempt + 1, config['WIFI_RETRY_MS'], 4000) / 1000)
             else:
                 print("✗ Failed to connect to WiFi after all attempts")
     return None
 
+def wifi_rssi():
+    """RSSI of the current AP in dBm, or -1 when not associated"""
+    ap = wifi.radio.ap_info
+    return ap.rssi if ap is not None else -1
+
 def setup_sockets(config):
-    """Initialize UDP sockets for sending and receiving"""
+    """
+    Initialize the UDP sender and the receiving socket. With DUPLEX_SOCKET
+    the sender sends from the receiving socket, so both are one socket.
+    """
     pool = socketpool.SocketPool(wifi.radio)
     
-    # Sending socket
-    send_sock = pool.socket(pool.AF_INET, pool.SOCK_DGRAM)
-    
-    # Receiving socket
+    # Receiving socket (non-blocking by default, polled by the receive task)
     recv_sock = pool.socket(pool.AF_INET, pool.SOCK_DGRAM)
-    recv_sock.settimeout(0.01)
+    recv_sock.settimeout(config['RECV_TIMEOUT_MS'] / 1000)
     
     try:
         recv_sock.bind(('0.0.0.0', config['LISTEN_PORT']))
@@ -110,79 +524,296 @@ def setup_sockets(config):
     except Exception as e:
         print(f"✗ Failed to bind to port {config['LISTEN_PORT']}: {e}")
     
-    return send_sock, recv_sock
+    if config['DUPLEX_SOCKET']:
+        # Send from the listening port; left unconnected so it still
+        # receives from any source
+        sender = UdpSender(pool, config['PC_IP'], config['PORT'], sock=recv_sock)
+        print(f"✓ Duplex socket: sending from port {config['LISTEN_PORT']}")
+    else:
+        # Separate sending socket, connected to the PC once
+        sender = UdpSender(pool, config['PC_IP'], config['PORT'])
+    
+    return sender, recv_sock
 
-def pad4(s):
-    """Pad bytes to next multiple of 4 bytes (OSC requirement)"""
-    return s + (b'\x00' * ((4 - (len(s) % 4)) % 4))
+def socket_count(config):
+    """Number of UDP sockets setup_sockets() opens"""
+    return 1 if config['DUPLEX_SOCKET'] else 2
 
-def build_osc_message(address, *args):
+class WifiLink:
     """
-    Build a minimal OSC message.
-    Supports integer and string arguments.
+    The WiFi association and the UDP sockets opened on it.
+    Tasks read sender and recv_sock from here on every use, so the
+    supervisor can replace them after a reconnect.
     """
-    msg = pad4(address.encode('utf-8'))
-    
-    # Build type tag string based on argument types
-    type_tags = ','
-    for arg in args:
-        if isinstance(arg, str):
-            type_tags += 's'  # string type
-        elif isinstance(arg, int):
-            type_tags += 'i'  # integer type
-        else:
-            # Convert other types to integers for compatibility
-            type_tags += 'i'
-    
-    msg += pad4(type_tags.encode('utf-8'))
-    
-    # Add arguments based on their types
-    for arg in args:
-        if isinstance(arg, str):
-            # String arguments need to be null-terminated and padded
-            string_data = arg.encode('utf-8') + b'\x00'
-            msg += pad4(string_data)
-        elif isinstance(arg, int):
-            # Integer arguments are 4-byte big-endian
-            msg += arg.to_bytes(4, 'big', signed=True)
-        else:
-            # Convert other types to integers
-            msg += int(arg).to_bytes(4, 'big', signed=True)
-    
-    return msg
 
-def parse_osc_message(data):
-    """
-    Parse a simple OSC message to extract the address.
-    Returns the OSC address string or None if parsing fails.
-    """
-    try:
-        # Find the first null terminator for the address
-        null_pos = data.find(b'\x00')
-        if null_pos == -1:
-            return None
-        
-        address = data[:null_pos].decode('utf-8')
-        return address
-    except:
-        return None
+    def __init__(self, config, sender, recv_sock):
+        self.config = config
+        self.sender = sender
+        self.recv_sock = recv_sock
+        self.up = True
+        self.bssid = None
+        self.channel = 0
+        # Reconnect metrics
+        self.reconnects = 0
+        self.last_reconnect_ms = 0
+        self.max_reconnect_ms = 0
+        self.remember_ap()
+
+    def remember_ap(self):
+        """Cache the BSSID and channel of the current AP for a fast rejoin"""
+        ap = wifi.radio.ap_info
+        if ap is not None:
+            self.bssid = ap.bssid
+            self.channel = ap.channel
+
+    def rejoin(self, fast):
+        """
+        One connect attempt, to the cached AP if fast; returns True once joined.
+        Blocks for up to WIFI_CONNECT_TIMEOUT_MS.
+        """
+        timeout = self.config['WIFI_CONNECT_TIMEOUT_MS'] / 1000
+        try:
+            if fast and self.bssid is not None:
+                wifi.radio.connect(
+                    self.config['WIFI_SSID'], self.config['WIFI_PASSWORD'],
+                    channel=self.channel, bssid=self.bssid, timeout=timeout,
+                )
+            else:
+                wifi.radio.connect(self.config['WIFI_SSID'], self.config['WIFI_PASSWORD'], timeout=timeout)
+        except Exception as e:
+            log.log(LOG_REJOIN_CACHED_FAILED if fast else LOG_REJOIN_SCAN_FAILED, 0, 0, e)
+            return False
+        self.remember_ap()
+        return True
+
+    def reopen_sockets(self):
+        """Close the sockets of the lost link and open new ones"""
+        address = self.sender.address
+        for sock in (self.sender, self.recv_sock):
+            try:
+                sock.close()
+            except Exception:
+                pass
+        self.sender, self.recv_sock = setup_sockets(self.config)
+        if self.config['REPLY_TO_SOURCE']:
+            self.sender.retarget(address)  # Keep replying where the PC was
+
+# ============================================================================
+# OSC MESSAGE TEMPLATES
+# ============================================================================
+
+def build_message_templates(config, bank_buttons=0):
+    """Precompile the OSC messages sent by the device"""
+    # Reliable and redundant events end in a sequence number, filled in on send
+    seq = (0,) if config['RELIABLE'] or config['REDUNDANCY'] else ()
+    return {
+        'bank_press': [OscTemplate(f'/button/{n}/press', 0, *seq) for n in range(bank_buttons)],
+        'bank_release': [OscTemplate(f'/button/{n}/release', 0, *seq) for n in range(bank_buttons)],
+        'press': OscTemplate('/button/press', 33, 0, *seq),
+        'release': OscTemplate('/button/release', "test", 0, *seq),
+        'heartbeat': OscTemplate('/button/heartbeat', int(config['DEVICE_ID']), 0),
+        'clock_ping': OscTemplate('/clock/ping', int(config['DEVICE_ID']), 0),
+        'rx_stats': OscTemplate('/button/rx_stats', int(config['DEVICE_ID']), 0, 0, 0, 0, 0, 0),
+        'reconnected': OscTemplate('/button/reconnected', int(config['DEVICE_ID']), 0, 0, 0),
+        'boot': OscTemplate('/button/boot', int(config['DEVICE_ID']), 0, 0, 0, 0, 0, 0, 0),
+        'stats': OscTemplate('/button/stats', int(config['DEVICE_ID']), *([0] * 14)),
+        'memory': OscTemplate('/button/memory', int(config['DEVICE_ID']), *([0] * 11)),
+        'profile': [
+            OscTemplate('/button/profile', int(config['DEVICE_ID']), stage, 0, 0, 0, 0, 0, 0, *([0] * BUCKETS))
+            for stage in STAGES
+        ],
+    }
+
+def build_handshake_template(config, dispatcher, bank_buttons=0):
+    """Precompile the handshake advertising version, features and accepted addresses"""
+    features = ['templates', 'bundles', 'timetags']
+    if bank_buttons:
+        features.append(f'banks:{bank_buttons}')
+    if config['AGGREGATE_MS'] > 0:
+        features.append(f"aggregate:{config['AGGREGATE_MS']}")
+    if config['REDUNDANCY'] > 0:
+        features.append(f"redundancy:{config['REDUNDANCY']}")
+    elif config['RELIABLE']:
+        features.append('reliable')
+    if config['CLOCK_SYNC_MS'] > 0:
+        features.append('clock_sync')
+    if config['PROFILE']:
+        features.append('profile')
+    return OscTemplate(
+        '/button/handshake', int(config['DEVICE_ID']), FIRMWARE_VERSION,
+        ','.join(features), ','.join(dispatcher.exact),
+    )
 
 # ============================================================================
 # HARDWARE SETUP FUNCTIONS
 # ============================================================================
     
-def handle_incoming_osc(address, drv):
-    """Handle incoming OSC messages and perform actions"""
-    print(f"Received OSC: {address}")
+class HapticQueue:
+    """
+    Fixed-size queue of haptic patterns waiting for the playback task.
+    Other tasks request patterns with put(); the playback task awaits get().
+    """
+
+    def __init__(self, size=8):
+        self.effects = [None] * size
+        self.head = 0
+        self.count = 0
+        self.dropped = 0
+        self.ready = asyncio.Event()
+
+    def put(self, effect):
+        """Queue a pattern; drops it if the queue is full"""
+        size = len(self.effects)
+        if self.count == size:
+            self.dropped += 1
+            return False
+        self.effects[(self.head + self.count) % size] = effect
+        self.count += 1
+        self.ready.set()
+        return True
+
+    async def get(self):
+        """Wait for and return the next queued pattern"""
+        while not self.count:
+            self.ready.clear()
+            await self.ready.wait()
+        effect = self.effects[self.head]
+        self.head = (self.head + 1) % len(self.effects)
+        self.count -= 1
+        return effect
+
+def osc_haptic_play(message, haptics):
+    """/haptic/play [effect_id]: queue a DRV2605 waveform"""
+    effect = message.int_arg(0, 1)
+    if 1 <= effect <= 123:
+        haptics.put(single(effect))
+    else:
+        log.log(LOG_HAPTIC_INVALID, effect)
+
+def osc_clock_pong(message, clock):
+    """/clock/pong <seq> <timetag>: add a PC clock offset sample"""
+    seq = message.int_arg(0)
+    pc_timetag = message.int_arg(1)
+    if seq is not None and pc_timetag is not None and clock.on_pong(seq, pc_timetag):
+        log.log(LOG_CLOCK_SYNCED, clock.rtt_ms, 0, clock.offset_ms)
+
+def osc_button_ack(message, reliable):
+    """/button/ack <seq>: stop retransmitting an event the PC received"""
+    seq = message.int_arg(0)
+    if seq is not None:
+        reliable.on_ack(seq)
+
+def osc_button_loss(message, redundant):
+    """/button/loss <permille>: adapt event redundancy to the loss the PC sees"""
+    permille = message.int_arg(0)
+    if permille is not None:
+        redundant.on_loss_report(permille)
+
+def osc_handshake_ack(message, handshake):
+    """/button/handshake/ack [device_id]: the PC registered this device"""
+    device_id = message.int_arg(0)
+    if device_id is None or device_id == handshake.device_id:
+        handshake.on_ack()
+
+def osc_device_stats(message, context):
+    """/device/stats: send device telemetry to the PC as /button/stats"""
+    link, ring, templates = context
+    if link.up:
+        send_stats(link, ring, templates)
+
+def osc_device_memory(message, context):
+    """
+    /device/memory: have the memory task send the heap report to the PC as
+    /button/memory in its next idle window; without the task send it now,
+    leaving out the largest free block probe
+    """
+    link, ring, templates = context
+    if link.config['GC_CHECK_MS'] > 0:
+        memory.report_pending = True
+    elif link.up:
+        send_memory(link.sender, templates)
+
+def osc_profile_get(message, context):
+    """/profile/get: send the loop profile to the PC as /button/profile"""
+    link, ring, templates = context
+    if link.up:
+        send_profile(link.sender, templates)
+
+def osc_profile_reset(message, context):
+    """/profile/reset: clear the loop profile"""
+    profile.reset()
+
+def build_dispatcher(haptics, clock, handshake, reliable=None, redundant=None, link=None, ring=None, templates=None):
+    """
+    Register the handler for every OSC address the device accepts.
+    Given the link, receive ring and templates, also the telemetry queries
+    (and the loop profile ones while the profiler is enabled).
+    """
+    dispatcher = OscDispatcher()
+    dispatcher.add('/haptic/play', osc_haptic_play, haptics)
+    dispatcher.add('/clock/pong', osc_clock_pong, clock)
+    dispatcher.add('/button/handshake/ack', osc_handshake_ack, handshake)
+    if reliable is not None:
+        dispatcher.add('/button/ack', osc_button_ack, reliable)
+    if redundant is not None:
+        dispatcher.add('/button/loss', osc_button_loss, redundant)
+    if link is not None:
+        context = (link, ring, templates)
+        dispatcher.add('/device/stats', osc_device_stats, context)
+        dispatcher.add('/device/memory', osc_device_memory, context)
+        if profile.enabled:
+            dispatcher.add('/profile/get', osc_profile_get, context)
+            dispatcher.add('/profile/reset', osc_profile_reset, context)
+    return dispatcher
+
+def handle_incoming_osc(message, dispatcher):
+    """Handle a decoded incoming OSC message and perform actions"""
+    log.log(LOG_OSC_RECEIVED, 0, 0, message.address)
     
-    if address == "/haptic/play":
-        if drv is not None:
-            print("Triggering haptic motor...")
-            drv.play()
+    if not dispatcher.dispatch(message):
+        log.log(LOG_OSC_UNKNOWN, 0, 0, message.address)
+
+class OscRouter:
+    """
+    Routes every message of a received packet. Bundled messages with a
+    future timetag are handed to the scheduler once the PC clock offset is
+    known; everything else is handled on arrival.
+    """
+
+    def __init__(self, dispatcher, clock, scheduler):
+        self.dispatcher = dispatcher
+        self.clock = clock
+        self.scheduler = scheduler
+        self.message = OscMessage()
+        self.malformed = 0        # Messages check() failed to decode
+        # Bound once so walking a bundle does not allocate a method object
+        self.route = self._route
+        self.handle = self._handle
+        self.check = self._check
+
+    def _handle(self, message):
+        handle_incoming_osc(message, self.dispatcher)
+
+    def _check(self, buffer, start, end, timetag):
+        if not self.message.decode(buffer, end, start):
+            self.malformed += 1
+
+    def is_valid(self, buffer, end):
+        """True if the packet is well formed and every message in it decodes"""
+        self.malformed = 0
+        return walk_bundle(buffer, end, self.check) and not self.malformed
+
+    def _route(self, buffer, start, end, timetag):
+        if timetag != TIMETAG_IMMEDIATE and self.clock.synced:
+            due = self.clock.to_local_ms(timetag)
+            if due > local_ms():
+                self.scheduler.schedule(buffer, start, end, due)
+                return
+            self.scheduler.late += 1
+        if self.message.decode(buffer, end, start):
+            self._handle(self.message)
         else:
-            print("⚠ Haptic motor not available - skipping haptic feedback")
-    else:
-        print(f"Unknown OSC address: {address}")
+            log.log(LOG_OSC_MALFORMED)
 
 # ============================================================================
 # NETWORK DIAGNOSTIC FUNCTIONS
@@ -200,134 +831,547 @@ def test_connectivity(config):
     same_subnet = esp_parts[:3] == pc_parts[:3]
     print(f"Likely same subnet: {same_subnet}")
 
-def ping_test(config):
+def ping_test(sender):
     """Simple connectivity test"""
     try:
-        pool = socketpool.SocketPool(wifi.radio)
-        sock = pool.socket(pool.AF_INET, pool.SOCK_DGRAM)
-        sock.settimeout(2.0)
         # Send test packet
-        test_msg = b"PING_TEST"
-        sock.sendto(test_msg, (config['PC_IP'], config['PORT']))
+        sender.send(b"PING_TEST")
         print("✓ Test packet sent successfully")
-        sock.close()
         return True
     except Exception as e:
         print(f"✗ Connectivity test failed: {e}")
         return False
 
-def send_handshake(socket, config):
-    """Send handshake message to announce device startup"""
-    max_retries = 3
-    for attempt in range(max_retries):
+class Handshake:
+    """
+    Acknowledgement state of the device announcement.
+    Unacked announcements are retried with jittered exponential backoff.
+    """
+
+    def __init__(self, device_id, retry_ms=250, max_ms=8000):
+        self.device_id = device_id
+        self.retry_ms = retry_ms
+        self.max_ms = max_ms
+        self.attempts = 0
+        self.acked = False
+        self.acks = 0
+        self.ack = asyncio.Event()
+        self.restarted = asyncio.Event()
+
+    def on_ack(self):
+        self.acked = True
+        self.acks += 1
+        self.ack.set()
+
+    def restart(self):
+        """Announce again right away, e.g. after a reconnect"""
+        self.acked = False
+        self.attempts = 0
+        self.ack.set()  # Wake a pending backoff wait
+        self.restarted.set()
+
+    def backoff_ms(self):
+        """Delay before the next announcement after `attempts` unacked ones"""
+        return jittered_backoff_ms(self.attempts, self.retry_ms, self.max_ms)
+
+def send_handshake(sender, templates):
+    """Send the handshake message announcing the device and its capabilities"""
+    try:
+        # Send handshake message for Unity GameObject mapping
+        handshake = templates['handshake']
+        sender.send(handshake.buffer)
+        log.log(LOG_HANDSHAKE_SENT, 0, 0, handshake.address)
+        # blink_led(3, 0.1)  # 3 quick blinks to indicate handshake sent
+        return True
+    except Exception as e:
+        telemetry.send_errors += 1
+        log.log(LOG_HANDSHAKE_FAILED, 0, 0, e)
+        # blink_led(5, 0.2)  # 5 slow blinks to indicate handshake failure
+        return False
+
+def send_stats(link, ring, templates):
+    """Fill the preallocated /button/stats message and send it"""
+    stats = templates['stats']
+    loop = profile.histograms[LOOP]
+    profiled = profile.enabled
+    stats.set_int(1, telemetry.uptime_ms)
+    stats.set_int(2, heap_free())
+    stats.set_int(3, heap_used())
+    # Running counters wrap like uptime rather than overflow the int32
+    stats.set_int(4, wrap_int32(memory.collections))
+    stats.set_int(5, wrap_int32(memory.gc_total_us))
+    stats.set_int(6, wrap_int32(telemetry.events_sent))
+    stats.set_int(7, wrap_int32(telemetry.send_errors))
+    stats.set_int(8, wrap_int32(ring.received))
+    stats.set_int(9, ring.full)
+    stats.set_int(10, socket_drops(link.recv_sock))
+    stats.set_int(11, loop.percentile_us(50) if profiled else -1)
+    stats.set_int(12, loop.percentile_us(99) if profiled else -1)
+    stats.set_int(13, loop.max_us if profiled else -1)
+    stats.set_int(14, wifi_rssi())
+    try:
+        link.sender.send(stats.buffer)
+    except Exception as e:
+        telemetry.send_errors += 1
+        log.log(LOG_STATS_FAILED, 0, 0, e)
+
+def send_memory(sender, templates):
+    """Fill the preallocated /button/memory message and send it"""
+    report = templates['memory']
+    free, used, high_water, largest, fragmentation = memory.report()
+    report.set_int(1, free)
+    report.set_int(2, used)
+    report.set_int(3, high_water)
+    report.set_int(4, largest)
+    report.set_int(5, fragmentation)
+    report.set_int(6, memory.alloc_rate)
+    report.set_int(7, memory.peak_alloc_rate)
+    report.set_int(8, wrap_int32(memory.collections))
+    report.set_int(9, wrap_int32(memory.gc_total_us))
+    report.set_int(10, memory.gc_max_us)
+    report.set_int(11, memory.emergency)
+    try:
+        sender.send(report.buffer)
+    except Exception as e:
+        telemetry.send_errors += 1
+        log.log(LOG_MEMORY_FAILED, 0, 0, e)
+
+def send_profile(sender, templates):
+    """Send every stage's histogram, one /button/profile message per stage"""
+    for stage, report in enumerate(templates['profile']):
+        histogram = profile.histograms[stage]
+        # Slot 0 is the device id; the stage name is not a slot
+        report.set_int(1, histogram.count)
+        report.set_int(2, histogram.mean_us)
+        report.set_int(3, histogram.percentile_us(50))
+        report.set_int(4, histogram.percentile_us(99))
+        report.set_int(5, histogram.max_us)
+        report.set_int(6, profile.overruns)
+        for i in range(BUCKETS):
+            report.set_int(7 + i, histogram.counts[i])
         try:
-            # Send handshake message for Unity GameObject mapping
-            handshake_address = f'/button/handshake'
-            osc_msg = build_osc_message(handshake_address, int(config['DEVICE_ID']))
-            socket.sendto(osc_msg, (config['PC_IP'], config['PORT']))
-            print(f"✓ Handshake sent successfully (attempt {attempt + 1})")
-            print(f"  OSC Address: {handshake_address}")
-            # blink_led(3, 0.1)  # 3 quick blinks to indicate handshake sent
-            return True
+            sender.send(report.buffer)
         except Exception as e:
-            print(f"✗ Handshake failed (attempt {attempt + 1}): {e}")
-            if attempt < max_retries - 1:
-                time.sleep(1)  # Wait before retry
-    
-    print("✗ Failed to send handshake after all attempts")
-    # blink_led(5, 0.2)  # 5 slow blinks to indicate handshake failure
-    return False
+            telemetry.send_errors += 1
+            log.log(LOG_PROFILE_FAILED, 0, 0, e)
+            return
 
 # ============================================================================
 # EVENT HANDLING FUNCTIONS
 # ============================================================================
 
-def handle_button_events(btn, prev_btn_state, send_sock, config, drv, haptic_effect=1):
-    """Handle button press and release events"""
-    curr_btn_state = btn.value  # True if not pressed, False if pressed
+def actuate(drv, pattern):
+    """
+    Play a haptic pattern on the local motor, if there is one. A driver or
+    I2C error is logged, never raised, so it cannot hold up an event.
+    """
+    if drv is None:
+        log.log(LOG_NO_HAPTIC)
+        return
+    start = profile.now()
+    try:
+        drv.play(pattern)
+    except Exception as e:
+        log.log(LOG_HAPTIC_FAILED, pattern[0], 0, e)
+    profile.add(HAPTIC, start)
 
-    # Detect button press (transition from not pressed to pressed)
-    if prev_btn_state and not curr_btn_state:
-        print("Button pressed")
-        try:
-            osc_msg = build_osc_message('/button/press', 33)
-            if drv is not None:
-                drv.sequence[0] = adafruit_drv2605.Effect(haptic_effect)
-                drv.play()  # Trigger haptic motor on press
+def handle_button_events(button, outbound, templates, drv, haptic_pattern=(1,), order=SEND_FIRST, haptics=None):
+    """
+    Handle all debounced button press and release events up to now.
+    drv is a HapticDriver (or None), which plays haptic_pattern on press,
+    before or after the event is sent as `order` says; DEFERRED queues the
+    pattern on `haptics` for the haptic task instead.
+    """
+    edge = button.poll(ticks_ms())
+    start_handling = profile.now() if edge else 0
+    while edge:
+        memory.critical = True  # No collection until the events are sent
+        memory.activity(button.timestamp)
+        # Detect button press (pin pulled low)
+        if edge == EDGE_PRESS:
+            log.log(LOG_PRESS)
+            press = templates['press']
+            press.set_int(1, button.timestamp)
+            if order == ACTUATE_FIRST:
+                actuate(drv, haptic_pattern)  # Trigger haptic motor on press
+            try:
+                start = profile.now()
+                outbound.send(press.buffer, button.timestamp)
+                profile.add(SEND, start)
+                telemetry.events_sent += 1
+                log.log(LOG_PRESS_SENT)
+            except Exception as e:
+                telemetry.send_errors += 1
+                log.log(LOG_PRESS_FAILED, 0, 0, e)
             else:
-                print("⚠ Haptic motor not available - skipping haptic feedback")
-            send_sock.sendto(osc_msg, (config['PC_IP'], config['PORT']))
-            print("✓ OSC UDP packet sent for press!")
+                if order == SEND_FIRST:
+                    actuate(drv, haptic_pattern)
+                elif order == DEFERRED:
+                    haptics.put(haptic_pattern)
+
+        # Detect button release (pin back high)
+        else:
+            log.log(LOG_RELEASE)
+            try:
+                release = templates['release']
+                release.set_int(0, button.timestamp)
+                start = profile.now()
+                outbound.send(release.buffer, button.timestamp)
+                profile.add(SEND, start)
+                telemetry.events_sent += 1
+                log.log(LOG_RELEASE_SENT)
+            except Exception as e:
+                telemetry.send_errors += 1
+                log.log(LOG_RELEASE_FAILED, 0, 0, e)
+
+        edge = button.poll(ticks_ms())
+
+    memory.critical = False
+    if start_handling:
+        profile.add(BUTTON, start_handling)
+    if button.take_overflow():
+        log.log(LOG_BUTTON_OVERFLOW)
+
+def handle_incoming_messages(recv_sock, ring, router, budget, reply_to=None):
+    """
+    Drain up to `budget` pending datagrams into the receive ring, then handle
+    every OSC message or bundle in it, decoded in place in the ring buffers.
+    Given a `reply_to` sender, retargets it to the source of each valid packet
+    before the packet's messages are handled.
+    Returns the number of datagrams drained.
+    """
+    try:
+        drained = ring.drain(recv_sock, budget)
+    except Exception as e:
+        log.log(LOG_RECEIVE_FAILED, 0, 0, e)
+        return 0
+    start = profile.now() if drained else 0
+    while ring.count:
+        buffer, length = ring.peek()
+        try:
+            if reply_to is not None and ring.peek_source() != reply_to.address:
+                # Retarget before dispatching so replies to this packet
+                # already go to its source
+                if router.is_valid(buffer, length):
+                    reply_to.retarget(ring.peek_source())
+                    log.log(LOG_REPLY_TO, 0, 0, reply_to.address)
+            if not walk_bundle(buffer, length, router.route):
+                log.log(LOG_BUNDLE_MALFORMED)
         except Exception as e:
-            print(f"✗ Error sending OSC UDP packet on button press: {e}")
+            log.log(LOG_HANDLE_FAILED, 0, 0, e)
+        ring.pop()
+    if start:
+        profile.add(RECEIVE, start)
+    return drained
 
-    # Detect button release (transition from pressed to not pressed)
-    if not prev_btn_state and curr_btn_state:
-        print("Button released")
+def socket_drops(sock):
+    """Datagrams dropped by the network stack for sock, or -1 if unknown"""
+    return getattr(sock, 'drops', -1)
+
+# ============================================================================
+# CONTROLLER TASKS
+# ============================================================================
+
+async def button_task(button, outbound, config, templates, drv, haptics):
+    """Send OSC events for button edges; yields when no edge is pending"""
+    idle = config['IDLE_SLEEP_MS'] / 1000
+    pattern = config['HAPTIC_PRESS']
+    order = HAPTIC_ORDERS[config['HAPTIC_ORDER']]
+    countdown = 1  # Loop passes until the next profiler tick
+    while True:
+        countdown -= 1
+        if not countdown:
+            countdown = profile.tick()
+        handle_button_events(button, outbound, templates, drv, pattern, order, haptics)
+        await asyncio.sleep(idle)
+
+async def bank_task(bank, outbound, config, templates):
+    """Scan the seesaw button banks every BANK_SCAN_MS and send their edges"""
+    interval = config['BANK_SCAN_MS'] / 1000
+    presses = templates['bank_press']
+    releases = templates['bank_release']
+
+    def send_edge(button, pressed, now):
+        template = presses[button] if pressed else releases[button]
+        template.set_int(0, now)
+        memory.critical = True
+        memory.activity(now)
+        start = profile.now()
         try:
-            osc_msg = build_osc_message('/button/release', "test")
-            send_sock.sendto(osc_msg, (config['PC_IP'], config['PORT']))
-            print("✓ OSC UDP packet sent for release!")
+            outbound.send(template.buffer, now)
+            telemetry.events_sent += 1
         except Exception as e:
-            print(f"✗ Error: {e}")
-        time.sleep(0.2)  # Debounce after release
+            telemetry.send_errors += 1
+            log.log(LOG_BANK_SEND_FAILED, button, 0, e)
+        profile.add(SEND, start)
+        memory.critical = False
 
-    return curr_btn_state
+    while True:
+        try:
+            bank.scan(ticks_ms(), send_edge)
+        except Exception as e:
+            log.log(LOG_BANK_SCAN_FAILED, 0, 0, e)
+        await asyncio.sleep(interval)
 
-def handle_incoming_messages(recv_sock, recv_buffer, drv):
-    """Handle incoming OSC messages"""
-    try:
-        bytes_received, addr = recv_sock.recvfrom_into(recv_buffer)
-        if bytes_received > 0:
-            data = recv_buffer[:bytes_received]
-            osc_address = parse_osc_message(data)
-            if osc_address:
-                handle_incoming_osc(osc_address, drv)
-    except OSError:
-        # No data received (timeout), continue
-        pass
-    except Exception as e:
-        print(f"Error receiving OSC: {e}")
+async def receive_task(link, ring, router, config):
+    """Drain and handle incoming OSC messages; yields after every pass"""
+    idle = config['IDLE_SLEEP_MS'] / 1000
+    budget = config['RECV_BUDGET']
+    reply = config['REPLY_TO_SOURCE']
+    while True:
+        reply_to = link.sender if reply else None
+        if handle_incoming_messages(link.recv_sock, ring, router, budget, reply_to):
+            await asyncio.sleep(0)  # Let the button task run between bursts
+        else:
+            await asyncio.sleep(idle)
+
+async def haptic_task(drv, haptics):
+    """Play queued haptic patterns; sleeps until one is requested"""
+    while True:
+        pattern = await haptics.get()
+        if drv is not None:
+            log.log(LOG_HAPTIC_PLAY, pattern[0])
+        actuate(drv, pattern)
+
+async def memory_task(button, link, config, templates):
+    """
+    Sample the heap every GC_CHECK_MS and collect in idle windows. A
+    requested heap report probes for the largest free block one collection
+    per idle pass, and is sent once the probe is done
+    """
+    interval = config['GC_CHECK_MS'] / 1000
+    debouncer = button.debouncer
+    while True:
+        await asyncio.sleep(interval)
+        ticks = ticks_ms()
+        held = debouncer.pressed
+        collected = memory.step(ticks, held)
+        # At most one collection a pass: a probe step only where step() had none
+        if memory.report_pending and not collected and link.up and memory.idle(ticks, held):
+            if memory.probe_step(ticks):
+                memory.report_pending = False
+                send_memory(link.sender, templates)
+
+async def heartbeat_task(link, ring, config, templates):
+    """Periodically announce the device is alive and report receive counters"""
+    interval = config['HEARTBEAT_MS']
+    heartbeat = templates['heartbeat']
+    rx_stats = templates['rx_stats']
+    while True:
+        await asyncio.sleep(interval / 1000)
+        if not link.up:
+            continue
+        send = link.sender.send
+        try:
+            heartbeat.set_int(1, telemetry.uptime_ms)
+            send(heartbeat.buffer)
+            rx_stats.set_int(1, wrap_int32(ring.received))
+            rx_stats.set_int(2, ring.last_drained)
+            rx_stats.set_int(3, ring.max_drained)
+            rx_stats.set_int(4, ring.high_water)
+            rx_stats.set_int(5, ring.full)
+            rx_stats.set_int(6, socket_drops(link.recv_sock))
+            send(rx_stats.buffer)
+        except Exception as e:
+            telemetry.send_errors += 1
+            log.log(LOG_HEARTBEAT_FAILED, 0, 0, e)
+
+async def handshake_task(link, config, templates, handshake):
+    """
+    Announce the device until the PC acks, then re-announce periodically
+    and whenever the handshake is restarted.
+    """
+    reannounce = config['HANDSHAKE_REANNOUNCE_MS'] / 1000
+    while True:
+        handshake.acked = False
+        handshake.attempts = 0
+        while not handshake.acked:
+            handshake.attempts += 1
+            handshake.ack.clear()
+            if link.up:
+                send_handshake(link.sender, templates)
+            try:
+                await asyncio.wait_for(handshake.ack.wait(), handshake.backoff_ms() / 1000)
+            except asyncio.TimeoutError:
+                pass
+        log.log(LOG_HANDSHAKE_ACKED, handshake.attempts)
+        handshake.restarted.clear()
+        if reannounce <= 0:
+            await handshake.restarted.wait()
+            continue
+        try:
+            await asyncio.wait_for(handshake.restarted.wait(), reannounce)
+        except asyncio.TimeoutError:
+            pass
+
+async def clock_sync_task(link, config, templates, clock):
+    """Ping the PC clock: a quick burst at startup, then every CLOCK_SYNC_MS"""
+    ping = templates['clock_ping']
+    burst = 4
+    while True:
+        try:
+            if link.up:
+                ping.set_int(1, clock.start_ping())
+                link.sender.send(ping.buffer)
+        except Exception as e:
+            telemetry.send_errors += 1
+            log.log(LOG_CLOCK_PING_FAILED, 0, 0, e)
+        if burst:
+            burst -= 1
+            await asyncio.sleep(0.25)
+        else:
+            await asyncio.sleep(config['CLOCK_SYNC_MS'] / 1000)
+
+async def wifi_supervisor_task(link, config, templates, aggregator, handshake):
+    """Detect a lost WiFi link; rejoin, re-create the sockets and re-announce"""
+    interval = config['WIFI_CHECK_MS'] / 1000
+    reconnected = templates['reconnected']
+    while True:
+        await asyncio.sleep(interval)
+        if wifi.radio.connected:
+            continue
+        lost_ms = local_ms()
+        link.up = False
+        log.log(LOG_WIFI_LOST)
+        attempts = 0
+        while True:
+            attempts += 1
+            # Rejoin the cached AP; every fourth attempt scans in case it moved
+            if wifi.radio.connected or link.rejoin(config['WIFI_FAST_RECONNECT'] and attempts % 4 != 0):
+                try:
+                    link.reopen_sockets()
+                    break
+                except Exception as e:
+                    log.log(LOG_SOCKETS_REOPEN_FAILED, 0, 0, e)
+            await asyncio.sleep(jittered_backoff_ms(attempts, config['WIFI_RETRY_MS'], 8000) / 1000)
+        aggregator.sender = link.sender
+        link.up = True
+        reconnect_ms = local_ms() - lost_ms
+        link.reconnects += 1
+        link.last_reconnect_ms = reconnect_ms
+        link.max_reconnect_ms = max(link.max_reconnect_ms, reconnect_ms)
+        log.log(LOG_WIFI_RECONNECTED, reconnect_ms, attempts)
+        try:
+            reconnected.set_int(1, reconnect_ms)
+            reconnected.set_int(2, attempts)
+            reconnected.set_int(3, link.reconnects)
+            link.sender.send(reconnected.buffer)
+        except Exception as e:
+            telemetry.send_errors += 1
+            log.log(LOG_RECONNECT_REPORT_FAILED, 0, 0, e)
+        handshake.restart()
+
+async def run_controller(button, bank, drv, link, config, templates):
+    """Run the controller tasks until cancelled"""
+    ring = ReceiveRing(config['RECV_RING'])
+    haptics = HapticQueue()
+    clock = ClockSync()
+    scheduler = OscScheduler()
+    aggregator = EventAggregator(
+        link.sender, clock, window_ms=config['AGGREGATE_MS'], mtu=config['AGGREGATE_MTU'],
+    )
+    reliable = None
+    redundant = None
+    if config['REDUNDANCY'] > 0:
+        redundant = RedundantSender(aggregator, max_copies=config['REDUNDANCY'])
+    elif config['RELIABLE']:
+        reliable = ReliableSender(
+            aggregator, window=config['RELIABLE_WINDOW'], max_retries=config['RELIABLE_RETRIES'],
+        )
+    outbound = redundant or reliable or aggregator
+    handshake = Handshake(int(config['DEVICE_ID']), config['HANDSHAKE_RETRY_MS'], config['HANDSHAKE_MAX_MS'])
+    dispatcher = build_dispatcher(haptics, clock, handshake, reliable, redundant, link, ring, templates)
+    templates['handshake'] = build_handshake_template(config, dispatcher, len(templates['bank_press']))
+    router = OscRouter(dispatcher, clock, scheduler)
+    tasks = [
+        asyncio.create_task(handshake_task(link, config, templates, handshake)),
+        asyncio.create_task(button_task(button, outbound, config, templates, drv, haptics)),
+        asyncio.create_task(receive_task(link, ring, router, config)),
+        asyncio.create_task(scheduler.run(OscMessage(), router.handle, log_failure(LOG_HANDLE_FAILED))),
+        asyncio.create_task(haptic_task(drv, haptics)),
+    ]
+    if config['WIFI_CHECK_MS'] > 0:
+        tasks.append(asyncio.create_task(wifi_supervisor_task(link, config, templates, aggregator, handshake)))
+    if bank is not None:
+        tasks.append(asyncio.create_task(bank_task(bank, outbound, config, templates)))
+    if config['AGGREGATE_MS'] > 0:
+        tasks.append(asyncio.create_task(aggregator.run(log_failure(LOG_BUNDLE_SEND_FAILED))))
+    if reliable is not None:
+        tasks.append(asyncio.create_task(reliable.run(log_failure(LOG_RETRANSMIT_FAILED))))
+    if config['HEARTBEAT_MS'] > 0:
+        tasks.append(asyncio.create_task(heartbeat_task(link, ring, config, templates)))
+    if config['CLOCK_SYNC_MS'] > 0:
+        tasks.append(asyncio.create_task(clock_sync_task(link, config, templates, clock)))
+    if config['GC_CHECK_MS'] > 0:
+        tasks.append(asyncio.create_task(memory_task(button, link, config, templates)))
+    if config['LOG_OSC']:
+        log.writer = osc_log_writer(link, int(config['DEVICE_ID']))
+    tasks.append(asyncio.create_task(log.run(config['LOG_FLUSH_MS'])))
+    await asyncio.gather(*tasks)
 
 # ============================================================================
 # MAIN APPLICATION
 # ============================================================================
 
+def send_boot_report(sender, templates, boot, sockets, socket_heap):
+    """Print the boot timing report and send it to the PC as /button/boot"""
+    boot.report()
+    print(f"UDP sockets: {sockets}, socket heap: {socket_heap} bytes")
+    report = templates['boot']
+    for i, phase in enumerate(boot.PHASES):
+        report.set_int(i + 1, boot.durations.get(phase, 0))
+    report.set_int(len(boot.PHASES) + 1, boot.total_ms)
+    report.set_int(len(boot.PHASES) + 2, sockets)
+    report.set_int(len(boot.PHASES) + 3, socket_heap)
+    try:
+        sender.send(report.buffer)
+    except Exception as e:
+        print(f"✗ Boot report failed: {e}")
+
 def main():
     """Main application entry point"""
+    boot = BootTimer()
+
     # Load configuration
     config = load_configuration()
+    log.configure(LEVELS[config['LOG_LEVEL']], config['LOG_SLOTS'])
+    profile.enable(bool(config['PROFILE']), config['PROFILE_OVERRUN_MS'] * 1000, config['PROFILE_SAMPLE'])
+    boot.mark('config')
     
     # Initialize hardware
-    btn = setup_button()
-    drv = setup_haptic()
+    button = setup_button(config)
+    bank = setup_button_bank(config)
+    drv = setup_haptic(config)
+    boot.mark('hardware')
     
     # Connect to WiFi
     esp32_ip = connect_wifi(config)
     if esp32_ip is None:
         print("Failed to connect to WiFi. Check credentials and try again.")
         return
+    boot.mark('wifi')
     
     # Setup network sockets
-    send_sock, recv_sock = setup_sockets(config)
-    recv_buffer = bytearray(1024)
-    
-    # Send handshake message to announce device startup
-    print("Sending startup handshake...")
-    send_handshake(send_sock, config)
+    free_before = heap_free()
+    sender, recv_sock = setup_sockets(config)
+    socket_heap = free_before - heap_free() if free_before >= 0 else -1
+    templates = build_message_templates(config, bank.count if bank else 0)
+    boot.mark('sockets')
+    send_boot_report(sender, templates, boot, socket_count(config), socket_heap)
     
     print("Ready! Press button...")
-    prev_btn_state = True  # Assume button is not pressed at start (HIGH)
     
-    # Main loop
-    while True:
-        # Handle incoming OSC messages
-        handle_incoming_messages(recv_sock, recv_buffer, drv)
-        
-        # Handle button events
-        prev_btn_state = handle_button_events(btn, prev_btn_state, send_sock, config, drv)
-        
-        time.sleep(0.05)
+    # Run the controller tasks (the first announces the device), starting
+    # from a heap cleared of boot-time garbage; from here on GC_MODE decides
+    # when to collect
+    link = WifiLink(config, sender, recv_sock)
+    # Without the memory task nothing would collect: keep automatic collection
+    memory.configure(
+        config['GC_MODE'] if config['GC_CHECK_MS'] > 0 else 0, config['GC_IDLE_MS'], config['GC_THRESHOLD'],
+        config['GC_INTERVAL_MS'], config['GC_RESERVE'],
+    )
+    memory.collect(ticks_ms())
+    asyncio.run(run_controller(button, bank, drv, link, config, templates))
 
 # Start the application
 if __name__ == "__main__":
@@ -0,0 +1,117 @@
+"""
+Haptic Output
+=============
+DRV2605 driver wrapper that avoids redundant I2C writes.
+
+Every waveform sequence register write is an I2C transaction, and writing
+sequence slot 0 with a new Effect on every press also allocates. The
+wrapper remembers what each of the 8 sequence slots holds and writes only
+the slots that differ, so replaying the pattern already programmed costs a
+single GO write. A pattern of up to 8 entries (effects, or pauses made
+with pause()) is programmed once into the slots and the DRV2605 plays it
+through from one GO.
+
+Effect and Pause objects are created once per distinct value and reused.
+
+Given a trigger pin wired to the DRV2605 IN/TRIG input (with the chip in
+external edge trigger mode), GO is a rising edge on that pin instead of an
+I2C write, so a press whose pattern is programmed costs no I2C at all.
+"""
+
+import adafruit_drv2605
+
+SLOTS = 8        # DRV2605 waveform sequence registers
+UNKNOWN = -1     # Slot contents not written by the wrapper yet
+
+_singles = {}    # Effect id -> one-entry pattern
+
+def pause(ms):
+    """Sequence entry for a pause of ms milliseconds (10 ms steps, up to 1270)"""
+    return 0x80 | min(127, ms // 10)
+
+def single(effect):
+    """The one-entry pattern playing `effect`, the same tuple every time"""
+    pattern = _singles.get(effect)
+    if pattern is None:
+        pattern = _singles[effect] = (effect,)
+    return pattern
+
+def parse_pattern(text):
+    """
+    Sequence entries from comma separated effect ids (1-123) and pauses
+    written p<ms>, e.g. "1,p50,47"
+    """
+    entries = []
+    for item in text.split(','):
+        item = item.strip()
+        if item.startswith('p'):
+            entries.append(pause(int(item[1:])))
+        else:
+            effect = int(item)
+            if not 1 <= effect <= 123:
+                raise ValueError(f"Invalid haptic effect: {effect}")
+            entries.append(effect)
+    if not 1 <= len(entries) <= SLOTS:
+        raise ValueError(f"A haptic pattern has 1 to {SLOTS} entries")
+    return tuple(entries)
+
+class HapticDriver:
+    """
+    DRV2605 with a cache of its waveform sequence registers. Play a
+    pattern (a tuple of entries) with play(pattern); programming the same
+    tuple again skips the comparison altogether. trigger is an output
+    DigitalInOut on IN/TRIG, or None to start playback over I2C.
+    """
+
+    def __init__(self, drv, trigger=None):
+        self.drv = drv
+        self.trigger = trigger
+        self.go = drv.play if trigger is None else self._pulse
+        self.slots = [UNKNOWN] * SLOTS
+        self.pattern = None       # Tuple last programmed
+        self.waveforms = {}       # Entry -> reusable Effect or Pause
+        self.writes = 0           # Sequence register writes made
+        self.skipped = 0          # Sequence register writes avoided
+
+    def waveform(self, entry):
+        """The Effect or Pause object for a sequence entry"""
+        waveform = self.waveforms.get(entry)
+        if waveform is None:
+            if entry & 0x80:
+                waveform = adafruit_drv2605.Pause((entry & 0x7F) / 100)
+            else:
+                waveform = adafruit_drv2605.Effect(entry)
+            self.waveforms[entry] = waveform
+        return waveform
+
+    def _write(self, slot, entry):
+        if self.slots[slot] == entry:
+            self.skipped += 1
+            return
+        self.drv.sequence[slot] = self.waveform(entry)
+        self.slots[slot] = entry
+        self.writes += 1
+
+    def program(self, pattern):
+        """Write the slots of `pattern` (and its end marker) that differ"""
+        if pattern is self.pattern:
+            self.skipped += len(pattern)
+            return
+        for slot in range(len(pattern)):
+            self._write(slot, pattern[slot])
+        if len(pattern) < SLOTS:
+            self._write(len(pattern), 0)  # Effect 0 ends the sequence
+        self.pattern = pattern
+
+    def _pulse(self):
+        trigger = self.trigger
+        trigger.value = True   # The rising edge sets GO
+        trigger.value = False
+
+    def play(self, pattern):
+        """Program `pattern` if needed and start it with one GO"""
+        self.program(pattern)
+        self.go()
+
+    def stop(self):
+        self.drv.stop()
@@ -0,0 +1,130 @@
+"""
+Event Log
+=========
+Logging for the controller tasks that neither formats nor blocks on the hot
+path.
+
+Every log message is registered up front in a table of (level, format)
+pairs and logged by its index with up to two integer arguments and one
+object (usually an exception). log() drops messages below the configured
+level with a single comparison, before touching any argument, and
+otherwise stores a binary record (code, ticks, ints, object) in a ring of
+preallocated arrays.
+
+Formatting happens only when the log task flushes the ring, one record per
+idle slot of the event loop, and a full ring drops new records (counted)
+rather than waiting for the serial port. Flushed lines go to the serial
+console, or to any writer(level, ticks_ms, text), such as an OSC stream to
+the PC.
+"""
+
+from array import array
+
+import asyncio
+from adafruit_ticks import ticks_ms
+
+try:
+    import supervisor
+except ImportError:
+    supervisor = None  # Host Python: the console is always there
+
+DEBUG = 10
+INFO = 20
+WARNING = 30
+ERROR = 40
+OFF = 100
+
+LEVELS = {'debug': DEBUG, 'info': INFO, 'warning': WARNING, 'error': ERROR, 'off': OFF}
+
+def serial_writer(level, ticks, text):
+    """Print a flushed line, unless no host is reading the USB console"""
+    if supervisor is None or supervisor.runtime.serial_connected:
+        print(text)
+
+class EventLog:
+    """
+    Ring of binary log records, formatted and written by the log task.
+    messages is a sequence of (level, format); formats see the record's
+    arguments as {0} and {1} (ints) and {2} (the object).
+    """
+
+    def __init__(self, messages, level=INFO, slots=64):
+        self.levels = bytearray(level for level, _ in messages)
+        self.formats = [text for _, text in messages]
+        self.writer = serial_writer
+        self.configure(level, slots)
+
+    def configure(self, level, slots=None):
+        """Set the level and (re)allocate the ring; call before the tasks start"""
+        self.level = level
+        self.pending = asyncio.Event()
+        if slots is not None:
+            self.codes = bytearray(slots)
+            self.ticks = array('i', [0] * slots)
+            self.a = array('i', [0] * slots)
+            self.b = array('i', [0] * slots)
+            self.objects = [None] * slots
+            self.head = 0
+            self.count = 0
+        # Counters
+        self.logged = 0
+        self.dropped = 0
+        self.reported = 0
+
+    def log(self, code, a=0, b=0, obj=None):
+        """Record message `code` if its level is enabled; never formats or blocks"""
+        if self.levels[code] < self.level:
+            return
+        size = len(self.codes)
+        if self.count == size:
+            self.dropped += 1
+            return
+        index = (self.head + self.count) % size
+        self.codes[index] = code
+        self.ticks[index] = ticks_ms()
+        self.a[index] = a
+        self.b[index] = b
+        self.objects[index] = obj
+        self.count += 1
+        self.logged += 1
+        if self.count == 1:
+            self.pending.set()
+
+    def format(self, index):
+        """Text of the record in ring slot `index`"""
+        return self.formats[self.codes[index]].format(self.a[index], self.b[index], self.objects[index])
+
+    def flush(self, budget=1):
+        """Format and write up to `budget` records; returns how many were written"""
+        written = 0
+        while self.count and written < budget:
+            index = self.head
+            text = self.format(index)
+            self.objects[index] = None  # Do not keep exceptions alive
+            self.head = (index + 1) % len(self.codes)
+            self.count -= 1
+            try:
+                self.writer(self.levels[self.codes[index]], self.ticks[index], text)
+            except Exception:
+                pass  # Nowhere left to report it
+            written += 1
+        return written
+
+    async def run(self, delay_ms=50):
+        """
+        Task body: once records are pending, wait `delay_ms` for the burst
+        that logged them to finish, then write one record per loop pass.
+        """
+        while True:
+            while not self.count:
+                self.pending.clear()
+                await self.pending.wait()
+            await asyncio.sleep(delay_ms / 1000)
+            while self.flush():
+                await asyncio.sleep(0)
+            if self.dropped != self.reported:
+                self.reported = self.dropped
+                try:
+                    self.writer(WARNING, ticks_ms(), f"⚠ {self.dropped} log records dropped (ring full)")
+                except Exception:
+                    pass  # Nowhere left to report it
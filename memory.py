@@ -0,0 +1,199 @@
+"""
+Memory Management
+=================
+Keeps garbage collection out of the press-to-send path.
+
+In IDLE mode automatic collection is disabled and the memory task collects
+only in idle windows: button released, no press-to-send section running and
+no button edge for idle_ms. It collects once `threshold` bytes have been
+allocated since the last collection, or every interval_ms where the
+platform cannot count allocations. With automatic collection off a full
+heap raises MemoryError instead of collecting, so below `reserve` free
+bytes the task collects at its next pass even outside an idle window; that
+is still between event handlers, never inside one, and is counted as an
+emergency collection.
+
+Every pass also samples the heap for the allocation rate and the heap
+high-water mark. report() adds the largest block that can still be
+allocated and the fragmentation that implies. Finding that block takes a
+dozen or so collections, so probe_step() runs the search one collection at
+a time, one step per idle memory task pass, for a report asked for with
+report_pending.
+"""
+
+import gc
+import time
+
+from adafruit_ticks import ticks_diff
+
+# Collection modes
+AUTOMATIC = 0  # The runtime collects whenever an allocation crosses its threshold
+IDLE = 1       # Collect in idle windows only (or when the heap runs low)
+
+def heap_free():
+    """Free heap in bytes, or -1 where gc cannot tell (host Python)"""
+    mem_free = getattr(gc, 'mem_free', None)
+    return mem_free() if mem_free is not None else -1
+
+def heap_used():
+    """Allocated heap in bytes, or -1 where gc cannot tell (host Python)"""
+    mem_alloc = getattr(gc, 'mem_alloc', None)
+    return mem_alloc() if mem_alloc is not None else -1
+
+class MemoryManager:
+    """
+    Idle-window garbage collection and heap statistics. Mark the
+    press-to-send section with
+        memory.critical = True
+        ...
+        memory.critical = False
+    record button edges with activity(ticks), and call step() from a task.
+    """
+
+    def __init__(self, mode=AUTOMATIC, idle_ms=50, threshold=8192, interval_ms=1000, reserve=16384):
+        self.critical = False     # Inside press-to-send: never collect
+        self.last_activity = 0    # Ticks of the last button edge
+        self.report_pending = False  # A report waits for an idle window
+        self.probe = None         # [low, high] of the largest free block search
+        self.largest_free = -1    # Result of the last finished search
+        self.configure(mode, idle_ms, threshold, interval_ms, reserve)
+
+    def configure(self, mode, idle_ms=None, threshold=None, interval_ms=None, reserve=None):
+        """Select the collection mode; IDLE disables automatic collection"""
+        self.mode = mode
+        if idle_ms is not None:
+            self.idle_ms = idle_ms
+        if threshold is not None:
+            self.threshold = threshold
+        if interval_ms is not None:
+            self.interval_ms = interval_ms
+        if reserve is not None:
+            self.reserve = reserve
+        if mode == IDLE:
+            gc.disable()
+        else:
+            gc.enable()
+        self.reset()
+
+    def reset(self):
+        self.collections = 0
+        self.emergency = 0        # Collections outside an idle window, for a low heap
+        self.gc_total_us = 0
+        self.gc_max_us = 0
+        self.collected_at = 0     # Ticks of the last collection
+        self.used_at_collect = heap_used()
+        self.sample_used = self.used_at_collect
+        self.sample_ticks = None
+        self.alloc_rate = -1      # Bytes allocated per second over the last pass
+        self.peak_alloc_rate = -1
+        self.high_water = self.sample_used
+
+    def activity(self, ticks):
+        """Record a button edge at `ticks`; the idle window starts over"""
+        self.last_activity = ticks
+
+    def idle(self, ticks, held=False):
+        """True in an idle window: outside press-to-send, released, no recent edge"""
+        return not (self.critical or held or ticks_diff(ticks, self.last_activity) < self.idle_ms)
+
+    def collect(self, ticks=None):
+        """Run the collector now, counting and timing it; returns its duration in us"""
+        start = time.monotonic_ns()
+        gc.collect()
+        elapsed = (time.monotonic_ns() - start) // 1000
+        self.collections += 1
+        self.gc_total_us += elapsed
+        if elapsed > self.gc_max_us:
+            self.gc_max_us = elapsed
+        if ticks is not None:
+            self.collected_at = ticks
+        self.used_at_collect = heap_used()
+        return elapsed
+
+    def sample(self, ticks):
+        """Update the allocation rate and heap high-water mark"""
+        used = heap_used()
+        if used < 0:
+            return
+        if used > self.high_water:
+            self.high_water = used
+        if self.sample_ticks is not None and used >= self.sample_used:
+            # A drop in used heap means a collection ran; that pass is skipped
+            elapsed = ticks_diff(ticks, self.sample_ticks)
+            if elapsed > 0:
+                rate = (used - self.sample_used) * 1000 // elapsed
+                self.alloc_rate = rate
+                if rate > self.peak_alloc_rate:
+                    self.peak_alloc_rate = rate
+        self.sample_used = used
+        self.sample_ticks = ticks
+
+    def step(self, ticks, held=False):
+        """
+        One memory task pass at `ticks`; held means a button is down.
+        Returns True if it collected.
+        """
+        self.sample(ticks)
+        if self.mode != IDLE or self.critical:
+            return False
+        free = heap_free()
+        if 0 <= free < self.reserve:
+            self.emergency += 1
+            self.collect(ticks)
+            return True
+        if not self.idle(ticks, held):
+            return False
+        used = heap_used()
+        if used >= 0:
+            due = used - self.used_at_collect >= self.threshold
+        else:
+            due = ticks_diff(ticks, self.collected_at) >= self.interval_ms
+        if due:
+            self.collect(ticks)
+        return due
+
+    def probe_step(self, ticks=None, precision=256):
+        """
+        One step of the search for the largest block that can be allocated,
+        to within `precision` bytes: the first step collects, every later one
+        tries one allocation and collects. Returns True once the search is
+        over and report() has its result (-1 where the free heap is unknown).
+        """
+        probe = self.probe
+        if probe is None:
+            self.collect(ticks)
+            free = heap_free()
+            if free < 0:
+                self.largest_free = -1
+                return True
+            self.probe = probe = [0, free + 1]
+        else:
+            size = (probe[0] + probe[1]) // 2
+            try:
+                block = bytearray(size)
+                del block
+                probe[0] = size
+            except MemoryError:
+                probe[1] = size
+            self.collect(ticks)
+        if probe[1] - probe[0] > precision:
+            return False
+        self.largest_free = probe[0]
+        self.probe = None
+        return True
+
+    def report(self):
+        """
+        Return (heap_free, heap_used, high_water, largest_free,
+        fragmentation_permille), -1 where unknown. largest_free is the result
+        of the probe_step() search finished since the last report, if any.
+        Fragmentation is the share of free heap not usable by one allocation.
+        """
+        largest = self.largest_free
+        self.largest_free = -1
+        free = heap_free()
+        if free > 0 and largest >= 0:
+            fragmentation = max(0, 1000 - largest * 1000 // free)
+        else:
+            fragmentation = -1
+        return free, heap_used(), self.high_water, largest, fragmentation
@@ -0,0 +1,422 @@
+"""
+OSC Protocol
+============
+OSC 1.0 message encoding and decoding for the button controller.
+
+Messages sent on the hot path are compiled once into an OscTemplate: the
+address, type tags and string arguments are encoded a single time into a
+reusable bytearray, and only the numeric argument slots are patched in place
+at send time. Sending a templated message does not allocate on the heap.
+
+Incoming datagrams are decoded in place by a reusable OscMessage, which
+returns string and blob arguments as views into the receive buffer, and
+routed to handlers by an OscDispatcher.
+"""
+
+import re
+import struct
+
+# ============================================================================
+# MESSAGE ENCODING
+# ============================================================================
+
+def pad4(s):
+    """Pad bytes to next multiple of 4 bytes (OSC requirement)"""
+    return s + (b'\x00' * ((4 - (len(s) % 4)) % 4))
+
+def osc_type_tag(arg):
+    """Return the OSC type tag character used to encode an argument"""
+    if isinstance(arg, str):
+        return 's'  # string type
+    if isinstance(arg, float):
+        return 'f'  # 32-bit float type
+    if isinstance(arg, (bytes, bytearray)):
+        return 'b'  # blob type
+    # Integers, and anything else converted to an integer for compatibility
+    return 'i'
+
+def build_osc_message(address, *args):
+    """
+    Build a minimal OSC message.
+    Supports integer, float, string and blob (bytes) arguments.
+    """
+    # OSC strings are always NUL terminated, then padded
+    msg = pad4(address.encode('utf-8') + b'\x00')
+
+    # Build type tag string based on argument types
+    type_tags = ','
+    for arg in args:
+        type_tags += osc_type_tag(arg)
+
+    msg += pad4(type_tags.encode('utf-8') + b'\x00')
+
+    # Add arguments based on their types
+    for arg in args:
+        if isinstance(arg, str):
+            # String arguments need to be null-terminated and padded
+            string_data = arg.encode('utf-8') + b'\x00'
+            msg += pad4(string_data)
+        elif isinstance(arg, float):
+            # Float arguments are 4-byte big-endian IEEE 754
+            msg += struct.pack('>f', arg)
+        elif isinstance(arg, (bytes, bytearray)):
+            # Blobs are a 4-byte size, then the data padded
+            msg += len(arg).to_bytes(4, 'big') + pad4(bytes(arg))
+        elif isinstance(arg, int):
+            # Integer arguments are 4-byte big-endian
+            msg += arg.to_bytes(4, 'big', signed=True)
+        else:
+            # Convert other types to integers
+            msg += int(arg).to_bytes(4, 'big', signed=True)
+
+    return msg
+
+def build_osc_bundle(timetag, *elements):
+    """
+    Build an OSC bundle from already encoded messages or bundles.
+    timetag is a 64-bit NTP timestamp; TIMETAG_IMMEDIATE means "now".
+    """
+    bundle = BUNDLE_HEADER + struct.pack('>Q', timetag)
+    for element in elements:
+        bundle += struct.pack('>i', len(element)) + element
+    return bundle
+
+# ============================================================================
+# TIMETAGS
+# ============================================================================
+
+BUNDLE_HEADER = b'#bundle\x00'
+
+# Special timetag meaning "execute immediately"
+TIMETAG_IMMEDIATE = 1
+
+def timetag_to_ms(timetag):
+    """Convert a 64-bit NTP timetag to milliseconds since 1900"""
+    return (timetag >> 32) * 1000 + (((timetag & 0xFFFFFFFF) * 1000) >> 32)
+
+def ms_to_timetag(ms):
+    """Convert milliseconds since 1900 to a 64-bit NTP timetag"""
+    seconds, millis = divmod(ms, 1000)
+    return (seconds << 32) | ((millis << 32) // 1000)
+
+# ============================================================================
+# PRECOMPILED MESSAGE TEMPLATES
+# ============================================================================
+
+class OscTemplate:
+    """
+    Precompiled OSC message with patchable numeric argument slots.
+
+    The template is built once from example arguments. String and blob
+    arguments are baked into the message; every integer or float argument
+    becomes a slot, numbered in argument order, that set_int()/set_float()
+    overwrite in place.
+    The encoded message is always available in `buffer`.
+    """
+
+    def __init__(self, address, *args):
+        self.address = address
+        self.buffer = bytearray(build_osc_message(address, *args))
+
+        # Walk the encoded layout to find the offset of each numeric argument
+        offset = len(pad4(address.encode('utf-8') + b'\x00'))
+        offset += len(pad4((',' + ''.join(osc_type_tag(a) for a in args)).encode('utf-8') + b'\x00'))
+        slots = []
+        for arg in args:
+            if isinstance(arg, str):
+                offset += len(pad4(arg.encode('utf-8') + b'\x00'))
+            elif isinstance(arg, (bytes, bytearray)):
+                offset += 4 + len(pad4(bytes(arg)))
+            else:
+                slots.append(offset)
+                offset += 4
+        self.slots = tuple(slots)
+
+    def set_int(self, slot, value):
+        """Overwrite integer argument `slot` without reallocating the message"""
+        struct.pack_into('>i', self.buffer, self.slots[slot], value)
+
+    def set_float(self, slot, value):
+        """Overwrite float argument `slot` without reallocating the message"""
+        struct.pack_into('>f', self.buffer, self.slots[slot], value)
+
+# ============================================================================
+# MESSAGE PARSING
+# ============================================================================
+
+# Type tag characters as byte values
+TAG_INT = 0x69       # i: int32
+TAG_FLOAT = 0x66     # f: float32
+TAG_STRING = 0x73    # s: OSC-string
+TAG_SYMBOL = 0x53    # S: alternate OSC-string
+TAG_BLOB = 0x62      # b: int32 size + bytes
+TAG_INT64 = 0x68     # h: int64
+TAG_TIMETAG = 0x74   # t: NTP timetag
+TAG_DOUBLE = 0x64    # d: float64
+TAG_TRUE = 0x54      # T
+TAG_FALSE = 0x46     # F
+TAG_NIL = 0x4E       # N
+TAG_IMPULSE = 0x49   # I
+
+def _align4(n):
+    return (n + 3) & ~3
+
+def _int32(buf, pos):
+    """Decode a big-endian int32 without allocating for small values"""
+    value = (buf[pos] << 24) | (buf[pos + 1] << 16) | (buf[pos + 2] << 8) | buf[pos + 3]
+    if value & 0x80000000:
+        value -= 0x100000000
+    return value
+
+class OscMessage:
+    """
+    Reusable OSC 1.0 message decoder.
+
+    decode() parses a datagram in place. Afterwards `address` holds the OSC
+    address, `tags` the type tag bytes and `args[:count]` the arguments:
+    int for i/h/t, float for f/d, True/False for T/F, None for N/I, and
+    memoryview slices of the receive buffer for s/S/b. The slices are not
+    copied, so they are only valid until the buffer receives the next datagram.
+    """
+
+    def __init__(self, max_args=8):
+        self.address = None
+        self.tags = b''
+        self.args = [None] * max_args
+        self.count = 0
+        self._buffer = None
+        self._view = None
+
+    def decode(self, buffer, end, start=0):
+        """Decode buffer[start:end]; returns False if it is not a valid message"""
+        if buffer is not self._buffer:
+            self._buffer = buffer
+            self._view = memoryview(buffer)
+        view = self._view
+        self.count = 0
+        self.tags = b''
+
+        if end - start < 4 or buffer[start] != 0x2F:  # Addresses start with '/'
+            return False
+        nul = buffer.find(b'\x00', start, end)
+        if nul < 0:
+            return False
+        try:
+            self.address = str(view[start:nul], 'utf-8')
+        except (UnicodeError, TypeError):
+            self.address = bytes(view[start:nul]).decode('utf-8')
+
+        pos = _align4(nul + 1)
+        if pos >= end or buffer[pos] != 0x2C:
+            return True  # No type tag string: a message without arguments
+        tags_end = buffer.find(b'\x00', pos, end)
+        if tags_end < 0:
+            return False
+        self.tags = view[pos + 1:tags_end]
+        args = self.args
+        max_args = len(args)
+        count = 0
+        tag_pos = pos + 1
+        pos = _align4(tags_end + 1)
+
+        while tag_pos < tags_end:
+            tag = buffer[tag_pos]
+            tag_pos += 1
+            if count == max_args:
+                return False
+            if tag == TAG_INT or tag == TAG_FLOAT:
+                if pos + 4 > end:
+                    return False
+                if tag == TAG_INT:
+                    args[count] = _int32(buffer, pos)
+                else:
+                    args[count] = struct.unpack_from('>f', buffer, pos)[0]
+                pos += 4
+            elif tag == TAG_STRING or tag == TAG_SYMBOL:
+                nul = buffer.find(b'\x00', pos, end)
+                if nul < 0:
+                    return False
+                args[count] = view[pos:nul]
+                pos = _align4(nul + 1)
+            elif tag == TAG_BLOB:
+                if pos + 4 > end:
+                    return False
+                size = _int32(buffer, pos)
+                data = pos + 4
+                if size < 0 or data + size > end:
+                    return False
+                args[count] = view[data:data + size]
+                pos = _align4(data + size)
+            elif tag == TAG_INT64 or tag == TAG_TIMETAG or tag == TAG_DOUBLE:
+                if pos + 8 > end:
+                    return False
+                fmt = '>q' if tag == TAG_INT64 else ('>Q' if tag == TAG_TIMETAG else '>d')
+                args[count] = struct.unpack_from(fmt, buffer, pos)[0]
+                pos += 8
+            elif tag == TAG_TRUE:
+                args[count] = True
+            elif tag == TAG_FALSE:
+                args[count] = False
+            elif tag == TAG_NIL or tag == TAG_IMPULSE:
+                args[count] = None
+            else:
+                return False  # Unknown tag: argument size cannot be known
+            count += 1
+
+        self.count = count
+        return True
+
+    def int_arg(self, index, default=None):
+        """Return argument `index` if it is an integer or timetag, else default"""
+        if index < self.count and self.tags[index] in (TAG_INT, TAG_INT64, TAG_TIMETAG):
+            return self.args[index]
+        return default
+
+    def float_arg(self, index, default=None):
+        """Return argument `index` as a float if it is numeric, else default"""
+        if index < self.count and self.tags[index] in (TAG_FLOAT, TAG_DOUBLE, TAG_INT, TAG_INT64):
+            return float(self.args[index])
+        return default
+
+# ============================================================================
+# BUNDLE PARSING
+# ============================================================================
+
+def is_bundle(buffer, end, start=0):
+    """True if buffer[start:end] starts with the #bundle header"""
+    return end - start >= 16 and buffer[start] == 0x23 and buffer[start:start + 8] == BUNDLE_HEADER
+
+def walk_bundle(buffer, end, on_message, start=0, timetag=TIMETAG_IMMEDIATE, depth=0):
+    """
+    Walk an OSC packet, calling on_message(buffer, start, end, timetag) for
+    every message it contains. Bundles are walked recursively and each
+    message gets the timetag of its innermost bundle; a bare message gets
+    the timetag passed in. Returns False if the packet is malformed.
+    """
+    if not is_bundle(buffer, end, start):
+        on_message(buffer, start, end, timetag)
+        return True
+    if depth >= 8:
+        return False  # Refuse pathological nesting
+    timetag = struct.unpack_from('>Q', buffer, start + 8)[0]
+    pos = start + 16
+    while pos < end:
+        if pos + 4 > end:
+            return False
+        size = _int32(buffer, pos)
+        pos += 4
+        if size <= 0 or size & 3 or pos + size > end:
+            return False
+        if not walk_bundle(buffer, pos + size, on_message, pos, timetag, depth + 1):
+            return False
+        pos += size
+    return True
+
+# ============================================================================
+# ADDRESS DISPATCH
+# ============================================================================
+
+_PATTERN_CHARS = '*?[{'
+_REGEX_SPECIAL = '.^$+()|\\'
+
+def is_osc_pattern(address):
+    """True if an address contains OSC 1.0 pattern characters"""
+    for char in _PATTERN_CHARS:
+        if char in address:
+            return True
+    return False
+
+def compile_osc_pattern(pattern):
+    """
+    Compile an OSC 1.0 address pattern into a regular expression.
+    `*` and `?` never match across `/`; `[!..]` negates a character class
+    and `{a,b}` matches any of the listed strings. Raises ValueError for
+    an invalid pattern.
+    """
+    regex = '^'
+    i = 0
+    while i < len(pattern):
+        char = pattern[i]
+        if char == '*':
+            regex += '[^/]*'
+        elif char == '?':
+            regex += '[^/]'
+        elif char == '[':
+            end = pattern.find(']', i)
+            if end < 0:
+                raise ValueError(f"Unterminated [ in OSC pattern {pattern}")
+            body = pattern[i + 1:end]
+            if body.startswith('!'):
+                body = '^' + body[1:]
+            regex += '[' + body + ']'
+            i = end
+        elif char == '{':
+            end = pattern.find('}', i)
+            if end < 0:
+                raise ValueError(f"Unterminated {{ in OSC pattern {pattern}")
+            options = pattern[i + 1:end].split(',')
+            regex += '(' + '|'.join(_escape(option) for option in options) + ')'
+            i = end
+        else:
+            regex += _escape(char)
+        i += 1
+    try:
+        return re.compile(regex + '$')
+    except Exception:
+        # re.error on CPython, ValueError on CircuitPython
+        raise ValueError(f"Invalid OSC pattern {pattern}")
+
+def _escape(text):
+    escaped = ''
+    for char in text:
+        escaped += '\\' + char if char in _REGEX_SPECIAL else char
+    return escaped
+
+class OscDispatcher:
+    """
+    Routes decoded messages to handlers registered by OSC address.
+
+    Exact addresses resolve with a single dict lookup regardless of how many
+    are registered. Addresses registered with OSC pattern characters are
+    compiled once at registration and only tried when no exact address
+    matches. An incoming address that is itself a pattern is matched against
+    every exact address, as OSC 1.0 specifies; an invalid incoming pattern
+    matches nothing.
+
+    Handlers are called as handler(message, context).
+    """
+
+    def __init__(self):
+        self.exact = {}
+        self.patterns = []  # (compiled, handler, context)
+
+    def add(self, address, handler, context=None):
+        """Register handler for an exact address or an OSC address pattern"""
+        if is_osc_pattern(address):
+            self.patterns.append((compile_osc_pattern(address), handler, context))
+        else:
+            self.exact[address] = (handler, context)
+
+    def dispatch(self, message):
+        """Call the handlers matching message.address; returns the number called"""
+        address = message.address
+        entry = self.exact.get(address)
+        if entry is not None:
+            entry[0](message, entry[1])
+            return 1
+        called = 0
+        if is_osc_pattern(address):
+            try:
+                matcher = compile_osc_pattern(address)
+            except ValueError:
+                return 0  # Not a valid pattern: matches nothing
+            for registered, entry in self.exact.items():
+                if matcher.match(registered):
+                    entry[0](message, entry[1])
+                    called += 1
+            return called
+        for matcher, handler, context in self.patterns:
+            if matcher.match(address):
+                handler(message, context)
+                called += 1
+        return called
@@ -0,0 +1,156 @@
+"""
+Loop Profiler
+=============
+Where the controller's time goes, stage by stage.
+
+Each stage (loop period, receive, button handling, haptic trigger, send)
+keeps a fixed-bucket histogram of its durations in microseconds: bucket 0
+counts durations under 1 us, bucket i those in [2**(i-1), 2**i) us and the
+last bucket everything longer. Recording a sample is a subtraction, a few
+shifts and three integer updates on preallocated lists; no allocation.
+
+The loop period is the time between passes of the button task, which runs
+on every turn of the event loop; a period longer than the overrun limit
+counts as an overrun. Even a method call on every pass would cost more
+than 1% of an idle pass, so the loop only counts down a local and calls
+tick() when it runs out; tick() returns the next countdown so that one
+period in every `sample` passes is measured (1: all of them). Stages are
+timed only when they did work. Disabled (the default), now() and add() are
+no-ops and tick() never asks to be called again.
+"""
+
+import time
+
+# Stage indices
+LOOP = 0
+RECEIVE = 1
+BUTTON = 2
+HAPTIC = 3
+SEND = 4
+
+STAGES = ('loop', 'receive', 'button', 'haptic', 'send')
+
+BUCKETS = 16  # The last bucket holds everything from 2**14 us (16.4 ms) up
+
+def _zero():
+    return 0
+
+def _skip(*args):
+    pass
+
+def _never():
+    return 0x3FFFFFFF  # Passes until the next tick(), as a small int
+
+def bucket_index(us):
+    """Histogram bucket of a duration in microseconds"""
+    index = 0
+    while us > 0 and index < BUCKETS - 1:
+        us >>= 1
+        index += 1
+    return index
+
+def bucket_limit_us(index):
+    """Upper bound of a bucket in microseconds (exclusive)"""
+    return 1 << index
+
+class Histogram:
+    """Fixed-bucket histogram of durations in microseconds"""
+
+    def __init__(self):
+        self.counts = [0] * BUCKETS
+        self.reset()
+
+    def reset(self):
+        for i in range(BUCKETS):
+            self.counts[i] = 0
+        self.count = 0
+        self.total_us = 0
+        self.max_us = 0
+
+    def add(self, us):
+        self.counts[bucket_index(us)] += 1
+        self.count += 1
+        self.total_us += us
+        if us > self.max_us:
+            self.max_us = us
+
+    @property
+    def mean_us(self):
+        return self.total_us // self.count if self.count else 0
+
+    def percentile_us(self, pct):
+        """Upper bound of the bucket holding the pct-th percentile (0 if empty)"""
+        if not self.count:
+            return 0
+        rank = (self.count * pct + 99) // 100
+        seen = 0
+        for index, count in enumerate(self.counts):
+            seen += count
+            if seen >= rank:
+                return min(bucket_limit_us(index), self.max_us)
+        return self.max_us
+
+class Profiler:
+    """
+    Per-stage histograms. Time a stage with
+        start = profile.now()
+        ...
+        profile.add(STAGE, start)
+    and count loop passes down to tick() for the loop period:
+        countdown -= 1
+        if not countdown:
+            countdown = profile.tick()
+    """
+
+    def __init__(self, overrun_us=5000, sample=32):
+        self.histograms = [Histogram() for _ in STAGES]
+        self.overrun_us = overrun_us
+        self.sample = sample
+        self.enable(False)
+
+    def enable(self, enabled, overrun_us=None, sample=None):
+        """Turn instrumentation on or off; off, now/add/tick do nothing"""
+        self.enabled = enabled
+        if overrun_us is not None:
+            self.overrun_us = overrun_us
+        if sample is not None:
+            self.sample = max(1, sample)
+        self.now = time.monotonic_ns if enabled else _zero
+        self.add = self._add if enabled else _skip
+        self.tick = self._tick if enabled else _never
+        self.reset()
+
+    def reset(self):
+        for histogram in self.histograms:
+            histogram.reset()
+        self.overruns = 0
+        self.last_tick = 0
+
+    def _add(self, stage, start_ns):
+        self.histograms[stage].add((time.monotonic_ns() - start_ns) // 1000)
+
+    def _tick(self):
+        """Mark a loop pass; returns the number of passes until the next call"""
+        now = time.monotonic_ns()
+        sampled = self.last_tick
+        if sampled:
+            period = (now - sampled) // 1000
+            self.histograms[LOOP].add(period)
+            if period > self.overrun_us:
+                self.overruns += 1
+            if self.sample > 1:
+                self.last_tick = 0
+                return self.sample - 1
+        self.last_tick = now  # The next pass is sampled
+        return 1
+
+    def dump(self):
+        """Print a table of every stage"""
+        print(f"{'stage':<9}{'count':>8}{'mean us':>9}{'p50 us':>9}{'p99 us':>9}{'max us':>9}")
+        for name, histogram in zip(STAGES, self.histograms):
+            print(
+                f"{name:<9}{histogram.count:>8}{histogram.mean_us:>9}{histogram.percentile_us(50):>9}"
+                f"{histogram.percentile_us(99):>9}{histogram.max_us:>9}"
+            )
+        sampled = f" in 1 of every {self.sample} passes" if self.sample > 1 else ""
+        print(f"loop overruns (> {self.overrun_us} us){sampled}: {self.overruns}")
@@ -0,0 +1,166 @@
+"""
+Timetag Scheduling
+==================
+Executes OSC messages from bundles at their timetag instead of on arrival,
+so network jitter between the PC and the device does not become haptic
+jitter.
+
+ClockSync estimates the offset between the PC's NTP clock and the local
+monotonic clock from /clock/ping -> /clock/pong exchanges, keeping the
+sample with the smallest round trip. OscScheduler holds future messages in
+a fixed pool of preallocated slots until they are due.
+"""
+
+import time
+
+import asyncio
+from adafruit_ticks import ticks_diff, ticks_ms
+
+from osc import TIMETAG_IMMEDIATE, ms_to_timetag, timetag_to_ms
+
+def local_ms():
+    """Local monotonic clock in milliseconds (does not wrap)"""
+    return time.monotonic_ns() // 1000000
+
+class ClockSync:
+    """Offset between the PC OSC clock and local_ms(), from ping/pong samples"""
+
+    def __init__(self, window=8):
+        self.rtts = [0] * window
+        self.offsets = [0] * window
+        self.samples = 0
+        self.offset_ms = None     # PC ms since 1900 minus local_ms()
+        self.rtt_ms = None        # Round trip of the sample in use
+        self.seq = 0
+        self.sent_ms = 0
+        self.outstanding = False
+
+    @property
+    def synced(self):
+        return self.offset_ms is not None
+
+    def start_ping(self):
+        """Record the send time of a new ping; returns its sequence number"""
+        self.seq = (self.seq + 1) & 0x7FFFFFFF
+        self.sent_ms = local_ms()
+        self.outstanding = True
+        return self.seq
+
+    def on_pong(self, seq, pc_timetag):
+        """Add a sample from a pong; returns False if it answers no outstanding ping"""
+        if not self.outstanding or seq != self.seq:
+            return False
+        received_ms = local_ms()
+        self.outstanding = False
+        rtt = received_ms - self.sent_ms
+        # Assume a symmetric path: the PC stamped the pong half way through
+        offset = timetag_to_ms(pc_timetag) - (self.sent_ms + received_ms) // 2
+
+        index = self.samples % len(self.rtts)
+        self.rtts[index] = rtt
+        self.offsets[index] = offset
+        self.samples += 1
+
+        # Use the sample with the shortest round trip in the window
+        best = 0
+        for i in range(1, min(self.samples, len(self.rtts))):
+            if self.rtts[i] < self.rtts[best]:
+                best = i
+        self.rtt_ms = self.rtts[best]
+        self.offset_ms = self.offsets[best]
+        return True
+
+    def to_local_ms(self, timetag):
+        """Local time at which a PC timetag falls due"""
+        return timetag_to_ms(timetag) - self.offset_ms
+
+    def ticks_to_timetag(self, capture_ticks):
+        """
+        PC timetag of an event captured at capture_ticks (ticks_ms), or
+        TIMETAG_IMMEDIATE while the offset is unknown.
+        """
+        if self.offset_ms is None:
+            return TIMETAG_IMMEDIATE
+        captured_ms = local_ms() - ticks_diff(ticks_ms(), capture_ticks)
+        return ms_to_timetag(captured_ms + self.offset_ms)
+
+class OscScheduler:
+    """
+    Fixed pool of slots holding OSC messages until their due time.
+    Messages are copied into the slots because the receive buffer is reused
+    by the next datagram.
+    """
+
+    def __init__(self, slots=16, slot_size=256, max_delay_ms=10000):
+        self.buffers = [bytearray(slot_size) for _ in range(slots)]
+        self.lengths = [0] * slots
+        self.due = [0] * slots
+        self.used = [False] * slots
+        self.pending = 0
+        self.max_delay_ms = max_delay_ms
+        self.scheduled = 0
+        self.late = 0
+        self.dropped = 0
+        self.failed = 0      # Handler exceptions
+        self.wake = asyncio.Event()
+
+    def schedule(self, buffer, start, end, due_ms):
+        """Copy buffer[start:end] into a free slot; returns False if dropped"""
+        size = end - start
+        delay = due_ms - local_ms()
+        if delay > self.max_delay_ms or size > len(self.buffers[0]):
+            self.dropped += 1
+            return False
+        for i in range(len(self.used)):
+            if not self.used[i]:
+                self.buffers[i][:size] = memoryview(buffer)[start:end]
+                self.lengths[i] = size
+                self.due[i] = due_ms
+                self.used[i] = True
+                self.pending += 1
+                self.scheduled += 1
+                self.wake.set()
+                return True
+        self.dropped += 1
+        return False
+
+    def run_due(self, message, handler, on_error=None):
+        """
+        Decode and hand every due message to handler(message), earliest first.
+        A handler exception is counted and passed to on_error(e), and the
+        remaining messages still run.
+        Returns milliseconds until the next pending message, or None if empty.
+        """
+        while self.pending:
+            now = local_ms()
+            earliest = -1
+            for i in range(len(self.used)):
+                if self.used[i] and (earliest < 0 or self.due[i] < self.due[earliest]):
+                    earliest = i
+            wait = self.due[earliest] - now
+            if wait > 0:
+                return wait
+            # Free the slot first so a failing handler cannot leave it due
+            self.used[earliest] = False
+            self.pending -= 1
+            if message.decode(self.buffers[earliest], self.lengths[earliest]):
+                try:
+                    handler(message)
+                except Exception as e:
+                    self.failed += 1
+                    if on_error is not None:
+                        on_error(e)
+        return None
+
+    async def run(self, message, handler, on_error=None):
+        """Task body: run messages as they fall due, sleeping in between"""
+        while True:
+            wait = self.run_due(message, handler, on_error)
+            self.wake.clear()
+            if wait is None:
+                await self.wake.wait()
+            else:
+                try:
+                    await asyncio.wait_for(self.wake.wait(), wait / 1000)
+                except asyncio.TimeoutError:
+                    pass
@@ -0,0 +1,64 @@
+"""
+Host Simulator
+==============
+Drop-in fakes for the CircuitPython modules used by the controller so the
+firmware can run and be exercised on a Linux host.
+
+Call install() before importing any firmware module; it registers the fakes
+in sys.modules under their CircuitPython names. load_firmware() imports
+code.py on top of them, and sim.runner runs its main() headless:
+
+    python -m sim --duration 5
+
+Fakes provided:
+- board / digitalio / keypad: scriptable SimPin inputs with edge capture
+- wifi: radio with configurable connect latency, failures and link loss
+- socketpool: loopback UDP over real host sockets, with a send log
+- adafruit_drv2605: driver that records every play() with timestamps
+- adafruit_seesaw.keypad: keypad event FIFO on a SimI2C bus that counts and
+  times every transaction
+- adafruit_ticks: tick arithmetic on the simulator clock
+"""
+
+import sys
+
+from sim import adafruit_drv2605, adafruit_seesaw, adafruit_ticks, board, clock, digitalio, keypad, socketpool, wifi
+from sim.adafruit_seesaw import keypad as seesaw_keypad
+
+# CircuitPython module name -> simulated module
+MODULES = {
+    'adafruit_drv2605': adafruit_drv2605,
+    'adafruit_seesaw': adafruit_seesaw,
+    'adafruit_seesaw.keypad': seesaw_keypad,
+    'adafruit_ticks': adafruit_ticks,
+    'board': board,
+    'digitalio': digitalio,
+    'keypad': keypad,
+    'socketpool': socketpool,
+    'wifi': wifi,
+}
+
+def install():
+    """Register the simulated modules in place of the CircuitPython ones"""
+    for name, module in MODULES.items():
+        sys.modules[name] = module
+
+def load_firmware():
+    """
+    Import code.py as the module `firmware`.
+    The stdlib already owns the name `code`, so it cannot be imported directly.
+    """
+    import importlib.util
+    import os
+
+    install()
+    if 'firmware' in sys.modules:
+        return sys.modules['firmware']
+    root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    if root not in sys.path:
+        sys.path.insert(0, root)
+    spec = importlib.util.spec_from_file_location('firmware', os.path.join(root, 'code.py'))
+    module = importlib.util.module_from_spec(spec)
+    sys.modules['firmware'] = module
+    spec.loader.exec_module(module)
+    return module
@@ -0,0 +1,55 @@
+"""
+Run the firmware headless on the host.
+
+Usage:
+    python -m sim [--duration S] [--tap-interval MS] [--hold MS] [--profile]
+
+Taps the simulated button on board.A0 at a fixed interval, then reports how
+many press/release datagrams reached the loopback PC and the send rate.
+With --profile the firmware runs with PROFILE=1 and its loop profile is
+dumped at the end.
+"""
+
+import argparse
+import asyncio
+import time
+
+from sim import board
+from sim.runner import DEFAULT_ENV, HeadlessController, PCListener
+
+async def tap_loop(pin, duration, interval_ms, hold_ms):
+    taps = 0
+    end = time.monotonic() + duration
+    while time.monotonic() < end:
+        await pin.tap(hold_ms)
+        taps += 1
+        await asyncio.sleep(max(0, interval_ms - hold_ms) / 1000)
+    return taps
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--duration', type=float, default=5.0)
+    parser.add_argument('--tap-interval', type=float, default=100.0)
+    parser.add_argument('--hold', type=float, default=40.0)
+    parser.add_argument('--profile', action='store_true', help="dump the loop profiler histograms")
+    args = parser.parse_args()
+
+    pc = PCListener(int(DEFAULT_ENV['PORT']), int(DEFAULT_ENV['LISTEN_PORT']))
+    controller = HeadlessController({'PROFILE': 1} if args.profile else None).start()
+    try:
+        taps = controller.call(tap_loop(board.A0, args.duration, args.tap_interval, args.hold))
+        time.sleep(0.2)
+    finally:
+        controller.stop()
+        pc.close()
+
+    addresses = pc.addresses()
+    presses = addresses.count('/button/press')
+    releases = addresses.count('/button/release')
+    print(f"taps: {taps}  presses received: {presses}  releases received: {releases}")
+    print(f"event rate: {(presses + releases) / args.duration:.1f} datagrams/s")
+    if args.profile:
+        controller.firmware.profile.dump()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,129 @@
+"""
+Simulated `adafruit_drv2605` module.
+
+The driver records every play() with the simulator tick count, a high
+resolution timestamp and the effect programmed in sequence slot 0. Every
+register access is reported to the SimI2C bus as the real driver makes it:
+one write transaction per register written, a write then read per register
+read.
+
+The IN/TRIG input is wired to board.D6: in MODE_EXTTRIGEDGE a rising edge
+on it plays the sequence, recorded like play().
+"""
+
+from sim import board, clock
+
+MODE_INTTRIG = 0x00
+MODE_EXTTRIGEDGE = 0x01
+MODE_EXTTRIGLVL = 0x02
+MODE_PWMANALOG = 0x03
+MODE_AUDIOVIBE = 0x04
+MODE_REALTIME = 0x05
+MODE_DIAGNOS = 0x06
+MODE_AUTOCAL = 0x07
+
+# Register accesses the real driver makes in DRV2605(): a status read, then
+# mode, real-time input, two sequence slots, overdrive, sustain (2), brake,
+# audio max and library writes
+_INIT_READS = 1
+_INIT_WRITES = 10
+
+class Effect:
+    def __init__(self, effect_id):
+        if not 0 <= effect_id <= 123:
+            raise ValueError("Effect ID must be a value within 0-123!")
+        self.id = effect_id
+
+    @property
+    def raw_value(self):
+        return self.id
+
+    def __repr__(self):
+        return f"Effect({self.id})"
+
+class Pause:
+    def __init__(self, duration):
+        if not 0.0 <= duration <= 1.27:
+            raise ValueError("Pause duration must be a value within 0.0-1.27!")
+        self.duration = duration
+
+    @property
+    def raw_value(self):
+        return 0x80 | int(round(self.duration * 100))
+
+    def __repr__(self):
+        return f"Pause({self.duration})"
+
+class _Sequence:
+    def __init__(self, drv):
+        self._drv = drv
+        self._slots = [None] * 8
+
+    def __getitem__(self, slot):
+        return self._slots[slot]
+
+    def __setitem__(self, slot, effect):
+        if not 0 <= slot < 8:
+            raise IndexError("Slot must be between 0 and 7")
+        if not isinstance(effect, (Effect, Pause)):
+            raise TypeError("Effect must be either an Effect or Pause!")
+        self._drv._write_register()
+        self._slots[slot] = effect
+
+# Every driver created, so harnesses can inspect the one the firmware owns
+instances = []
+
+class DRV2605:
+    def __init__(self, i2c, address=0x5A):
+        instances.append(self)
+        self.i2c = i2c
+        self.address = address
+        for _ in range(_INIT_READS):
+            self._read_register()
+        for _ in range(_INIT_WRITES):
+            self._write_register()
+        self.sequence = _Sequence(self)
+        self.plays = []  # (ticks_ms, now_ns, effect id in slot 0)
+        self._mode = MODE_INTTRIG
+        board.D6.add_listener(self._on_trigger)
+
+    def _write_register(self):
+        self.i2c.transaction(2)
+
+    def _read_register(self):
+        self.i2c.transaction(1, 1)
+
+    @property
+    def mode(self):
+        self._read_register()
+        return self._mode
+
+    @mode.setter
+    def mode(self, value):
+        if not 0 <= value <= 7:
+            raise ValueError("Mode must be a value within 0-7!")
+        self._write_register()
+        self._mode = value
+
+    def _on_trigger(self, pin, value, now):
+        if value and self._mode == MODE_EXTTRIGEDGE:
+            self._record()
+
+    def _record(self):
+        effect = self.sequence[0]
+        self.plays.append((clock.ticks_ms(), clock.now_ns(), getattr(effect, 'id', None)))
+
+    def use_ERM(self):
+        self._read_register()
+        self._write_register()
+
+    def use_LRM(self):
+        self._read_register()
+        self._write_register()
+
+    def play(self):
+        self._write_register()  # GO
+        self._record()
+
+    def stop(self):
+        self._write_register()
@@ -0,0 +1,3 @@
+"""
+Simulated `adafruit_seesaw` package.
+"""
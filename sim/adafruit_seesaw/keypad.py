@@ -0,0 +1,80 @@
+"""
+Simulated `adafruit_seesaw.keypad` module.
+
+Keypad models the seesaw keypad event FIFO. Simulation scripts push edges
+with press()/release(); every register access is reported to the SimI2C bus
+with the driver's default read turnaround delay.
+"""
+
+# adafruit_seesaw.Seesaw.read() waits this long before reading back
+READ_DELAY_S = 0.008
+
+# Every keypad created, so simulation scripts can reach the firmware's keypads
+instances = []
+
+class KeyEvent:
+    def __init__(self, num, edge):
+        self.number = int(num)
+        self.edge = int(edge)
+
+class Keypad:
+    EDGE_HIGH = 0
+    EDGE_LOW = 1
+    EDGE_FALLING = 2
+    EDGE_RISING = 3
+
+    def __init__(self, i2c_bus, addr=0x49, drdy=None, fifo_size=32):
+        self.i2c = i2c_bus
+        self.addr = addr
+        self._interrupt_enabled = False
+        self._enabled = set()   # (key, edge) pairs that generate events
+        self._fifo = []
+        self._fifo_size = fifo_size
+        self.levels = {}        # key -> pressed
+        instances.append(self)
+
+    @property
+    def interrupt_enabled(self):
+        return self._interrupt_enabled
+
+    @interrupt_enabled.setter
+    def interrupt_enabled(self, value):
+        self.i2c.transaction(3)
+        self._interrupt_enabled = value
+
+    @property
+    def count(self):
+        self.i2c.transaction(2, 1, READ_DELAY_S)
+        return len(self._fifo)
+
+    def set_event(self, key, edge, enable):
+        if edge > 3 or edge < 0:
+            raise ValueError("invalid edge")
+        self.i2c.transaction(4)
+        if enable:
+            self._enabled.add((key, edge))
+        else:
+            self._enabled.discard((key, edge))
+
+    def read_keypad(self, num):
+        self.i2c.transaction(2, num, READ_DELAY_S)
+        events = [KeyEvent(*self._fifo.pop(0)) for _ in range(min(num, len(self._fifo)))]
+        return events
+
+    def digital_read(self, pin):
+        """Per-pin GPIO read, one transaction each (for comparison)"""
+        self.i2c.transaction(2, 4, READ_DELAY_S)
+        return not self.levels.get(pin, False)
+
+    # Simulation script interface
+    def press(self, key):
+        self.levels[key] = True
+        self._push(key, self.EDGE_RISING)
+
+    def release(self, key):
+        self.levels[key] = False
+        self._push(key, self.EDGE_FALLING)
+
+    def _push(self, key, edge):
+        if (key, edge) in self._enabled and len(self._fifo) < self._fifo_size:
+            self._fifo.append((key, edge))
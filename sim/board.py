@@ -0,0 +1,18 @@
+"""
+Simulated `board` module.
+"""
+
+from sim.i2c import SimI2C
+from sim.pins import SimPin
+
+A0 = SimPin('A0')
+A1 = SimPin('A1')
+A2 = SimPin('A2')
+A3 = SimPin('A3')
+D5 = SimPin('D5')
+D6 = SimPin('D6')
+
+_stemma_i2c = SimI2C()
+
+def STEMMA_I2C():
+    return _stemma_i2c
@@ -0,0 +1,203 @@
+"""
+Contact bounce traces and debounce replay harness.
+
+A trace is a list of raw (t_ms, pressed) pin transitions plus the list of
+(t_ms, pressed) edges a perfect debouncer should report. Traces can be loaded
+from logic analyzer CSV exports (load_trace) or synthesized with realistic
+bounce (synthesize_trace / standard_traces).
+
+replay() drives the simulated pin with a trace under a manual clock, runs the
+button handling once per simulated loop pass and reports how many real edges
+were detected, missed or invented, and how long each pass stalled the loop.
+"""
+
+import random
+import time
+
+from sim import clock
+from sim.pins import SimPin
+
+# ============================================================================
+# TRACES
+# ============================================================================
+
+class Trace:
+    def __init__(self, name, transitions, expected):
+        self.name = name
+        self.transitions = transitions  # Raw (t_ms, pressed) pin changes
+        self.expected = expected        # True (t_ms, pressed) edges
+
+    @property
+    def duration_ms(self):
+        return self.transitions[-1][0] if self.transitions else 0
+
+def load_trace(path, name=None):
+    """
+    Load a trace from CSV with columns `t_ms,level[,edge]`.
+    `level` is the raw pin level (0 = pressed); rows with a non-empty `edge`
+    column mark the start of a real press or release.
+    """
+    transitions = []
+    expected = []
+    with open(path) as f:
+        for line in f:
+            line = line.strip()
+            if not line or line.startswith('#') or line[0].isalpha():
+                continue
+            fields = line.split(',')
+            t = float(fields[0])
+            pressed = fields[1].strip() == '0'
+            transitions.append((t, pressed))
+            if len(fields) > 2 and fields[2].strip():
+                expected.append((t, pressed))
+    return Trace(name or path, transitions, expected)
+
+def _bounce(rng, t, pressed, bounce_ms, max_bounces):
+    """Raw transitions for one contact change starting at t"""
+    edges = [(t, pressed)]
+    level = pressed
+    for _ in range(rng.randint(0, max_bounces)):
+        t += rng.uniform(0.05, bounce_ms / max(1, max_bounces))
+        level = not level
+        edges.append((t, level))
+    if level != pressed:
+        edges.append((t + rng.uniform(0.05, 0.5), pressed))
+    return edges
+
+def synthesize_trace(name, seed, presses, hold_ms, gap_ms, bounce_ms, max_bounces=6):
+    """
+    Build a trace of `presses` press/release cycles.
+    hold_ms and gap_ms are (min, max) ranges; bounce_ms bounds each bounce burst.
+    """
+    rng = random.Random(seed)
+    transitions = []
+    expected = []
+    t = 10.0
+    for _ in range(presses):
+        expected.append((t, True))
+        transitions.extend(_bounce(rng, t, True, bounce_ms, max_bounces))
+        t += rng.uniform(*hold_ms)
+        expected.append((t, False))
+        transitions.extend(_bounce(rng, t, False, bounce_ms, max_bounces))
+        t += rng.uniform(*gap_ms)
+    transitions.append((t, False))
+    return Trace(name, transitions, expected)
+
+def standard_traces():
+    """Representative switch behaviours used by the debounce benchmark"""
+    return [
+        synthesize_trace('clean', 1, 50, (80, 300), (150, 600), 0.1, 0),
+        synthesize_trace('tactile', 2, 50, (80, 300), (150, 600), 3, 6),
+        synthesize_trace('worn', 3, 50, (80, 300), (150, 600), 12, 10),
+        synthesize_trace('fast_taps', 4, 50, (25, 60), (40, 90), 3, 6),
+        synthesize_trace('double_press', 5, 50, (40, 70), (60, 120), 5, 8),
+    ]
+
+# ============================================================================
+# REPLAY
+# ============================================================================
+
+class ReplayResult:
+    def __init__(self, trace, detected, stalls_ms):
+        self.trace = trace
+        self.detected = detected
+        self.stalls_ms = stalls_ms
+        self.matched, self.missed, self.spurious, self.timestamp_error_ms = _score(
+            trace.expected, detected
+        )
+
+    @property
+    def accuracy(self):
+        total = len(self.trace.expected) + self.spurious
+        return self.matched / total if total else 1.0
+
+    @property
+    def max_stall_ms(self):
+        return max(self.stalls_ms) if self.stalls_ms else 0.0
+
+    @property
+    def total_stall_ms(self):
+        return sum(self.stalls_ms)
+
+def _score(expected, detected, window_ms=150):
+    """Greedily match detected edges to expected edges of the same kind"""
+    used = [False] * len(detected)
+    matched = 0
+    error = 0.0
+    for t, pressed in expected:
+        for i, (dt, dpressed) in enumerate(detected):
+            if used[i] or dpressed != pressed:
+                continue
+            if t - 1 <= dt <= t + window_ms:
+                used[i] = True
+                matched += 1
+                error += abs(dt - t)
+                break
+    spurious = used.count(False)
+    mean_error = error / matched if matched else 0.0
+    return matched, len(expected) - matched, spurious, mean_error
+
+def _apply_until(pin, transitions, index, t):
+    """Apply raw transitions up to time t to the pin; returns next index"""
+    while index < len(transitions) and transitions[index][0] <= t:
+        clock.set_manual(int(transitions[index][0]))
+        pin.value = not transitions[index][1]  # Active low
+        index += 1
+    return index
+
+def replay(trace, settle_ms=20, loop_ms=1, pin=None):
+    """Replay a trace through EdgeButton and its Debouncer"""
+    from buttons import EDGE_PRESS, EdgeButton
+
+    pin = pin or SimPin('replay')
+    pin.value = True
+    clock.set_manual(0)
+    button = EdgeButton(pin, settle_ms=settle_ms)
+    detected = []
+    stalls = []
+    index = 0
+    t = 0
+    end = trace.duration_ms + settle_ms * 4 + loop_ms
+    try:
+        while t <= end:
+            index = _apply_until(pin, trace.transitions, index, t)
+            clock.set_manual(t)
+            start = time.perf_counter_ns()
+            edge = button.poll(t)
+            while edge:
+                detected.append((button.timestamp, edge == EDGE_PRESS))
+                edge = button.poll(t)
+            stalls.append((time.perf_counter_ns() - start) / 1e6)
+            t += loop_ms
+    finally:
+        button.keys.deinit()
+        clock.set_realtime()
+    return ReplayResult(trace, detected, stalls)
+
+def replay_legacy(trace, loop_ms=50, release_sleep_ms=200, pin=None):
+    """
+    Replay a trace through the original behaviour: sample the pin once per
+    loop pass and sleep release_sleep_ms after every release.
+    """
+    pin = pin or SimPin('replay')
+    pin.value = True
+    detected = []
+    stalls = []
+    index = 0
+    t = 0
+    prev = True
+    end = trace.duration_ms + release_sleep_ms + loop_ms
+    while t <= end:
+        index = _apply_until(pin, trace.transitions, index, t)
+        curr = pin.value
+        stall = 0
+        if prev and not curr:
+            detected.append((t, True))
+        if not prev and curr:
+            detected.append((t, False))
+            stall = release_sleep_ms
+        stalls.append(float(stall))
+        prev = curr
+        t += loop_ms + stall
+    clock.set_realtime()
+    return ReplayResult(trace, detected, stalls)
@@ -0,0 +1,40 @@
+"""
+Simulated clock shared by every fake module.
+
+Runs on the host monotonic clock by default. Call set_manual() to freeze
+time and drive it explicitly with advance(), e.g. when replaying traces.
+"""
+
+import time
+
+# supervisor.ticks_ms() wraps at 2**29, as adafruit_ticks expects
+TICKS_PERIOD = 1 << 29
+
+_manual_ms = None
+
+def ticks_ms():
+    """Milliseconds since an arbitrary epoch, like supervisor.ticks_ms()"""
+    if _manual_ms is not None:
+        return _manual_ms % TICKS_PERIOD
+    return (time.monotonic_ns() // 1_000_000) % TICKS_PERIOD
+
+def set_manual(start_ms=0):
+    """Freeze the clock at start_ms; it only moves through advance()"""
+    global _manual_ms
+    _manual_ms = start_ms
+
+def set_realtime():
+    """Return to following the host monotonic clock"""
+    global _manual_ms
+    _manual_ms = None
+
+def advance(ms):
+    """Move the manual clock forward by ms"""
+    global _manual_ms
+    if _manual_ms is None:
+        raise RuntimeError("advance() requires a manual clock")
+    _manual_ms += ms
+
+def now_ns():
+    """High resolution host timestamp for latency measurements"""
+    return time.perf_counter_ns()
@@ -0,0 +1,30 @@
+"""
+Simulated `digitalio` module backed by SimPin levels.
+"""
+
+class Direction:
+    INPUT = 'INPUT'
+    OUTPUT = 'OUTPUT'
+
+class Pull:
+    UP = 'UP'
+    DOWN = 'DOWN'
+
+class DigitalInOut:
+    def __init__(self, pin):
+        self.pin = pin
+        self.direction = Direction.INPUT
+        self.pull = None
+
+    @property
+    def value(self):
+        return self.pin.value
+
+    @value.setter
+    def value(self, value):
+        if self.direction != Direction.OUTPUT:
+            raise AttributeError("Cannot set value when direction is input.")
+        self.pin.value = value
+
+    def deinit(self):
+        pass
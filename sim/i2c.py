@@ -0,0 +1,43 @@
+"""
+Simulated I2C bus.
+
+Devices report every transaction to the bus, which counts them and models
+how long they would take on the wire so benchmarks can compare access
+patterns without hardware. With realtime set, each transaction also holds
+the caller for its modeled duration, as a blocking busio.I2C call would.
+"""
+
+import time
+
+class SimI2C:
+    def __init__(self, frequency=400000):
+        self.frequency = frequency
+        self.realtime = False
+        self.reset_counters()
+
+    def reset_counters(self):
+        self.transactions = 0
+        self.bytes = 0
+        self.modeled_us = 0.0
+
+    def transaction(self, write_bytes, read_bytes=0, delay_s=0.0):
+        """Record one transaction: device address, payload and any turnaround delay"""
+        frames = 1 + write_bytes + (1 + read_bytes if read_bytes else 0)
+        self.transactions += 1
+        self.bytes += write_bytes + read_bytes
+        # 9 clock cycles per byte (8 data + ACK) plus start/stop
+        duration_us = (frames * 9 + 2) * 1e6 / self.frequency + delay_s * 1e6
+        self.modeled_us += duration_us
+        if self.realtime:
+            deadline = time.perf_counter_ns() + int(duration_us * 1000)
+            while time.perf_counter_ns() < deadline:
+                pass
+
+    def try_lock(self):
+        return True
+
+    def unlock(self):
+        pass
+
+    def scan(self):
+        return []
@@ -0,0 +1,76 @@
+"""
+Simulated `keypad` module.
+
+Keys subscribes to SimPin level changes instead of scanning, so every edge is
+queued with the exact clock time it happened. The scan interval is accepted
+for API compatibility but does not delay capture.
+"""
+
+from sim import clock
+
+class Event:
+    def __init__(self, key_number=0, pressed=True, timestamp=None):
+        self.key_number = key_number
+        self.pressed = pressed
+        self.timestamp = clock.ticks_ms() if timestamp is None else timestamp
+
+    @property
+    def released(self):
+        return not self.pressed
+
+    def __repr__(self):
+        state = "pressed" if self.pressed else "released"
+        return f"<Event: key_number {self.key_number} {state}>"
+
+class EventQueue:
+    def __init__(self, max_events):
+        self._max_events = max_events
+        self._events = []
+        self.overflowed = False
+
+    def __len__(self):
+        return len(self._events)
+
+    def __bool__(self):
+        return bool(self._events)
+
+    def _put(self, key_number, pressed, timestamp):
+        if len(self._events) >= self._max_events:
+            self.overflowed = True
+            return
+        self._events.append((key_number, pressed, timestamp))
+
+    def get(self):
+        if not self._events:
+            return None
+        return Event(*self._events.pop(0))
+
+    def get_into(self, event):
+        if not self._events:
+            return False
+        event.key_number, event.pressed, event.timestamp = self._events.pop(0)
+        return True
+
+    def clear(self):
+        self._events.clear()
+        self.overflowed = False
+
+class Keys:
+    def __init__(self, pins, *, value_when_pressed, pull=True, interval=0.02, max_events=64):
+        self._pins = tuple(pins)
+        self._value_when_pressed = value_when_pressed
+        self.key_count = len(self._pins)
+        self.events = EventQueue(max_events)
+        self._listener = self._on_edge
+        for pin in self._pins:
+            pin.add_listener(self._listener)
+
+    def _on_edge(self, pin, value, now):
+        self.events._put(self._pins.index(pin), value == self._value_when_pressed, now)
+
+    def reset(self):
+        self.events.clear()
+
+    def deinit(self):
+        for pin in self._pins:
+            pin.remove_listener(self._listener)
@@ -0,0 +1,61 @@
+"""
+Scriptable simulated GPIO pin.
+"""
+
+from sim import clock
+
+class SimPin:
+    """
+    GPIO pin whose level is set by the simulation script.
+
+    Level changes are pushed to listeners (edge scanners such as
+    keypad.Keys) immediately, with the clock time of the change, which
+    models edge-triggered capture on the real board.
+    """
+
+    def __init__(self, name, value=True):
+        self.name = name
+        self._value = value
+        self._listeners = []
+        self.history = None  # Set to a list to record (now_ns, value) changes
+
+    def __repr__(self):
+        return f"board.{self.name}"
+
+    @property
+    def value(self):
+        return self._value
+
+    @value.setter
+    def value(self, value):
+        value = bool(value)
+        if value == self._value:
+            return
+        self._value = value
+        if self.history is not None:
+            self.history.append((clock.now_ns(), value))
+        now = clock.ticks_ms()
+        for listener in self._listeners:
+            listener(self, value, now)
+
+    def add_listener(self, listener):
+        """Call listener(pin, value, ticks_ms) on every level change"""
+        self._listeners.append(listener)
+
+    def remove_listener(self, listener):
+        self._listeners.remove(listener)
+
+    # Active-low button helpers (pressed pulls the pin to ground)
+    def press(self):
+        self.value = False
+
+    def release(self):
+        self.value = True
+
+    async def tap(self, hold_ms):
+        """Press for hold_ms then release, without blocking the event loop"""
+        import asyncio
+
+        self.press()
+        await asyncio.sleep(hold_ms / 1000)
+        self.release()
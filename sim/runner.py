@@ -0,0 +1,228 @@
+"""
+Headless firmware runner.
+
+HeadlessController runs the unmodified firmware main() in a background
+thread against the simulated modules. Scenario coroutines are scheduled onto
+the firmware's own event loop, so scripted button presses interleave with the
+controller tasks exactly as hardware interrupts would between awaits.
+
+PCListener plays the role of the Unity host: a loopback UDP socket that
+timestamps every datagram the device sends and can send commands back. It
+can also ack reliable button events (RELIABLE=1) and report the loss it
+sees on redundant ones (REDUNDANCY > 0) like the host would.
+"""
+
+import asyncio
+import os
+import socket
+import struct
+import threading
+import time
+
+import sim
+from sim import clock
+
+DEFAULT_ENV = {
+    'WIFI_SSID': 'sim-ap',
+    'WIFI_PASSWORD': 'sim-password',
+    'PC_IP': '127.0.0.1',
+    'PORT': '47100',
+    'LISTEN_PORT': '47101',
+    'DEVICE_ID': '1',
+}
+
+class _RecordingPolicy(asyncio.DefaultEventLoopPolicy):
+    """Event loop policy that remembers the loop created by asyncio.run()"""
+
+    def __init__(self, on_loop):
+        super().__init__()
+        self._on_loop = on_loop
+
+    def new_event_loop(self):
+        loop = super().new_event_loop()
+        self._on_loop(loop)
+        return loop
+
+class HeadlessController:
+    """Run firmware main() headless; call() schedules coroutines on its loop"""
+
+    def __init__(self, env=None):
+        self.env = dict(DEFAULT_ENV)
+        if env:
+            self.env.update({k: str(v) for k, v in env.items()})
+        self.firmware = None
+        self.loop = None
+        self.error = None
+        self._loop_ready = threading.Event()
+        self._thread = None
+
+    def start(self, timeout=10.0):
+        """Boot the firmware and wait until its event loop is running"""
+        os.environ.update(self.env)
+        self.firmware = sim.load_firmware()
+        asyncio.set_event_loop_policy(_RecordingPolicy(self._set_loop))
+        self._thread = threading.Thread(target=self._run, name='firmware', daemon=True)
+        self._thread.start()
+        if not self._loop_ready.wait(timeout):
+            raise TimeoutError("firmware did not reach its event loop")
+        asyncio.set_event_loop_policy(None)
+        # Let the controller tasks start before returning
+        self.call(asyncio.sleep(0.01))
+        return self
+
+    def _set_loop(self, loop):
+        self.loop = loop
+        self._loop_ready.set()
+
+    def _run(self):
+        try:
+            self.firmware.main()
+        except asyncio.CancelledError:
+            pass
+        except BaseException as e:
+            self.error = e
+            self._loop_ready.set()
+
+    def call(self, coro, timeout=None):
+        """Run a coroutine on the firmware event loop and return its result"""
+        if self.error is not None:
+            raise RuntimeError("firmware crashed") from self.error
+        return asyncio.run_coroutine_threadsafe(coro, self.loop).result(timeout)
+
+    def stop(self, timeout=5.0):
+        """Cancel the controller tasks and wait for main() to return"""
+        if self.loop is not None and self._thread.is_alive():
+            self.loop.call_soon_threadsafe(_cancel_all, self.loop)
+            self._thread.join(timeout)
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+def _cancel_all(loop):
+    for task in asyncio.all_tasks(loop):
+        task.cancel()
+
+# Milliseconds between the NTP epoch (1900) and the Unix epoch (1970)
+NTP_UNIX_OFFSET_MS = 2208988800000
+
+def pc_time_ms():
+    """PC wall clock in milliseconds since 1900, the OSC timetag epoch"""
+    return int(time.time() * 1000) + NTP_UNIX_OFFSET_MS
+
+def pc_timetag(delay_ms=0):
+    """OSC timetag for the PC wall clock delay_ms from now"""
+    from osc import ms_to_timetag
+    return ms_to_timetag(pc_time_ms() + delay_ms)
+
+class PCListener:
+    """
+    Loopback stand-in for the PC: records datagrams, sends commands, acks
+    /button/handshake and answers /clock/ping with /clock/pong like the
+    Unity host. With
+    ack_events, every /button/.../press or release message is answered with
+    /button/ack <seq>, its trailing sequence argument. With report_loss, the
+    sequence gaps between the first events of consecutive datagrams are
+    counted and /button/loss <permille> is sent every LOSS_REPORT_EVENTS.
+    """
+
+    LOSS_REPORT_EVENTS = 50
+
+    def __init__(self, port, device_port=None, host='127.0.0.1', answer_clock_pings=True,
+                 ack_events=False, report_loss=False, ack_handshakes=True):
+        self.host = host
+        self.device_port = device_port
+        self.answer_clock_pings = answer_clock_pings
+        self.ack_handshakes = ack_handshakes
+        self.ack_events = ack_events
+        self.report_loss = report_loss
+        self.loss_reports = []  # Per mille values sent to the device
+        self._next_seq = None
+        self._seen = 0
+        self._missed = 0
+        self.sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        self.sock.bind((host, port))
+        self.sock.settimeout(0.05)
+        self.received = []  # (now_ns, bytes)
+        self._running = True
+        self._thread = threading.Thread(target=self._run, name='pc', daemon=True)
+        self._thread.start()
+
+    def _run(self):
+        while self._running:
+            try:
+                data = self.sock.recv(2048)
+            except OSError:
+                continue
+            self.received.append((clock.now_ns(), data))
+            if self.answer_clock_pings and data.startswith(b'/clock/ping\x00'):
+                self._pong(data)
+            elif data.startswith(b'/button/handshake\x00'):
+                if self.ack_handshakes:
+                    self._ack_handshake(data)
+            elif self.ack_events:
+                self._ack(data)
+            elif self.report_loss:
+                self._count_loss(data)
+
+    def _pong(self, ping):
+        seq = struct.unpack_from('>i', ping, 20)[0]
+        pong = b'/clock/pong\x00,it\x00' + struct.pack('>iQ', seq, pc_timetag())
+        self.sock.sendto(pong, (self.host, self.device_port))
+
+    def _ack_handshake(self, handshake):
+        device_id = handshake[28:32]  # First argument, after address and tags
+        self.sock.sendto(b'/button/handshake/ack\x00\x00\x00,i\x00\x00' + device_id, (self.host, self.device_port))
+
+    def _ack(self, data):
+        from osc import walk_bundle
+
+        def on_message(buffer, start, end, timetag):
+            address = bytes(buffer[start:buffer.index(b'\x00', start)])
+            if address.startswith(b'/button/') and address.endswith((b'/press', b'/release')):
+                seq = struct.unpack_from('>i', buffer, end - 4)[0]
+                self.sock.sendto(b'/button/ack\x00,i\x00\x00' + struct.pack('>i', seq), (self.host, self.device_port))
+
+        walk_bundle(data, len(data), on_message)
+
+    def _count_loss(self, data):
+        from osc import walk_bundle
+
+        first = []
+
+        def on_message(buffer, start, end, timetag):
+            if not first and buffer[start:start + 8] == b'/button/':
+                first.append(struct.unpack_from('>i', buffer, end - 4)[0])
+
+        walk_bundle(data, len(data), on_message)
+        if not first:
+            return
+        seq = first[0]
+        if self._next_seq is not None and seq > self._next_seq:
+            self._missed += seq - self._next_seq
+        self._next_seq = seq + 1
+        self._seen += 1
+        total = self._seen + self._missed
+        if total >= self.LOSS_REPORT_EVENTS:
+            permille = self._missed * 1000 // total
+            self.loss_reports.append(permille)
+            self.sock.sendto(b'/button/loss\x00\x00\x00\x00,i\x00\x00' + struct.pack('>i', permille),
+                             (self.host, self.device_port))
+            self._seen = self._missed = 0
+
+    def send(self, data):
+        """Send a datagram to the device listen port; returns the send time"""
+        sent_at = clock.now_ns()
+        self.sock.sendto(data, (self.host, self.device_port))
+        return sent_at
+
+    def addresses(self):
+        """OSC addresses of everything received so far"""
+        return [data[:data.index(b'\x00')].decode() for _, data in self.received]
+
+    def close(self):
+        self._running = False
+        self._thread.join()
+        self.sock.close()
@@ -0,0 +1,130 @@
+"""
+Simulated `socketpool` module backed by real host UDP sockets.
+
+Sockets refuse to send while the simulated wifi link is down, and every
+socket can record outgoing datagrams with a high resolution timestamp.
+set_loss() makes the simulated link drop a random share of the datagrams
+the device sends and receives.
+"""
+
+import random
+import socket as _socket
+
+from sim import clock
+
+# Set to a list to record (now_ns, bytes) for every datagram sent
+sent_log = None
+
+# Share of datagrams lost on the link in each direction
+send_loss = 0.0
+receive_loss = 0.0
+lost = 0
+_loss_rng = random.Random(0)
+
+def set_loss(send=0.0, receive=None, seed=0):
+    """Drop this share of sent (and received, default the same) datagrams"""
+    global send_loss, receive_loss, lost, _loss_rng
+    send_loss = send
+    receive_loss = send if receive is None else receive
+    lost = 0
+    _loss_rng = random.Random(seed)
+
+def _lose(rate):
+    global lost
+    if rate and _loss_rng.random() < rate:
+        lost += 1
+        return True
+    return False
+
+class SocketPool:
+    AF_INET = _socket.AF_INET
+    SOCK_DGRAM = _socket.SOCK_DGRAM
+    SOCK_STREAM = _socket.SOCK_STREAM
+
+    def __init__(self, radio):
+        self.radio = radio
+
+    def socket(self, family=AF_INET, type=SOCK_DGRAM, proto=0):
+        return Socket(_socket.socket(family, type, proto), self.radio)
+
+    def getaddrinfo(self, host, port, family=0, type=0, proto=0, flags=0):
+        return [(self.AF_INET, self.SOCK_DGRAM, 0, '', (_socket.gethostbyname(host), port))]
+
+class Socket:
+    """socketpool.Socket subset over a host socket"""
+
+    def __init__(self, sock, radio=None):
+        self._sock = sock
+        self._radio = radio
+
+    def _check_link(self):
+        if self._radio is not None and not self._radio.connected:
+            raise OSError(113, "EHOSTUNREACH")
+
+    def settimeout(self, value):
+        self._sock.settimeout(value)
+
+    def bind(self, address):
+        self._sock.bind(address)
+
+    def connect(self, address):
+        self._sock.connect(address)
+
+    def send(self, buf):
+        self._check_link()
+        if sent_log is not None:
+            sent_log.append((clock.now_ns(), bytes(buf)))
+        if _lose(send_loss):
+            return len(buf)
+        try:
+            return self._sock.send(buf)
+        except ConnectionRefusedError:
+            # The host reports ICMP port unreachable on connected UDP
+            # sockets; the device network stack does not
+            return len(buf)
+
+    def sendto(self, buf, address):
+        self._check_link()
+        if sent_log is not None:
+            sent_log.append((clock.now_ns(), bytes(buf)))
+        if _lose(send_loss):
+            return len(buf)
+        return self._sock.sendto(buf, address)
+
+    def recvfrom_into(self, buf, nbytes=0):
+        while True:
+            try:
+                result = self._sock.recvfrom_into(buf, nbytes)
+            except (BlockingIOError, _socket.timeout) as e:
+                # CircuitPython raises OSError(EAGAIN/ETIMEDOUT) for both
+                raise OSError(11, "EAGAIN") from e
+            if not _lose(receive_loss):
+                return result
+
+    def close(self):
+        self._sock.close()
+
+    def fileno(self):
+        return self._sock.fileno()
+
+    @property
+    def drops(self):
+        """Datagrams the host kernel dropped for this socket (Linux only)"""
+        import os
+
+        inode = os.fstat(self._sock.fileno()).st_ino
+        try:
+            with open('/proc/net/udp') as f:
+                for line in f.readlines()[1:]:
+                    fields = line.split()
+                    if int(fields[9]) == inode:
+                        return int(fields[-1])
+        except OSError:
+            pass
+        return -1
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
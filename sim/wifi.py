@@ -0,0 +1,100 @@
+"""
+Simulated `wifi` module.
+
+The radio joins the host loopback network. Connect latency, connect failures
+and link loss are scriptable so boot and reconnect paths can be exercised.
+A connect without a channel and BSSID also pays scan_latency_s, modelling
+the all-channel scan that a rejoin to a known AP skips, and a connect with
+DHCP running pays dhcp_latency_s for the lease. A connect that would take
+longer than its timeout waits the timeout and fails.
+"""
+
+import ipaddress
+import time
+
+class Radio:
+    def __init__(self):
+        self.enabled = True
+        self.connected = False
+        self.ipv4_address = None
+        self.ipv4_gateway = None
+        self.ipv4_subnet = None
+        self.ap_info = None
+        # Scriptable behaviour
+        self.connect_latency_s = 0.0
+        self.scan_latency_s = 0.0
+        self.dhcp_latency_s = 0.0
+        self.dhcp = True
+        self.static_ipv4 = None
+        self.failures_remaining = 0
+        self.link_up = True
+        self.connect_calls = []  # (ssid, channel, bssid) per connect() call
+
+    def configure(self, connect_latency_s=None, failures=None, scan_latency_s=None, dhcp_latency_s=None):
+        """Set the delay of each connect() and how many of the next ones fail"""
+        if connect_latency_s is not None:
+            self.connect_latency_s = connect_latency_s
+        if scan_latency_s is not None:
+            self.scan_latency_s = scan_latency_s
+        if dhcp_latency_s is not None:
+            self.dhcp_latency_s = dhcp_latency_s
+        if failures is not None:
+            self.failures_remaining = failures
+
+    def connect(self, ssid, password=None, *, channel=0, bssid=None, timeout=None):
+        self.connect_calls.append((ssid, channel, bssid))
+        delay = self.connect_latency_s
+        if not (channel and bssid):
+            delay += self.scan_latency_s
+        if self.dhcp:
+            delay += self.dhcp_latency_s
+        if timeout is not None and delay > timeout:
+            time.sleep(timeout)
+            raise ConnectionError("Timed out")
+        if delay:
+            time.sleep(delay)
+        if not self.link_up:
+            raise ConnectionError("No network with that ssid")
+        if self.failures_remaining > 0:
+            self.failures_remaining -= 1
+            raise ConnectionError("Authentication failure")
+        self.connected = True
+        if self.dhcp or self.static_ipv4 is None:
+            self.ipv4_address = ipaddress.ip_address('127.0.0.1')
+            self.ipv4_gateway = ipaddress.ip_address('127.0.0.1')
+            self.ipv4_subnet = ipaddress.ip_address('255.0.0.0')
+        else:
+            self.ipv4_address, self.ipv4_subnet, self.ipv4_gateway = self.static_ipv4
+        self.ap_info = Network(ssid)
+
+    def stop_dhcp(self):
+        self.dhcp = False
+
+    def start_dhcp(self):
+        self.dhcp = True
+
+    def set_ipv4_address(self, *, ipv4, netmask, gateway, ipv4_dns=None):
+        self.dhcp = False
+        self.static_ipv4 = (ipv4, netmask, gateway)
+        if self.connected:
+            self.ipv4_address, self.ipv4_subnet, self.ipv4_gateway = self.static_ipv4
+
+    def drop_link(self):
+        """Simulate the access point disappearing"""
+        self.link_up = False
+        self.connected = False
+        self.ipv4_address = None
+        self.ap_info = None
+
+    def restore_link(self):
+        """Make the access point reachable again (connect() still required)"""
+        self.link_up = True
+
+class Network:
+    def __init__(self, ssid, bssid=b'\x02\x00\x00\x00\x00\x01', channel=6, rssi=-52):
+        self.ssid = ssid
+        self.bssid = bssid
+        self.channel = channel
+        self.rssi = rssi
+
+radio = Radio()
@@ -0,0 +1,450 @@
+"""
+Network Transport
+=================
+UDP plumbing shared by the controller tasks.
+
+UdpSender owns the socket pool and a send socket connected to the PC, so
+every datagram goes out through a single send(buf) call with no per-send
+destination tuple or address parsing. In duplex mode it sends from the
+listening socket instead, so the device uses one socket and one port.
+
+ReceiveRing drains every pending datagram from the receive socket in one
+pass, up to a budget, into a ring of preallocated buffers so a burst from
+the PC is pulled out of the socket before it can overflow. It also keeps the
+counters the device reports to the host about its receive path.
+
+EventAggregator coalesces outgoing button events into #bundle datagrams
+when they arrive faster than a configurable window, so a burst of events
+costs one WiFi frame instead of one per event.
+
+ReliableSender adds optional acknowledged delivery on top: every event
+carries a sequence number, the PC acks it and events that go unacked are
+retransmitted on a timeout derived from the measured round trip.
+RedundantSender is the zero-wait alternative: every event datagram also
+carries copies of the events before it, so the PC recovers an isolated loss
+from the next datagram instead of waiting a round trip for a retransmit.
+"""
+
+import struct
+
+import asyncio
+
+from osc import BUNDLE_HEADER, TIMETAG_IMMEDIATE
+from scheduler import local_ms
+
+class UdpSender:
+    """
+    Send socket with its destination resolved and connected once.
+
+    send(buf) is bound straight to the connected socket's send(). If the
+    network stack cannot connect a UDP socket, it falls back to sendto()
+    with the pre-resolved address.
+
+    Given an existing socket (duplex mode: the bound receive socket), the
+    sender uses sendto() on it and never connects it, because a connected
+    socket would only receive datagrams from the PC's send port.
+    """
+
+    def __init__(self, pool, host, port, sock=None):
+        self.pool = pool
+        self.address = pool.getaddrinfo(host, port)[0][-1]
+        self.owns_socket = sock is None
+        self.connected = False
+        self.sock = pool.socket(pool.AF_INET, pool.SOCK_DGRAM) if sock is None else sock
+        self.send = self._sendto
+        if self.owns_socket:
+            try:
+                self.sock.connect(self.address)
+                self.connected = True
+                self.send = self.sock.send
+            except OSError:
+                pass
+
+    def _sendto(self, buf):
+        return self.sock.sendto(buf, self.address)
+
+    def retarget(self, address):
+        """Send to `address` from now on (reply-to-source)"""
+        if self.connected:
+            self.sock.connect(address)
+        self.address = address
+
+    def close(self):
+        if self.owns_socket:
+            self.sock.close()
+
+class ReceiveRing:
+    """Ring of preallocated datagram buffers filled straight from a socket"""
+
+    def __init__(self, slots=8, size=1024):
+        self.buffers = [bytearray(size) for _ in range(slots)]
+        self.lengths = [0] * slots
+        self.sources = [None] * slots  # Sender address of each datagram
+        self.head = 0
+        self.count = 0
+        # Counters reported to the host
+        self.passes = 0          # Drain passes that read at least one datagram
+        self.received = 0        # Datagrams read from the socket
+        self.last_drained = 0    # Datagrams read by the latest pass
+        self.max_drained = 0     # Most datagrams read by a single pass
+        self.high_water = 0      # Deepest the ring has been
+        self.full = 0            # Passes cut short because the ring was full
+
+    def drain(self, sock, budget):
+        """
+        Read pending datagrams into free slots until the socket is empty,
+        `budget` datagrams have been read or the ring is full.
+        Returns the number of datagrams read.
+        """
+        slots = len(self.buffers)
+        drained = 0
+        while drained < budget:
+            if self.count == slots:
+                self.full += 1
+                break
+            index = (self.head + self.count) % slots
+            try:
+                size, addr = sock.recvfrom_into(self.buffers[index])
+            except OSError:
+                break  # Socket empty
+            if size <= 0:
+                continue
+            self.lengths[index] = size
+            self.sources[index] = addr
+            self.count += 1
+            drained += 1
+        if drained:
+            self.passes += 1
+            self.received += drained
+            self.last_drained = drained
+            if drained > self.max_drained:
+                self.max_drained = drained
+            if self.count > self.high_water:
+                self.high_water = self.count
+        return drained
+
+    def peek(self):
+        """Return (buffer, length) of the oldest datagram; ring must not be empty"""
+        return self.buffers[self.head], self.lengths[self.head]
+
+    def peek_source(self):
+        """Return the sender address of the oldest datagram"""
+        return self.sources[self.head]
+
+    def pop(self):
+        """Release the oldest datagram's slot"""
+        self.head = (self.head + 1) % len(self.buffers)
+        self.count -= 1
+
+class EventAggregator:
+    """
+    Sends event messages, coalescing bursts into a single #bundle datagram.
+
+    With window_ms == 0 every event is sent on its own immediately. Otherwise
+    an event that follows a quiet period of window_ms is still sent at once,
+    so isolated events keep their latency, while events that follow it
+    within the window are collected into one bundle. Each collected event is
+    wrapped in its own sub-bundle carrying the timetag of its capture. The
+    bundle is sent when the window closes or before the next event would
+    push it past `mtu` bytes.
+    """
+
+    def __init__(self, sender, clock, window_ms=0, mtu=1400):
+        self.sender = sender
+        self.clock = clock
+        self.window_ms = window_ms
+        self.buffer = bytearray(mtu)
+        self.view = memoryview(self.buffer)
+        self.length = 0
+        self.pending = 0
+        self.deadline = 0
+        self.last_send_ms = -window_ms
+        self.wake = asyncio.Event()
+        # Counters
+        self.events = 0
+        self.datagrams = 0
+        self.bundles = 0
+        self.mtu_flushes = 0
+
+    def send(self, message, capture_ticks):
+        """Send or collect one encoded event message captured at capture_ticks"""
+        self.events += 1
+        now = local_ms()
+        element = 20 + len(message)  # Sub-bundle header + size + message
+        if (not self.window_ms or element + 20 > len(self.buffer)
+                or (not self.pending and now - self.last_send_ms >= self.window_ms)):
+            self._send(message, now)
+            return
+        if self.length + 4 + element > len(self.buffer):
+            self.mtu_flushes += 1
+            self.flush()
+        if not self.pending:
+            self.buffer[0:8] = BUNDLE_HEADER
+            struct.pack_into('>Q', self.buffer, 8, TIMETAG_IMMEDIATE)
+            self.length = 16
+            self.deadline = now + self.window_ms
+            self.wake.set()
+        pos = self.length
+        struct.pack_into('>i', self.buffer, pos, element)
+        self.buffer[pos + 4:pos + 12] = BUNDLE_HEADER
+        struct.pack_into('>Qi', self.buffer, pos + 12, self.clock.ticks_to_timetag(capture_ticks), len(message))
+        self.buffer[pos + 24:pos + 24 + len(message)] = message
+        self.length = pos + 24 + len(message)
+        self.pending += 1
+
+    def flush(self):
+        """Send the collected bundle, if any"""
+        if not self.pending:
+            return
+        length = self.length
+        self.pending = 0
+        self.length = 0
+        self.bundles += 1
+        self._send(self.view[:length], local_ms())
+
+    def _send(self, data, now):
+        self.last_send_ms = now
+        self.datagrams += 1
+        self.sender.send(data)
+
+    async def run(self, on_error=None):
+        """
+        Task body: flush each bundle when its window closes. A send
+        exception is passed to on_error(e) and the bundle is dropped.
+        """
+        while True:
+            self.wake.clear()
+            if not self.pending:
+                await self.wake.wait()
+                continue
+            wait = self.deadline - local_ms()
+            if wait > 0:
+                await asyncio.sleep(wait / 1000)
+            else:
+                try:
+                    self.flush()
+                except Exception as e:
+                    if on_error is not None:
+                        on_error(e)
+
+class ReliableSender:
+    """
+    Selective-retransmit delivery of event messages over an unreliable sender.
+
+    Event messages must end in an int32 sequence argument, which send()
+    fills in. Each sent event is copied into a fixed window of preallocated
+    slots until the PC acks its sequence number; unacked events are resent
+    after the retransmission timeout (RTO), doubling per retry, and given up
+    after max_retries. The RTO follows the smoothed round trip and its
+    variance (RFC 6298), kept as scaled integers so updates do not allocate.
+    Round trips of retransmitted events are not sampled (Karn's algorithm).
+    """
+
+    def __init__(self, sender, window=16, slot_size=64, max_retries=6,
+                 min_rto_ms=20, max_rto_ms=1000, initial_rto_ms=200):
+        self.sender = sender
+        self.buffers = [bytearray(slot_size) for _ in range(window)]
+        self.views = [memoryview(b) for b in self.buffers]
+        self.lengths = [0] * window
+        self.seqs = [0] * window
+        self.captured = [0] * window  # Capture ticks, for bundle timetags
+        self.sent_ms = [0] * window
+        self.due = [0] * window
+        self.tries = [0] * window
+        self.used = [False] * window
+        self.pending = 0
+        self.seq = 0
+        self.max_retries = max_retries
+        self.min_rto_ms = min_rto_ms
+        self.max_rto_ms = max_rto_ms
+        self.rto_ms = initial_rto_ms
+        self.srtt8 = 0                # Smoothed RTT x 8 (0 until first sample)
+        self.rttvar4 = 0              # RTT variance x 4
+        self.wake = asyncio.Event()
+        # Counters
+        self.sent = 0
+        self.acked = 0
+        self.retransmits = 0
+        self.gave_up = 0
+        self.window_full = 0          # Events sent untracked: no free slot
+        self.stale_acks = 0           # Acks for events no longer in the window
+
+    def send(self, message, capture_ticks):
+        """Number, track and send an event message (a bytearray)"""
+        self.seq = (self.seq + 1) & 0x7FFFFFFF
+        size = len(message)
+        struct.pack_into('>i', message, size - 4, self.seq)
+        self.sent += 1
+        slot = -1
+        if size <= len(self.buffers[0]):
+            for i in range(len(self.used)):
+                if not self.used[i]:
+                    slot = i
+                    break
+        if slot < 0:
+            self.window_full += 1
+            self.sender.send(message, capture_ticks)
+            return
+        now = local_ms()
+        self.buffers[slot][:size] = message
+        self.lengths[slot] = size
+        self.seqs[slot] = self.seq
+        self.captured[slot] = capture_ticks
+        self.sent_ms[slot] = now
+        self.due[slot] = now + self.rto_ms
+        self.tries[slot] = 1
+        self.used[slot] = True
+        self.pending += 1
+        self.wake.set()
+        self.sender.send(message, capture_ticks)
+
+    def on_ack(self, seq):
+        """Release the slot of an acked event and sample its round trip"""
+        for i in range(len(self.used)):
+            if self.used[i] and self.seqs[i] == seq:
+                if self.tries[i] == 1:
+                    self._sample_rtt(local_ms() - self.sent_ms[i])
+                self.used[i] = False
+                self.pending -= 1
+                self.acked += 1
+                return True
+        self.stale_acks += 1
+        return False
+
+    def _sample_rtt(self, rtt):
+        if not self.srtt8:
+            self.srtt8 = max(1, rtt) << 3
+            self.rttvar4 = rtt << 1
+        else:
+            delta = rtt - (self.srtt8 >> 3)
+            self.srtt8 += delta
+            if delta < 0:
+                delta = -delta
+            self.rttvar4 += delta - (self.rttvar4 >> 2)
+        rto = (self.srtt8 >> 3) + self.rttvar4
+        self.rto_ms = min(self.max_rto_ms, max(self.min_rto_ms, rto))
+
+    def retransmit_due(self):
+        """
+        Resend every event whose timeout has passed.
+        Returns milliseconds until the next timeout, or None if none pending.
+        """
+        wait = None
+        now = local_ms()
+        for i in range(len(self.used)):
+            if not self.used[i]:
+                continue
+            if self.due[i] <= now:
+                if self.tries[i] > self.max_retries:
+                    self.used[i] = False
+                    self.pending -= 1
+                    self.gave_up += 1
+                    continue
+                self.tries[i] += 1
+                self.retransmits += 1
+                self.due[i] = now + min(self.max_rto_ms, self.rto_ms << (self.tries[i] - 1))
+                self.sender.send(self.views[i][:self.lengths[i]], self.captured[i])
+            if wait is None or self.due[i] - now < wait:
+                wait = self.due[i] - now
+        return wait
+
+    async def run(self, on_error=None):
+        """
+        Task body: retransmit unacked events as their timeouts pass. A send
+        exception is passed to on_error(e) and retransmission resumes after
+        the minimum RTO.
+        """
+        while True:
+            try:
+                wait = self.retransmit_due()
+            except Exception as e:
+                if on_error is not None:
+                    on_error(e)
+                wait = self.min_rto_ms
+            self.wake.clear()
+            if wait is None:
+                await self.wake.wait()
+            else:
+                try:
+                    await asyncio.wait_for(self.wake.wait(), wait / 1000)
+                except asyncio.TimeoutError:
+                    pass
+
+class RedundantSender:
+    """
+    Repeats recent events in every event datagram.
+
+    Event messages must end in an int32 sequence argument, which send()
+    fills in. Each event goes out as a #bundle holding the new event
+    followed by copies of the `copies` events before it, newest first; the
+    PC keeps the first copy of each sequence number it sees. The last
+    max_copies events are kept in preallocated slots and the bundle is
+    assembled in a preallocated buffer.
+
+    `copies` starts at max_copies and adapts to the loss rate the PC
+    reports: the fewest copies for which losing every datagram carrying an
+    event (loss ** (copies + 1)) stays under target_loss.
+    """
+
+    def __init__(self, sender, max_copies=3, slot_size=64, target_loss=0.001):
+        self.sender = sender
+        self.max_copies = max_copies
+        self.copies = max_copies
+        self.target_loss = target_loss
+        self.loss_permille = None     # Latest loss reported by the PC
+        self.history = [bytearray(slot_size) for _ in range(max_copies)]
+        self.lengths = [0] * max_copies
+        self.newest = max_copies - 1
+        self.stored = 0
+        self.buffer = bytearray(16 + (max_copies + 1) * (4 + slot_size))
+        self.view = memoryview(self.buffer)
+        self.buffer[0:8] = BUNDLE_HEADER
+        struct.pack_into('>Q', self.buffer, 8, TIMETAG_IMMEDIATE)
+        self.seq = 0
+        # Counters
+        self.sent = 0
+        self.copies_sent = 0
+        self.oversize = 0             # Events too large to keep or repeat
+
+    def send(self, message, capture_ticks):
+        """Number an event message (a bytearray) and send it with its predecessors"""
+        self.seq = (self.seq + 1) & 0x7FFFFFFF
+        size = len(message)
+        struct.pack_into('>i', message, size - 4, self.seq)
+        self.sent += 1
+        slot_size = len(self.history[0])
+        if size > slot_size:
+            self.oversize += 1
+            self.sender.send(message, capture_ticks)
+            return
+        copies = min(self.copies, self.stored)
+        if copies:
+            pos = self._append(16, message, size)
+            for j in range(copies):
+                index = (self.newest - j) % self.max_copies
+                pos = self._append(pos, self.history[index], self.lengths[index])
+            self.copies_sent += copies
+            self.sender.send(self.view[:pos], capture_ticks)
+        else:
+            self.sender.send(message, capture_ticks)
+        self.newest = (self.newest + 1) % self.max_copies
+        self.history[self.newest][:size] = message
+        self.lengths[self.newest] = size
+        if self.stored < self.max_copies:
+            self.stored += 1
+
+    def _append(self, pos, message, size):
+        struct.pack_into('>i', self.buffer, pos, size)
+        self.buffer[pos + 4:pos + 4 + size] = memoryview(message)[:size]
+        return pos + 4 + size
+
+    def on_loss_report(self, permille):
+        """Adapt the copy count to the loss rate (per mille) seen by the PC"""
+        self.loss_permille = permille
+        loss = min(1000, max(0, permille)) / 1000
+        copies = 0
+        residual = loss
+        while residual > self.target_loss and copies < self.max_copies:
+            copies += 1
+            residual *= loss
+        self.copies = copies